@@ -0,0 +1,106 @@
+"""Benchmark streaming export throughput and memory.
+
+A mock transport serves a synthetic expense history of ``--rows`` expenses
+in pages, as ``get_expenses`` would, and the history is exported to each
+requested format in a temporary directory. Run from the repository root::
+
+    python benchmarks/export.py --rows 100000 --formats jsonl,csv
+
+For each format it prints rows per second and the growth in peak resident
+memory during the export. Memory should stay flat as ``--rows`` grows,
+since only one page is held at a time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from splitwise_mcp.client import SplitwiseClient
+from splitwise_mcp.export import export_expenses
+
+
+def _expense(i: int) -> dict:
+    return {
+        "id": i,
+        "group_id": i % 7,
+        "description": f"Synthetic expense {i}",
+        "cost": f"{i % 500}.{i % 100:02d}",
+        "currency_code": "USD",
+        "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:00:00Z",
+        "payment": False,
+        "category": {"id": 18, "name": "General", "icon": "https://x/y.png"},
+        "created_by": {"id": 1, "first_name": "Ada", "picture": {"medium": "x"}},
+        "updated_at": "2025-12-31T00:00:00Z",
+        "deleted_at": None,
+        "receipt": {"large": None, "original": None},
+        "users": [
+            {"user_id": 1, "paid_share": "10.00", "owed_share": "5.00"},
+            {"user_id": 2, "paid_share": "0.00", "owed_share": "5.00"},
+        ],
+        "repayments": [{"from": 2, "to": 1, "amount": "5.00"}],
+    }
+
+
+def _transport(rows: int) -> httpx.AsyncBaseTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params.get("limit", 20))
+        page = [_expense(i) for i in range(offset, min(offset + limit, rows))]
+        return httpx.Response(200, content=json.dumps({"expenses": page}).encode())
+
+    return httpx.MockTransport(handle)
+
+
+def _peak_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def run(args: argparse.Namespace) -> None:
+    client = SplitwiseClient(
+        "benchmark",
+        "https://splitwise.test/api/v3.0",
+        transport=_transport(args.rows),
+        store_max_bytes=0,
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in args.formats.split(","):
+                before = _peak_mb()
+                start = time.perf_counter()
+                result = await export_expenses(
+                    client,
+                    str(Path(tmp) / f"expenses.{fmt}"),
+                    format=fmt,
+                    page_size=args.page_size,
+                )
+                seconds = time.perf_counter() - start
+                print(
+                    f"{fmt:>8}: {result.rows} rows in {seconds:.2f}s "
+                    f"({result.rows / seconds:,.0f} rows/s), "
+                    f"peak RSS +{_peak_mb() - before:.1f} MB"
+                )
+    finally:
+        await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--formats", default="jsonl,csv")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
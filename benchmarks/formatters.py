@@ -0,0 +1,230 @@
+"""Benchmark the list formatters over large synthetic responses.
+
+Builds ``--rows`` synthetic groups, friends, expenses, comments and
+notifications, shaped like Splitwise's responses, and times each formatter
+over them. Run from the repository root::
+
+    python benchmarks/formatters.py --rows 10000
+
+For each formatter it prints the best of ``--repeat`` runs, in
+milliseconds, and the size of the text produced. The expense formatters
+are also timed against copies of their implementations from before
+amounts were parsed once (``_before``), on the same data, and their output
+is checked to be identical.
+
+The same cases run under pytest-benchmark (a dev dependency) over 10k rows::
+
+    uv run pytest benchmarks/formatters.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from splitwise_mcp.utils import formatters
+
+
+def _user(i: int) -> dict:
+    return {"id": i, "first_name": f"User{i}", "last_name": "Synthetic"}
+
+
+def _balance(i: int) -> list[dict]:
+    if i % 5 == 0:
+        return []
+    amount = f"{'-' if i % 2 else ''}{i % 300}.{i % 100:02d}"
+    return [{"currency_code": "USD", "amount": amount}]
+
+
+def _expense(i: int) -> dict:
+    return {
+        "id": i,
+        "group_id": i % 7 or None,
+        "description": f"Synthetic expense {i}",
+        "details": "Split from a receipt" if i % 3 == 0 else None,
+        "cost": f"{i % 500}.{i % 100:02d}",
+        "currency_code": "USD",
+        "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:00:00Z",
+        "payment": i % 20 == 0,
+        "category": {"id": 18, "name": "General"},
+        "repeat_interval": "monthly" if i % 11 == 0 else "never",
+        "updated_at": "2025-12-31T00:00:00Z",
+        "deleted_at": "2026-01-02T00:00:00Z" if i % 50 == 0 else None,
+        "users": [
+            {"user": _user(1), "paid_share": "10.00", "owed_share": "5.00"},
+            {"user": _user(2), "paid_share": "0.00", "owed_share": "5.00"},
+            {"user": _user(3), "paid_share": "0.00", "owed_share": "0.00"},
+        ],
+    }
+
+
+def _inputs(rows: int) -> dict[str, list[dict]]:
+    return {
+        "groups": [
+            {
+                "id": i,
+                "name": f"Group {i}",
+                "group_type": "home",
+                "members": [_user(i), _user(i + 1)],
+            }
+            for i in range(rows)
+        ],
+        "friends": [
+            {**_user(i), "email": f"u{i}@example.com", "balance": _balance(i)}
+            for i in range(rows)
+        ],
+        "expenses": [_expense(i) for i in range(rows)],
+        "comments": [
+            {
+                "comment_type": "User",
+                "user": _user(i),
+                "created_at": "2025-06-01T10:00:00Z",
+                "content": f"Comment number {i}",
+            }
+            for i in range(rows)
+        ],
+        "notifications": [
+            {
+                "created_at": "2025-06-01T10:00:00Z",
+                "content": f"<strong>User{i}</strong> added "
+                f'<a href="/expenses/{i}">"Synthetic expense {i}"</a>.',
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+class _before:
+    """The formatters as they were before amounts were parsed once."""
+
+    @staticmethod
+    def format_expense(expense: dict) -> str:
+        lines = [
+            f"Expense #{expense.get('id')}: {expense.get('description', 'N/A')}",
+            f"  Cost: {expense.get('cost')} {expense.get('currency_code', '')}",
+            f"  Date: {expense.get('date', 'N/A')}",
+        ]
+        if expense.get("group_id"):
+            lines.append(f"  Group ID: {expense['group_id']}")
+        if expense.get("category") and expense["category"].get("name"):
+            lines.append(f"  Category: {expense['category']['name']}")
+        if expense.get("details"):
+            lines.append(f"  Notes: {expense['details']}")
+        if expense.get("payment"):
+            lines.append("  Type: Payment")
+        users = expense.get("users") or []
+        if users:
+            name = formatters._name
+            payers = [
+                f"{name(u.get('user', u))} paid {u.get('paid_share', '0')}"
+                for u in users
+                if float(u.get("paid_share", "0")) > 0
+            ]
+            debtors = [
+                f"{name(u.get('user', u))} owes {u.get('owed_share', '0')}"
+                for u in users
+                if float(u.get("owed_share", "0")) > 0
+            ]
+            if payers:
+                lines.append(f"  Paid by: {'; '.join(payers)}")
+            if debtors:
+                lines.append(f"  Split: {'; '.join(debtors)}")
+        if expense.get("repeat_interval") and expense["repeat_interval"] != "never":
+            lines.append(f"  Repeats: {expense['repeat_interval']}")
+        if expense.get("updated_at"):
+            lines.append(f"  Last updated: {expense['updated_at']}")
+        if expense.get("deleted_at"):
+            lines.append(f"  DELETED at {expense['deleted_at']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_expense_list(expenses: list[dict]) -> str:
+        if not expenses:
+            return "No expenses found."
+        parts = []
+        for e in expenses:
+            desc = e.get("description", "N/A")
+            cost = e.get("cost", "?")
+            cur = e.get("currency_code", "")
+            date = (e.get("date") or "")[:10]
+            deleted = " [DELETED]" if e.get("deleted_at") else ""
+            parts.append(f"- #{e.get('id')} {desc} — {cost} {cur} ({date}){deleted}")
+        return f"Expenses ({len(expenses)}):\n" + "\n".join(parts)
+
+
+def _cases(data: dict[str, list[dict]]) -> dict[str, Callable[[], Any]]:
+    return {
+        "format_group_list": lambda: formatters.format_group_list(data["groups"]),
+        "format_friend_list": lambda: formatters.format_friend_list(data["friends"]),
+        "format_friend (each)": lambda: [
+            formatters.format_friend(f) for f in data["friends"]
+        ],
+        "format_expense_list": lambda: formatters.format_expense_list(data["expenses"]),
+        "format_expense (each)": lambda: [
+            formatters.format_expense(e) for e in data["expenses"]
+        ],
+        "format_comment_list": lambda: formatters.format_comment_list(data["comments"]),
+        "format_notification_list": lambda: formatters.format_notification_list(
+            data["notifications"]
+        ),
+    }
+
+
+def _before_cases(data: dict[str, list[dict]]) -> dict[str, Callable[[], Any]]:
+    return {
+        "format_expense_list": lambda: _before.format_expense_list(data["expenses"]),
+        "format_expense (each)": lambda: [
+            _before.format_expense(e) for e in data["expenses"]
+        ],
+    }
+
+
+def _best(case: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(case, number=1, repeat=repeat)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    data = _inputs(args.rows)
+    cases = _cases(data)
+    for name, case in cases.items():
+        out = case()
+        size = len(out) if isinstance(out, str) else sum(map(len, out))
+        print(f"{name:>25}: {_best(case, args.repeat):8.2f} ms  ({size:,} chars)")
+    print("\nBefore and after parsing amounts once, same data:")
+    for name, before in _before_cases(data).items():
+        after = cases[name]
+        if before() != after():
+            raise SystemExit(f"{name}: output differs from the old formatter")
+        old, new = _best(before, args.repeat), _best(after, args.repeat)
+        print(f"{name:>25}: {old:8.2f} ms → {new:8.2f} ms  ({old / new:.2f}x)")
+
+
+# pytest-benchmark: one test per case, over 10k rows
+
+
+@pytest.fixture(scope="module")
+def data() -> dict[str, list[dict]]:
+    return _inputs(10_000)
+
+
+@pytest.mark.parametrize("name", list(_cases({})))
+def test_formatter(benchmark: Any, data: dict[str, list[dict]], name: str) -> None:
+    benchmark(_cases(data)[name])
+
+
+@pytest.mark.parametrize("name", list(_before_cases({})))
+def test_before(benchmark: Any, data: dict[str, list[dict]], name: str) -> None:
+    """The old implementation, for comparison; its output must not differ."""
+    assert benchmark(_before_cases(data)[name]) == _cases(data)[name]()
+
+
+if __name__ == "__main__":
+    main()
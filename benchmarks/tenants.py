@@ -0,0 +1,122 @@
+"""Benchmark the multi-tenant client pool at 1k+ concurrent tenants.
+
+Every tenant makes a few reads at once through one shared TenantPool,
+against a mock transport that answers after a fixed latency, so the
+numbers measure the pool, caches and rate limiters rather than the
+network. Run from the repository root::
+
+    python benchmarks/tenants.py --tenants 1200 --max-tenants 1000
+
+It prints the wall time, throughput, per-call latency percentiles and the
+pool's eviction count; ``--memory`` adds the peak traced memory, at the
+cost of much slower runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import httpx
+
+from splitwise_mcp.tenants import TenantPool
+
+_USER = {"user": {"id": 1, "first_name": "Ada", "last_name": "L", "email": "a@x"}}
+_GROUPS = {
+    "groups": [
+        {"id": i, "name": f"Group {i}", "members": [], "updated_at": "2026-01-01"}
+        for i in range(10)
+    ]
+}
+
+
+def _transport(latency: float) -> httpx.AsyncBaseTransport:
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        body = _GROUPS if request.url.path.endswith("/get_groups") else _USER
+        return httpx.Response(200, content=json.dumps(body).encode())
+
+    return httpx.MockTransport(handle)
+
+
+async def _tenant(
+    pool: TenantPool, token: str, calls: int, latencies: list[float]
+) -> None:
+    for i in range(calls):
+        client = pool.get(token)
+        start = time.perf_counter()
+        if i % 2:
+            await client.get_groups()
+        else:
+            await client.get_current_user()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    pool = TenantPool(
+        "https://splitwise.test/api/v3.0",
+        max_tenants=args.max_tenants,
+        cache_ttl=args.cache_ttl,
+        rate_limit=args.rate_limit,
+        rate_burst=args.calls,
+        max_connections=args.connections,
+        transport=_transport(args.latency),
+        store_max_bytes=0,
+    )
+    latencies: list[float] = []
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                _tenant(pool, f"token-{t}", args.calls, latencies)
+                for t in range(args.tenants)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        stats = pool.stats()
+        await pool.close()
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    report = {
+        "tenants": args.tenants,
+        "calls": len(latencies),
+        "seconds": round(elapsed, 3),
+        "calls_per_second": round(len(latencies) / elapsed),
+        "p50_ms": round(pct(0.5), 2),
+        "p95_ms": round(pct(0.95), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "evictions": stats["evictions"],
+    }
+    if args.memory:
+        report["peak_mb"] = round(peak / 2**20, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=1200)
+    parser.add_argument("--max-tenants", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=4, help="reads per tenant")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--cache-ttl", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=float, default=5.0)
+    parser.add_argument("--memory", action="store_true", help="trace memory")
+    args = parser.parse_args()
+    for key, value in asyncio.run(run(args)).items():
+        print(f"{key:>17}: {value}")
+
+
+if __name__ == "__main__":
+    main()
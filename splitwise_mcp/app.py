@@ -1,7 +1,9 @@
 """Singleton FastMCP instance — imported by server.py and all tool modules.
 
 This module holds the mcp instance + lifespan. It only imports from
-client.py and config.py (which never import from here), avoiding circular deps.
+the package's core modules (client, config, breaker, cache, cassette,
+hedging, identity, jobs, journal, memo, metrics, scheduler, subscriptions,
+tenants), none of which import from here, avoiding circular deps.
 """
 
 import logging
@@ -10,12 +12,27 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
+import httpx
 from dotenv import load_dotenv
 from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_headers
 
-from splitwise_mcp.client import SplitwiseClient
+from splitwise_mcp.breaker import CircuitBreaker, StaleNoticeMiddleware
+from splitwise_mcp.cache import SQLiteCache, build_cache
+from splitwise_mcp.cassette import RecordingTransport, ReplayTransport, SessionRecorder
+from splitwise_mcp.client import SplitwiseAPIError, SplitwiseClient
 from splitwise_mcp.config import Settings
+from splitwise_mcp.hedging import HedgePolicy
+from splitwise_mcp.identity import caller_id
+from splitwise_mcp.jobs import Job, JobManager
+from splitwise_mcp.journal import WriteJournal
+from splitwise_mcp.memo import ToolMemoMiddleware, tool_memo
+from splitwise_mcp.metrics import MetricsMiddleware, worker_metrics
+from splitwise_mcp.scheduler import BACKGROUND, BULK, Scheduler
+from splitwise_mcp.subscriptions import ResourceHub
+from splitwise_mcp.tenants import TenantPool
 
 # Walk up from this file to find .env at the project root
 _project_root = Path(__file__).resolve().parent.parent
@@ -30,23 +47,250 @@ logging.basicConfig(level=logging.INFO, stream=sys.stderr)
 class AppContext:
     """Shared state available to all tools via the MCP lifespan."""
 
-    splitwise: SplitwiseClient
+    # Single-user client (API key mode)
+    client: SplitwiseClient | None = None
+    # Per-user clients keyed by OAuth access token (multi-tenant mode)
+    tenants: TenantPool | None = None
+    # Set when write-behind mode is enabled; mutating tools enqueue here
+    journal: WriteJournal | None = None
+    # Background jobs; None when disabled
+    jobs: JobManager | None = None
+    # Root directories for files written (exports) and read (imports) by tools
+    export_dir: Path = Path("exports")
+    import_dir: Path = Path("imports")
+
+    @property
+    def splitwise(self) -> SplitwiseClient:
+        """The client for the user behind the current request."""
+        if self.tenants is None:
+            return self.client
+        auth = get_http_headers(include_all=True).get("authorization", "")
+        scheme, _, token = auth.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise SplitwiseAPIError(401, "Missing Splitwise OAuth access token")
+        return self.tenants.get(token)
+
+    def files_root(self, root: Path) -> Path:
+        """*root* resolved; in multi-tenant mode, the caller's own directory in it.
+
+        Tenants share the export and import directories, so each one gets a
+        subdirectory named by :func:`~splitwise_mcp.identity.caller_id` and
+        cannot read or overwrite another tenant's files.
+        """
+        if self.tenants is None:
+            return root.resolve()
+        tenant = caller_id()
+        if not tenant:
+            raise SplitwiseAPIError(401, "Missing Splitwise OAuth access token")
+        return (root / tenant).resolve()
+
+    def stats(self) -> dict[str, Any]:
+        """Component counters for the worker health and metrics endpoints."""
+        stats: dict[str, Any] = {}
+        if self.client is not None:
+            stats.update(self.client.stats())
+        if self.tenants is not None:
+            stats.update(self.tenants.stats())
+        stats["resources"] = resource_hub.stats()
+        stats["tool_memo"] = tool_memo.stats()
+        if self.jobs is not None:
+            stats["jobs"] = self.jobs.stats()
+        if self.journal is not None:
+            stats["journal"] = {
+                "pending": len(self.journal.pending()),
+                "failed": len(self.journal.failed()),
+            }
+        return stats
+
+
+# Resource subscriptions of this worker; resources.py registers renderers
+resource_hub = ResourceHub()
+
+# The live AppContext of this worker, for HTTP routes (health, metrics) that
+# are served outside of any MCP request
+_app_context: AppContext | None = None
+
+
+def get_app_context() -> AppContext | None:
+    return _app_context
+
+
+def _transport(settings: Settings) -> httpx.AsyncBaseTransport | None:
+    """The cassette transport when replaying or recording Splitwise traffic."""
+    if settings.replay_cassette:
+        logger.info("Replaying Splitwise responses from %s", settings.replay_cassette)
+        return ReplayTransport(
+            settings.replay_cassette, latency=settings.replay_latency
+        )
+    if settings.record_cassette:
+        logger.info("Recording Splitwise traffic to %s", settings.record_cassette)
+        return RecordingTransport(settings.record_cassette)
+    return None
+
+
+def _job_finished(job: Job) -> None:
+    if job.kind != "export":
+        # What the job changed went around the tool memo
+        tool_memo.invalidate(job.owner, None)
+
+
+def _jobs(settings: Settings) -> JobManager | None:
+    if settings.job_max_workers <= 0:
+        return None
+    if settings.workers > 1:
+        logger.info("Background jobs disabled — they need a single worker")
+        return None
+    return JobManager(
+        settings.jobs_path,
+        max_workers=settings.job_max_workers,
+        on_finished=_job_finished,
+    )
 
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
     """Create and tear down the Splitwise HTTP client."""
+    global _app_context
     settings = Settings()
+    tool_memo.max_entries = settings.tool_memo_size
+    tool_memo.ttl = settings.cache_ttl
+    hedge = None
+    if settings.hedge_requests:
+        hedge = HedgePolicy(
+            percentile=settings.hedge_percentile,
+            budget=settings.hedge_budget,
+        )
+    breaker = None
+    if settings.circuit_breaker:
+        breaker = CircuitBreaker(
+            failure_rate=settings.breaker_failure_rate,
+            cooldown=settings.breaker_cooldown,
+        )
+    revalidate_after = settings.cache_ttl * settings.cache_revalidate_after or None
+    caps = {
+        BACKGROUND: settings.background_max_concurrent,
+        BULK: settings.bulk_max_concurrent,
+    }
+    shared_cache = None
+    if settings.cache_ttl <= 0:
+        # Everything built on the response cache goes with it
+        logger.info(
+            "Response cache off (CACHE_TTL=0): the tool memo, shared cache "
+            "tier and background revalidation are off too"
+        )
+    elif settings.cache_backend == "sqlite":
+        shared_cache = SQLiteCache(settings.cache_path, settings.cache_ttl)
+        logger.info("Shared cache tier at %s", settings.cache_path)
+    recorder = None
+    if settings.record_sessions:
+        recorder = SessionRecorder(settings.record_sessions)
+        server.add_middleware(recorder)
+    if settings.multi_tenant:
+        tenants = TenantPool(
+            settings.splitwise_base_url,
+            max_tenants=settings.tenant_max_clients,
+            idle_ttl=settings.tenant_idle_ttl,
+            cache_ttl=settings.cache_ttl,
+            rate_limit=settings.tenant_rate_limit,
+            rate_burst=settings.tenant_rate_burst,
+            max_connections=settings.http_max_connections,
+            transport=_transport(settings),
+            hedge=hedge,
+            breaker=breaker,
+            stale_max_age=settings.stale_max_age,
+            revalidate_after=revalidate_after,
+            shared_cache=shared_cache,
+            reference_ttl=settings.reference_ttl,
+            store_max_bytes=int(settings.tenant_store_max_mb * 2**20),
+            max_concurrent=settings.max_concurrent_requests,
+            concurrency_caps=caps,
+        )
+        jobs = _jobs(settings)
+        if jobs is not None:
+            # No stored credentials to resume them with
+            jobs.start(None)
+        logger.info("Splitwise MCP server starting — multi-tenant mode")
+        _app_context = AppContext(
+            tenants=tenants,
+            jobs=jobs,
+            export_dir=Path(settings.export_dir),
+            import_dir=Path(settings.import_dir),
+        )
+        try:
+            yield _app_context
+        finally:
+            _app_context = None
+            if jobs is not None:
+                await jobs.stop()
+            await tenants.close()
+            if shared_cache is not None:
+                shared_cache.close()
+            if recorder is not None:
+                server.middleware.remove(recorder)
+                recorder.close()
+            logger.info("Splitwise MCP server shutting down")
+        return
+
     client = SplitwiseClient(
         api_key=settings.splitwise_api_key,
         base_url=settings.splitwise_base_url,
+        transport=_transport(settings),
+        hedge=hedge,
+        breaker=breaker,
+        stale_max_age=settings.stale_max_age,
+        revalidate_after=revalidate_after,
+        cache=build_cache(settings.cache_ttl, shared_cache),
+        reference_ttl=settings.reference_ttl,
+        store_max_bytes=int(settings.store_max_mb * 2**20),
+        scheduler=(
+            Scheduler(settings.max_concurrent_requests, caps)
+            if settings.max_concurrent_requests
+            else None
+        ),
     )
+    journal = None
+    if settings.write_behind:
+        journal = WriteJournal(
+            settings.journal_path,
+            batch_size=settings.journal_batch_size,
+            max_attempts=settings.journal_max_attempts,
+            on_applied=tool_memo.invalidate_op,
+        )
+        journal.start(client)
+        logger.info("Write-behind mode enabled — journal at %s", settings.journal_path)
+    if settings.resource_poll_interval > 0:
+        resource_hub.start(client, settings.resource_poll_interval)
+    jobs = _jobs(settings)
+    if jobs is not None:
+        jobs.start(client)
     logger.info("Splitwise MCP server starting — client connected")
+    _app_context = AppContext(
+        client=client,
+        journal=journal,
+        jobs=jobs,
+        export_dir=Path(settings.export_dir),
+        import_dir=Path(settings.import_dir),
+    )
     try:
-        yield AppContext(splitwise=client)
+        yield _app_context
     finally:
+        _app_context = None
+        await resource_hub.stop()
+        if jobs is not None:
+            await jobs.stop()
+        if journal is not None:
+            await journal.stop()
         await client.close()
+        if shared_cache is not None:
+            shared_cache.close()
+        if recorder is not None:
+            server.middleware.remove(recorder)
+            recorder.close()
         logger.info("Splitwise MCP server shutting down")
 
 
 mcp = FastMCP("splitwise-mcp", lifespan=app_lifespan)
+mcp.add_middleware(MetricsMiddleware(worker_metrics))
+mcp.add_middleware(ToolMemoMiddleware(tool_memo))
+mcp.add_middleware(StaleNoticeMiddleware())
+resource_hub.install(mcp._mcp_server)
@@ -0,0 +1,200 @@
+"""Per-endpoint circuit breaking for Splitwise requests.
+
+When the Splitwise API degrades, every call waits out the client timeout
+before failing. :class:`CircuitBreaker` watches the outcome of requests
+to each endpoint (``/get_group/{id}``, ``/create_expense``, ...) over a
+sliding window. Once enough of them fail, the endpoint's circuit opens
+and requests to it fail at once instead of waiting. ``SplitwiseClient``
+then answers reads from the last response it got for the same request,
+marked stale, and probes the endpoint in the background. After
+``cooldown`` seconds a single trial request is let through. If it
+succeeds the circuit closes; if it fails the circuit opens again for
+twice as long, up to ``max_cooldown``.
+
+Reads served stale are recorded in a context variable for the duration
+of a tool call, and :class:`StaleNoticeMiddleware` puts a notice in front
+of that call's result.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+# A trial request that neither succeeds nor fails within this many seconds
+# (it was cancelled) no longer blocks the next one
+_TRIAL_TIMEOUT = 60.0
+
+STALE_NOTICE = "Note: Splitwise is not responding"
+
+
+@dataclass
+class BreakerStats:
+    opened: int = 0
+    rejected: int = 0
+    stale_served: int = 0
+    probes: int = 0
+
+
+class _Circuit:
+    __slots__ = ("cooldown", "opened_until", "outcomes", "trial_started")
+
+    def __init__(self, cooldown: float) -> None:
+        self.outcomes: deque[tuple[float, bool]] = deque()  # (time, ok)
+        self.opened_until: float | None = None  # None while closed
+        self.cooldown = cooldown
+        self.trial_started: float | None = None
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breakers, one per endpoint.
+
+    A circuit opens when at least ``min_requests`` requests finished within
+    the last ``window`` seconds and ``failure_rate`` of them failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        min_requests: int = 5,
+        window: float = 30.0,
+        cooldown: float = 15.0,
+        max_cooldown: float = 300.0,
+    ) -> None:
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        self._failure_rate = failure_rate
+        self._min_requests = min_requests
+        self._window = window
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._circuits: dict[str, _Circuit] = {}
+        self.stats = BreakerStats()
+
+    def _circuit(self, key: str) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit(self._cooldown)
+        return circuit
+
+    def is_open(self, key: str) -> bool:
+        circuit = self._circuits.get(key)
+        return circuit is not None and circuit.opened_until is not None
+
+    def retry_in(self, key: str) -> float:
+        """Seconds until *key* lets a trial request through; 0 if closed."""
+        circuit = self._circuits.get(key)
+        if circuit is None or circuit.opened_until is None:
+            return 0.0
+        return max(0.0, circuit.opened_until - time.monotonic())
+
+    def allow(self, key: str) -> bool:
+        """Whether a request to *key* may be sent now.
+
+        While the circuit is open, one trial request is allowed once the
+        cooldown has passed; its :meth:`record` decides what happens next.
+        """
+        circuit = self._circuits.get(key)
+        if circuit is None or circuit.opened_until is None:
+            return True
+        now = time.monotonic()
+        if now >= circuit.opened_until and (
+            circuit.trial_started is None
+            or now - circuit.trial_started >= _TRIAL_TIMEOUT
+        ):
+            circuit.trial_started = now
+            return True
+        self.stats.rejected += 1
+        return False
+
+    def record(self, key: str, ok: bool) -> bool:
+        """Record the outcome of a request to *key*; True if it opened the circuit."""
+        circuit = self._circuit(key)
+        now = time.monotonic()
+        if circuit.opened_until is not None:
+            if circuit.trial_started is None:
+                return False  # sent before the circuit opened
+            circuit.trial_started = None
+            if ok:
+                circuit.opened_until = None
+                circuit.cooldown = self._cooldown
+                circuit.outcomes.clear()
+            else:
+                circuit.cooldown = min(self._max_cooldown, circuit.cooldown * 2)
+                circuit.opened_until = now + circuit.cooldown
+            return False
+        outcomes = circuit.outcomes
+        outcomes.append((now, ok))
+        while outcomes and outcomes[0][0] < now - self._window:
+            outcomes.popleft()
+        if ok or len(outcomes) < self._min_requests:
+            return False
+        failures = sum(not o for _, o in outcomes)
+        if failures < self._failure_rate * len(outcomes):
+            return False
+        circuit.opened_until = now + circuit.cooldown
+        self.stats.opened += 1
+        return True
+
+    def open_count(self) -> int:
+        return sum(c.opened_until is not None for c in self._circuits.values())
+
+
+# Ages in seconds of the stale reads made for the current tool call; None
+# outside of one
+_stale_reads: ContextVar[list[float] | None] = ContextVar(
+    "splitwise_stale_reads", default=None
+)
+
+
+def note_stale(age: float) -> None:
+    """Record that the current tool call was answered with data *age* seconds old."""
+    reads = _stale_reads.get()
+    if reads is not None:
+        reads.append(age)
+
+
+def _ago(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def is_stale(result: ToolResult) -> bool:
+    content = result.content
+    return bool(content) and getattr(content[0], "text", "").startswith(STALE_NOTICE)
+
+
+class StaleNoticeMiddleware(Middleware):
+    """Flag tool results built from stale data served by an open circuit."""
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        reads: list[float] = []
+        token = _stale_reads.set(reads)
+        try:
+            result = await call_next(context)
+        finally:
+            _stale_reads.reset(token)
+        content = result.content
+        if reads and content and isinstance(content[0], mt.TextContent):
+            notice = (
+                f"{STALE_NOTICE}; showing data last fetched {_ago(max(reads))} "
+                "ago, which may be out of date.\n\n"
+            )
+            content[0] = content[0].model_copy(
+                update={"text": notice + content[0].text}
+            )
+        return result
@@ -0,0 +1,377 @@
+"""Response caches for Splitwise GETs.
+
+``SplitwiseClient`` accepts any object implementing :class:`CacheBackend`.
+Two tiers are provided and can be combined with :class:`TieredCache`:
+
+* :class:`TTLCache` — an in-process LRU, private to one worker.
+* :class:`SQLiteCache` — a SQLite database in WAL mode shared by every
+  worker process on the host, so N workers fetch each response once.
+
+Invalidation (any mutation) bumps a per-namespace generation counter in the
+shared tier; other workers notice the new generation on their next lookup
+and drop their local entries, and entries written under an older generation
+are ignored.
+
+Code that builds something longer-lived from cached responses (the tool
+memo) can wrap the work in :func:`track_expiry` to learn when the oldest
+response it was served expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Monotonic expiry of each cache hit served in the current tracked context
+_hit_expiries: ContextVar[list[float] | None] = ContextVar(
+    "splitwise_cache_hit_expiries", default=None
+)
+
+
+def _note_hit(expires: float) -> None:
+    hits = _hit_expiries.get()
+    if hits is not None:
+        hits.append(expires)
+
+
+@contextmanager
+def track_expiry() -> Iterator[list[float]]:
+    """Collect the expiry of every cache hit inside the block."""
+    hits: list[float] = []
+    token = _hit_expiries.set(hits)
+    try:
+        yield hits
+    finally:
+        _hit_expiries.reset(token)
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> Any | None: ...
+
+    async def set(self, key: str, value: Any) -> None: ...
+
+    async def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    The async methods never suspend; :class:`TieredCache` uses the ``*_now``
+    ones directly.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_now(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        _note_hit(item[0])
+        return item[1]
+
+    def set_now(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (self._ttl if ttl is None else ttl)
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def clear_now(self) -> None:
+        self._data.clear()
+
+    async def get(self, key: str) -> Any | None:
+        return self.get_now(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self.set_now(key, value)
+
+    async def clear(self) -> None:
+        self.clear_now()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS generations (
+    namespace TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+
+class _Connections:
+    """A reader and a writer connection, each used by one thread at a time.
+
+    In WAL mode reads never wait for a writer, so only writes can be held
+    up by another process.
+    """
+
+    def __init__(self, path: str, write_timeout: float) -> None:
+        self.writer = self._open(path, write_timeout)
+        self.writer.execute("PRAGMA journal_mode=WAL")
+        self.writer.execute("PRAGMA synchronous=NORMAL")
+        self.writer.executescript(_SCHEMA)
+        self.reader = self._open(path, write_timeout)
+        self.read_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    @staticmethod
+    def _open(path: str, timeout: float) -> sqlite3.Connection:
+        return sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+
+    def close(self) -> None:
+        self.reader.close()
+        self.writer.close()
+
+
+class SQLiteCache:
+    """Cache tier shared across processes through a SQLite file in WAL mode.
+
+    Keys live in a ``namespace`` (one per tenant in multi-tenant mode);
+    :meth:`for_namespace` returns a view that reuses the same connections.
+    Every query runs in a worker thread, so a write waiting on another
+    process's lock (up to ``write_timeout`` seconds) never stalls the event
+    loop. A cache write that times out is dropped. An invalidation that
+    times out is logged as a warning: other workers keep serving their
+    entries until they expire.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        *,
+        namespace: str = "default",
+        write_timeout: float = 1.0,
+        _conns: _Connections | None = None,
+    ) -> None:
+        self._ttl = ttl
+        self._namespace = namespace
+        self._conns = _conns or _Connections(path, write_timeout)
+        self.hits = 0
+        self.misses = 0
+        self.dropped_writes = 0
+
+    def for_namespace(self, namespace: str) -> SQLiteCache:
+        return SQLiteCache("", self._ttl, namespace=namespace, _conns=self._conns)
+
+    def _generation(self) -> int:
+        row = self._conns.reader.execute(
+            "SELECT generation FROM generations WHERE namespace = ?",
+            (self._namespace,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _read(self, key: str | None) -> tuple[int, tuple | None]:
+        with self._conns.read_lock:
+            generation = self._generation()
+            if key is None:
+                return generation, None
+            row = self._conns.reader.execute(
+                "SELECT generation, expires, value FROM entries "
+                "WHERE namespace = ? AND key = ?",
+                (self._namespace, key),
+            ).fetchone()
+        return generation, row
+
+    async def generation(self) -> int:
+        generation, _ = await asyncio.to_thread(self._read, None)
+        return generation
+
+    async def lookup(self, key: str) -> tuple[int, tuple[Any, float] | None]:
+        """The current generation, and ``(value, seconds_left)`` if live."""
+        generation, row = await asyncio.to_thread(self._read, key)
+        now = time.time()
+        if row is None or row[0] != generation or row[1] < now:
+            self.misses += 1
+            return generation, None
+        self.hits += 1
+        return generation, (json.loads(row[2]), row[1] - now)
+
+    def _store(self, key: str, value: str, generation: int) -> None:
+        with self._conns.write_lock:
+            self._conns.writer.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self._namespace, key, generation, time.time() + self._ttl, value),
+            )
+
+    async def store(self, key: str, value: Any, generation: int) -> None:
+        data = json.dumps(value, separators=(",", ":"))
+        try:
+            await asyncio.to_thread(self._store, key, data, generation)
+        except sqlite3.OperationalError as e:
+            # Busy: the response is simply not shared
+            self.dropped_writes += 1
+            logger.debug("Shared cache write dropped: %s", e)
+
+    async def get(self, key: str) -> Any | None:
+        _, found = await self.lookup(key)
+        return None if found is None else found[0]
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.store(key, value, await self.generation())
+
+    def _clear(self) -> int:
+        with self._conns.write_lock:
+            conn = self._conns.writer
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT INTO generations VALUES (?, 1) ON CONFLICT(namespace) "
+                    "DO UPDATE SET generation = generation + 1",
+                    (self._namespace,),
+                )
+                row = conn.execute(
+                    "SELECT generation FROM generations WHERE namespace = ?",
+                    (self._namespace,),
+                ).fetchone()
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? OR expires < ?",
+                    (self._namespace, time.time()),
+                )
+        return row[0]
+
+    async def clear(self) -> int | None:
+        """Invalidate the namespace for every process; returns the new generation."""
+        try:
+            return await asyncio.to_thread(self._clear)
+        except sqlite3.OperationalError as e:
+            logger.warning("Shared cache invalidation failed: %s", e)
+            return None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped_writes": self.dropped_writes,
+        }
+
+    def close(self) -> None:
+        self._conns.close()
+
+
+# Keys whose generation at lookup time is remembered, per TieredCache
+_LOOKUPS_KEPT = 1024
+
+
+class TieredCache:
+    """In-process LRU in front of a shared :class:`SQLiteCache`."""
+
+    def __init__(self, local: TTLCache, shared: SQLiteCache) -> None:
+        self._local = local
+        self._shared = shared
+        self._generation: int | None = None  # learned on first lookup
+        # Generation observed when each key was last looked up, for tagging
+        # its set(); oldest first, at most _LOOKUPS_KEPT
+        self._lookup_generation: OrderedDict[str, int] = OrderedDict()
+
+    def _observe(self, generation: int) -> None:
+        if generation != self._generation:
+            # Another process invalidated this namespace
+            self._local.clear_now()
+            self._lookup_generation.clear()
+            self._generation = generation
+
+    def _looked_up(self, key: str, generation: int) -> None:
+        self._lookup_generation[key] = generation
+        self._lookup_generation.move_to_end(key)
+        while len(self._lookup_generation) > _LOOKUPS_KEPT:
+            self._lookup_generation.popitem(last=False)
+
+    async def get(self, key: str) -> Any | None:
+        value = self._local.get_now(key)
+        if value is not None:
+            generation = await self._shared.generation()
+            if generation == self._generation:
+                # A background revalidation of a hit sets it again
+                self._looked_up(key, generation)
+                return value
+            self._observe(generation)
+        generation, found = await self._shared.lookup(key)
+        self._observe(generation)
+        self._looked_up(key, generation)
+        if found is None:
+            return None
+        value, ttl = found
+        self._local.set_now(key, value, ttl=ttl)
+        _note_hit(time.monotonic() + ttl)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        # Tag with the generation seen at lookup time, so a response fetched
+        # before a concurrent invalidation is never served after it. A key
+        # whose lookup is no longer remembered can't be placed in a
+        # generation; it is cached locally only, where this process's own
+        # invalidations still drop it.
+        generation = self._lookup_generation.pop(key, None)
+        if generation is None or generation == self._generation:
+            self._local.set_now(key, value)
+        if generation is not None:
+            await self._shared.store(key, value, generation)
+
+    async def clear(self) -> None:
+        # Drop local entries before suspending, so no read in between sees them
+        self._local.clear_now()
+        self._lookup_generation.clear()
+        generation = await self._shared.clear()
+        if generation is not None:
+            self._generation = generation
+
+    def stats(self) -> dict[str, int]:
+        local = self._local.stats()
+        shared = self._shared.stats()
+        return {
+            "entries": local["entries"],
+            "hits": local["hits"],
+            "shared_hits": shared["hits"],
+            "misses": shared["misses"],
+            "dropped_writes": shared["dropped_writes"],
+        }
+
+
+def build_cache(
+    ttl: float, shared: SQLiteCache | None = None, namespace: str = "default"
+) -> CacheBackend | None:
+    """Return the cache configured by ``ttl`` and an optional shared tier."""
+    if ttl <= 0:
+        return None
+    if shared is None:
+        return TTLCache(ttl)
+    return TieredCache(TTLCache(ttl), shared.for_namespace(namespace))
@@ -0,0 +1,257 @@
+"""Record Splitwise traffic and MCP tool-call sessions; replay them offline.
+
+Performance problems seen in production are hard to reproduce without the
+same data and the same API behaviour. Three pieces help:
+
+* :class:`RecordingTransport` wraps the real httpx transport and writes
+  every request/response pair, with its latency, to a gzipped JSONL
+  *cassette*. Credentials are never written: request headers are dropped,
+  and query parameters and JSON keys (in requests and responses) that
+  look like secrets are redacted.
+* :class:`ReplayTransport` serves a cassette instead of the network.
+  Requests are matched on method, path, query and body. Repeated
+  requests get the recorded responses in order, starting over after the
+  last one. With ``latency`` on, each response is delayed by a latency
+  drawn from those recorded for its endpoint, so the replay keeps the
+  original latency distribution.
+* :class:`SessionRecorder` is middleware that logs the tool calls of each
+  MCP session with their timing, for ``splitwise_mcp.loadgen`` to replay
+  against a server at a larger scale.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import random
+import re
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import IO, Any
+
+import httpx
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from splitwise_mcp.hedging import endpoint_key
+from splitwise_mcp.metrics import _is_error
+
+REDACTED = "[redacted]"
+
+_SECRET = re.compile(r"token|secret|password|passwd|api_?key|auth", re.IGNORECASE)
+# Response headers worth keeping; the body is stored decoded
+_KEEP_HEADERS = ("content-type", "retry-after")
+
+
+def redact(value: Any) -> Any:
+    """*value* with the values of secret-looking keys replaced, recursively."""
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if _SECRET.search(str(k)) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+def _open(path: str | Path, mode: str) -> IO[str]:
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def read_jsonl(path: str | Path) -> list[dict[str, Any]]:
+    """Every record of a cassette or session log (gzipped if ``.gz``)."""
+    with _open(path, "r") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _query(url: httpx.URL) -> list[list[str]]:
+    return sorted(
+        [k, REDACTED if _SECRET.search(k) else v] for k, v in url.params.multi_items()
+    )
+
+
+def _body(content: bytes) -> Any:
+    if not content:
+        return None
+    try:
+        return redact(json.loads(content))
+    except ValueError:
+        return content.decode("utf-8", "replace")
+
+
+def _response(content: bytes) -> str:
+    try:
+        return json.dumps(redact(json.loads(content)), separators=(",", ":"))
+    except ValueError:
+        return content.decode("utf-8", "replace")
+
+
+def _match_key(method: str, path: str, query: Any, body: Any) -> str:
+    canonical = json.dumps([method, path, query, body], sort_keys=True)
+    return hashlib.blake2b(canonical.encode(), digest_size=12).hexdigest()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests to *inner* and append each exchange to a cassette."""
+
+    def __init__(
+        self, path: str | Path, inner: httpx.AsyncBaseTransport | None = None
+    ) -> None:
+        self._inner = inner or httpx.AsyncHTTPTransport()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(path, "a")
+        self._started = time.monotonic()
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        response = await self._inner.handle_async_request(request)
+        try:
+            # Reading the body through a Response decodes gzip/brotli
+            content = await httpx.Response(
+                response.status_code,
+                headers=response.headers,
+                stream=response.stream,
+                request=request,
+            ).aread()
+        finally:
+            await response.aclose()
+        elapsed = time.monotonic() - start
+        headers = {
+            k: v for k, v in response.headers.items() if k.lower() in _KEEP_HEADERS
+        }
+        record = {
+            "at": round(start - self._started, 4),
+            "elapsed": round(elapsed, 4),
+            "method": request.method,
+            "path": request.url.path,
+            "query": _query(request.url),
+            "body": _body(await request.aread()),
+            "status": response.status_code,
+            "headers": headers,
+            "response": _response(content),
+        }
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.recorded += 1
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self._inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve requests from a cassette recorded by :class:`RecordingTransport`.
+
+    An unrecorded request gets a 404 whose body says so. *latency_scale*
+    multiplies the replayed latencies (0.5 = twice as fast).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        latency: bool = False,
+        latency_scale: float = 1.0,
+        seed: int | None = None,
+    ) -> None:
+        self._latency = latency
+        self._latency_scale = latency_scale
+        self._random = random.Random(seed)
+        # Responses for each request, in the order they are served; each one
+        # served goes to the back, so the recording repeats
+        self._responses: defaultdict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._latencies: dict[tuple[str, str], list[float]] = defaultdict(list)
+        for record in read_jsonl(path):
+            key = _match_key(
+                record["method"], record["path"], record["query"], record["body"]
+            )
+            self._responses[key].append(record)
+            self._latencies[record["method"], endpoint_key(record["path"])].append(
+                record["elapsed"]
+            )
+        self.served = 0
+        self.missed = 0
+
+    def __len__(self) -> int:
+        return sum(map(len, self._responses.values()))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = _match_key(
+            request.method,
+            request.url.path,
+            _query(request.url),
+            _body(await request.aread()),
+        )
+        queue = self._responses.get(key)
+        if not queue:
+            self.missed += 1
+            return httpx.Response(
+                404,
+                json={"error": f"not in cassette: {request.method} {request.url.path}"},
+                request=request,
+            )
+        record = queue.popleft()
+        queue.append(record)
+        if self._latency:
+            samples = self._latencies[request.method, endpoint_key(request.url.path)]
+            await asyncio.sleep(self._random.choice(samples) * self._latency_scale)
+        self.served += 1
+        return httpx.Response(
+            record["status"],
+            headers=record["headers"],
+            content=record["response"].encode(),
+            request=request,
+        )
+
+
+class SessionRecorder(Middleware):
+    """Log every tool call, by MCP session, for replay with the load generator."""
+
+    def __init__(self, path: str | Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(path, "a")
+        self._started = time.monotonic()
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        fastmcp_context = context.fastmcp_context
+        session = (
+            fastmcp_context.session_id if fastmcp_context is not None else "default"
+        )
+        start = time.monotonic()
+        error = True
+        try:
+            result = await call_next(context)
+            error = _is_error(result)
+            return result
+        finally:
+            record = {
+                "session": session,
+                "at": round(start - self._started, 4),
+                "seconds": round(time.monotonic() - start, 4),
+                "tool": context.message.name,
+                "arguments": redact(context.message.arguments or {}),
+                "error": error,
+            }
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
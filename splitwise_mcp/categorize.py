@@ -0,0 +1,153 @@
+"""Category suggestions from the account's own expense history.
+
+:class:`CategoryModel` is a multinomial naive Bayes classifier over the
+words of expense descriptions, trained on every categorized expense the
+client sees. Training is a matter of counts, so it is kept current like
+any :class:`~splitwise_mcp.indexing.ExpenseIndex`: adding, changing or
+deleting an expense adjusts the counts of that one expense. A suggestion
+sums a log-probability per known word for each category, which takes
+microseconds for a few dozen categories.
+
+Expenses left in Splitwise's default "General" category are not learned
+from; for most accounts they are the uncategorized majority and would
+drown out everything else.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from splitwise_mcp.indexing import ExpenseIndex
+from splitwise_mcp.resolver import normalize
+from splitwise_mcp.streaming import fields_spec
+
+CATEGORY_FIELDS = fields_spec(
+    (
+        "id",
+        "description",
+        "payment",
+        "category.id",
+        "category.name",
+        "updated_at",
+        "deleted_at",
+    )
+)
+
+_DEFAULT_CATEGORY = "general"
+# Laplace smoothing for word counts
+_ALPHA = 1.0
+# Suggestions less likely than this are left out
+_MIN_CONFIDENCE = 0.01
+
+
+def tokens(description: str) -> tuple[str, ...]:
+    """The distinct words of *description* worth learning from."""
+    return tuple(
+        dict.fromkeys(
+            w for w in normalize(description).split() if len(w) > 1 and not w.isdigit()
+        )
+    )
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    category_id: int
+    name: str
+    confidence: float
+
+
+class CategoryModel(ExpenseIndex):
+    """Naive Bayes over description words, trained incrementally."""
+
+    fields = CATEGORY_FIELDS
+
+    def __init__(self) -> None:
+        # expense id → (category id, words), so a change can be unlearned
+        self._docs: dict[int, tuple[int, tuple[str, ...]]] = {}
+        self._names: dict[int, str] = {}
+        self._class_docs: Counter[int] = Counter()
+        self._class_words: Counter[int] = Counter()
+        self._word_counts: dict[str, Counter[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _learn(self, category_id: int, words: tuple[str, ...], sign: int) -> None:
+        self._class_docs[category_id] += sign
+        self._class_words[category_id] += sign * len(words)
+        for w in words:
+            counts = self._word_counts.setdefault(w, Counter())
+            counts[category_id] += sign
+            if counts[category_id] <= 0:
+                del counts[category_id]
+                if not counts:
+                    del self._word_counts[w]
+        if self._class_docs[category_id] <= 0:
+            del self._class_docs[category_id]
+            del self._class_words[category_id]
+
+    def _apply(self, expense: dict[str, Any]) -> None:
+        if "category" not in expense or "description" not in expense:
+            return  # a partial object; nothing to learn
+        expense_id = expense["id"]
+        self.forget(expense_id)
+        category = expense.get("category") or {}
+        name = category.get("name") or ""
+        words = tokens(expense.get("description") or "")
+        if (
+            expense.get("deleted_at")
+            or expense.get("payment")
+            or category.get("id") is None
+            or name.casefold() == _DEFAULT_CATEGORY
+            or not words
+        ):
+            return
+        self._names[category["id"]] = name
+        self._docs[expense_id] = (category["id"], words)
+        self._learn(category["id"], words, 1)
+
+    def forget(self, expense_id: int) -> None:
+        old = self._docs.pop(expense_id, None)
+        if old is not None:
+            self._learn(*old, -1)
+
+    def suggest(self, description: str, *, limit: int = 3) -> list[Suggestion]:
+        """The likeliest categories for *description*, most confident first.
+
+        Empty when none of its words has been seen in a categorized expense.
+        """
+        words = [w for w in tokens(description) if w in self._word_counts]
+        if not words:
+            return []
+        total_docs = sum(self._class_docs.values())
+        vocabulary = len(self._word_counts)
+        scores = {}
+        for category_id, docs in self._class_docs.items():
+            denominator = math.log(self._class_words[category_id] + _ALPHA * vocabulary)
+            score = math.log(docs / total_docs)
+            for w in words:
+                score += (
+                    math.log(self._word_counts[w].get(category_id, 0) + _ALPHA)
+                    - denominator
+                )
+            scores[category_id] = score
+        # Softmax, shifted by the best score to stay in range
+        best = max(scores.values())
+        weights = {c: math.exp(s - best) for c, s in scores.items()}
+        norm = sum(weights.values())
+        ranked = sorted(weights.items(), key=lambda kv: -kv[1])[:limit]
+        return [
+            Suggestion(c, self._names.get(c, ""), w / norm)
+            for c, w in ranked
+            if w / norm >= _MIN_CONFIDENCE
+        ]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "expenses": len(self._docs),
+            "categories": len(self._class_docs),
+            "words": len(self._word_counts),
+        }
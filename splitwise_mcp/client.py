@@ -2,15 +2,58 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import math
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import asdict
+from importlib.util import find_spec
 from typing import Any
 
 import httpx
 
+from splitwise_mcp.breaker import CircuitBreaker, note_stale
+from splitwise_mcp.cache import CacheBackend
+from splitwise_mcp.categorize import CategoryModel
+from splitwise_mcp.duplicates import DuplicateIndex
+from splitwise_mcp.hedging import HedgePolicy, endpoint_key
+from splitwise_mcp.indexing import ExpenseIndexes
+from splitwise_mcp.ledger import BalanceLedger
+from splitwise_mcp.money import Money, places
+from splitwise_mcp.ratelimit import RateLimiter
+from splitwise_mcp.recurring import RecurringIndex
+from splitwise_mcp.reference import ReferenceData
+from splitwise_mcp.resolver import NameIndex
+from splitwise_mcp.scheduler import BACKGROUND, Scheduler, priority
+from splitwise_mcp.splits import SplitError, to_minor, validate_users
+from splitwise_mcp.store import EntityStore
+from splitwise_mcp.streaming import (
+    EXPENSE_FIELDS,
+    ArrayNotFound,
+    Spec,
+    iter_array,
+    project,
+)
+
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://secure.splitwise.com/api/v3.0"
 
+# Last good responses kept to answer reads while their endpoint is down
+_LAST_GOOD_ENTRIES = 512
+
+# httpx decodes brotli only when brotli or brotlicffi is installed
+ACCEPT_ENCODING = (
+    "br, gzip, deflate"
+    if find_spec("brotli") or find_spec("brotlicffi")
+    else "gzip, deflate"
+)
+
 
 class SplitwiseAPIError(Exception):
     """Raised when the Splitwise API returns an error."""
@@ -21,36 +64,595 @@ class SplitwiseAPIError(Exception):
         super().__init__(f"Splitwise API error {status_code}: {detail}")
 
 
+class SplitValidationError(SplitwiseAPIError):
+    """Raised before sending an expense whose shares Splitwise would reject."""
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(400, detail)
+
+
+class UnknownReferenceError(SplitwiseAPIError):
+    """Raised before sending a mutation that names a nonexistent ID or code."""
+
+    def __init__(self, problems: list[str]) -> None:
+        self.problems = problems
+        super().__init__(400, "; ".join(problems))
+
+
+class ConflictError(SplitwiseAPIError):
+    """Raised when an expense changed since the version an update was based on."""
+
+    def __init__(self, expense_id: int, expected: str, actual: str | None) -> None:
+        super().__init__(
+            409,
+            f"expense {expense_id} was updated at {actual}, not {expected}; "
+            "fetch it again before updating",
+        )
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether *exc* says Splitwise is struggling rather than refusing the request."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, SplitwiseAPIError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def check_expense(
+    cost: str | None,
+    users: list[dict[str, Any]] | None,
+    currency_code: str | None = None,
+) -> None:
+    """Pre-flight check of an expense's cost and ``users`` shares.
+
+    Amounts may have as many decimal places as *currency_code* has.
+    """
+    scale = places(currency_code)
+    try:
+        if cost is not None and to_minor(cost, scale) <= 0:
+            raise SplitError("cost must be positive")
+        if users:
+            validate_users(cost, users, scale)
+    except SplitError as e:
+        raise SplitValidationError(str(e)) from e
+
+
+def _shares(
+    users: list[dict[str, Any]], currency: str | None
+) -> dict[Any, tuple[Money, Money]]:
+    # Users with nothing paid or owed are not part of the split
+    shares = {}
+    for u in users:
+        key = u.get("user_id") or u.get("email") or (u.get("user") or {}).get("id")
+        paid = Money.parse(u.get("paid_share"), currency)
+        owed = Money.parse(u.get("owed_share"), currency)
+        if paid or owed:
+            shares[key] = (paid, owed)
+    return shares
+
+
+def expense_changes(current: dict[str, Any], update: dict[str, Any]) -> dict[str, Any]:
+    """The subset of *update* that differs from the *current* expense.
+
+    Amounts are compared exactly, each at its own currency's scale. Raises
+    :class:`SplitError` for an amount the new currency cannot hold.
+    """
+    was = current.get("currency_code")
+    now = update.get("currency_code") or was
+    changed: dict[str, Any] = {}
+    for field, value in update.items():
+        if value is None:
+            continue
+        if field == "cost":
+            same = Money.parse(value, now) == Money.parse(current.get("cost"), was)
+        elif field == "category_id":
+            same = value == (current.get("category") or {}).get("id")
+        elif field == "group_id":
+            same = (value or None) == (current.get("group_id") or None)
+        elif field == "date":
+            # A bare date matches any time on that day
+            same = value == (current.get("date") or "")[: len(value)]
+        elif field == "details":
+            same = value == (current.get("details") or "")
+        elif field == "users":
+            same = _shares(value, now) == _shares(current.get("users") or [], was)
+        else:
+            same = value == current.get(field)
+        if not same:
+            changed[field] = value
+    return changed
+
+
+def create_http_client(
+    base_url: str = BASE_URL,
+    *,
+    max_connections: int = 100,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Build the httpx connection pool used by one or more SplitwiseClients.
+
+    A *transport* replaces the network, e.g. to record or replay traffic.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        transport=transport,
+        headers={
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        },
+        timeout=30.0,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
 class SplitwiseClient:
     """Thin async wrapper around the Splitwise v3.0 REST API.
 
     All methods return raw dicts parsed from JSON responses.
+
+    If a ``hedge`` policy is given, slow GETs are duplicated once they exceed
+    the endpoint's adaptive latency threshold. POSTs are never hedged.
+
+    Pass a shared ``http_client`` to reuse one connection pool across many
+    clients (one per OAuth tenant); the caller then owns its lifetime. GET
+    responses are kept in ``cache`` until any mutation goes through this
+    client, and ``rate_limiter`` throttles every request it sends. A
+    ``scheduler`` admits requests by priority class, so bulk and background
+    work cannot crowd out interactive calls.
+
+    With a ``breaker``, requests to an endpoint that keeps failing fail
+    fast, and reads are answered from the last response to the same
+    request (up to ``stale_max_age`` seconds old) while the endpoint is
+    probed in the background. Cache hits older than ``revalidate_after``
+    seconds are refreshed in the background before they expire.
+
+    With ``reference_ttl`` set, categories, currencies, groups and users are
+    cached for that many seconds and expense mutations naming unknown ones
+    raise :class:`UnknownReferenceError` without a round trip.
     """
 
-    def __init__(self, api_key: str, base_url: str = BASE_URL) -> None:
-        self._client = httpx.AsyncClient(
-            base_url=base_url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=30.0,
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = BASE_URL,
+        *,
+        http_client: httpx.AsyncClient | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        hedge: HedgePolicy | None = None,
+        cache: CacheBackend | None = None,
+        rate_limiter: RateLimiter | None = None,
+        scheduler: Scheduler | None = None,
+        breaker: CircuitBreaker | None = None,
+        stale_max_age: float = 86400.0,
+        revalidate_after: float | None = None,
+        reference_ttl: float | None = None,
+        store_max_bytes: int = 32 * 2**20,
+    ) -> None:
+        self._auth = {"Authorization": f"Bearer {api_key}"}
+        self._owns_client = http_client is None
+        self._client = http_client or create_http_client(base_url, transport=transport)
+        self._hedge = hedge
+        self._cache = cache
+        # Bumped by every mutation, so a GET that was in flight across one
+        # does not repopulate the cache with pre-mutation data
+        self._mutations = 0
+        self._rate_limiter = rate_limiter
+        self._scheduler = scheduler
+        self._breaker = breaker
+        self._stale_max_age = stale_max_age
+        self._revalidate_after = revalidate_after
+        # GET key → (fetched at, response), most recently fetched last
+        self._last_good: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._refreshing: set[str] = set()  # keys being revalidated
+        self._probing: set[str] = set()  # endpoints being probed
+        self._tasks: set[asyncio.Task] = set()
+        # Normalized copies of the expenses and groups read through this client
+        self.store = EntityStore(store_max_bytes) if store_max_bytes else None
+        # Recurring expenses seen through this client, for forecasts
+        self.recurring = RecurringIndex()
+        # Non-payment expenses bucketed by description/amount/date, for
+        # duplicate detection
+        self.duplicates = DuplicateIndex()
+        # Learns categories from descriptions, for category suggestions
+        self.categorizer = CategoryModel()
+        # Running balances between users by date, for as-of queries
+        self.ledger = BalanceLedger()
+        # Synced together, by one walk of the expense history
+        self.indexes = ExpenseIndexes(
+            self.recurring, self.duplicates, self.categorizer, self.ledger
         )
+        # Friends, group members and groups by name, for the resolve tool
+        self.names = NameIndex()
+        self._reference = None
+        if reference_ttl:
+            self._reference = ReferenceData(
+                lambda path: self._get(path, use_cache=False, ingest=self._ingest_body),
+                reference_ttl,
+            )
+
+    @property
+    def mutations(self) -> int:
+        """Number of mutations sent through this client so far."""
+        return self._mutations
 
     async def close(self) -> None:
-        await self._client.aclose()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._owns_client:
+            await self._client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        """Cache and hedging counters for health/metrics reporting."""
+        stats: dict[str, Any] = {}
+        if self._cache is not None:
+            stats["cache"] = self._cache.stats()
+        if self._hedge is not None:
+            stats["hedge"] = asdict(self._hedge.stats)
+        if self._scheduler is not None:
+            stats["scheduler"] = self._scheduler.stats()
+        if self._breaker is not None:
+            stats["breaker"] = {
+                **asdict(self._breaker.stats),
+                "open": self._breaker.open_count(),
+            }
+        if self.store is not None:
+            stats["store"] = self.store.stats()
+        stats["recurring"] = self.recurring.stats()
+        stats["duplicates"] = self.duplicates.stats()
+        stats["categorizer"] = self.categorizer.stats()
+        stats["ledger"] = self.ledger.stats()
+        stats["names"] = self.names.stats()
+        return stats
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    async def _get(self, path: str, params: dict[str, Any] | None = None) -> Any:
-        resp = await self._client.get(path, params=params)
-        return self._handle(resp)
+    def _slot(self) -> AbstractAsyncContextManager[None]:
+        """A request slot at the caller's priority; cache hits need none."""
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot()
+
+    async def _get(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        *,
+        use_cache: bool = True,
+        ingest: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """GET *path*, applying *ingest* to the body before it is cached."""
+        key = f"{path}?{sorted(params.items())}" if params else path
+        use_cache = use_cache and self._cache is not None
+
+        async def load() -> Any:
+            async with self._slot():
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire()
+                if self._hedge is not None:
+                    resp = await self._hedged_get(path, params)
+                else:
+                    resp = await self._client.get(
+                        path, params=params, headers=self._auth
+                    )
+            data = self._handle(resp)
+            return data if ingest is None else ingest(data)
+
+        if use_cache:
+            cached = await self._cache.get(key)
+            if cached is not None:
+                self._revalidate_soon(path, key, load)
+                return cached
+        return await self._read(path, key, load, cache=use_cache)
+
+    async def _get_items(
+        self,
+        path: str,
+        key: str,
+        params: dict[str, Any] | None = None,
+        *,
+        fields: Spec | None = None,
+        ingest: Callable[[Any], Any] | None = None,
+        use_cache: bool = True,
+        fallback: bool = True,
+    ) -> list[Any]:
+        """GET a list response, parsing and projecting items as they stream in.
+
+        Used for responses too large to hold whole; such reads are not
+        hedged, since a duplicate would double the transfer. *fallback* is
+        passed to :meth:`_read`.
+        """
+        # Differently projected copies of a response are cached apart
+        tag = zlib.crc32(json.dumps(fields, sort_keys=True).encode())
+        cache_key = f"{path}?{sorted((params or {}).items())}#{tag:x}"
+        use_cache = use_cache and self._cache is not None
+
+        async def load() -> list[Any]:
+            items = []
+            # The slot is held while the response streams in
+            async with self._slot():
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire()
+                async with self._client.stream(
+                    "GET", path, params=params, headers=self._auth
+                ) as resp:
+                    if resp.status_code >= 400:
+                        await resp.aread()
+                        self._handle(resp)
+                    try:
+                        async for item in iter_array(resp.aiter_bytes(), key):
+                            if fields is not None:
+                                item = project(item, fields)
+                            items.append(item if ingest is None else ingest(item))
+                    except ArrayNotFound as e:
+                        # A 200 carrying {"errors": ...} instead of the list
+                        detail = e.errors.get("errors") or e.errors.get("error")
+                        raise SplitwiseAPIError(
+                            resp.status_code, str(detail or e)
+                        ) from None
+            return items
+
+        if use_cache:
+            cached = await self._cache.get(cache_key)
+            if cached is not None:
+                self._revalidate_soon(path, cache_key, load)
+                return cached
+        return await self._read(
+            path, cache_key, load, cache=use_cache, fallback=fallback
+        )
+
+    async def _read(
+        self,
+        path: str,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        *,
+        cache: bool,
+        fallback: bool = True,
+    ) -> Any:
+        """Run *load*, the GET of *path* cached under *key*, through the breaker.
+
+        The result is cached unless a mutation went through meanwhile. While
+        the endpoint is failing, the last result for *key* is returned
+        instead and the tool call is marked stale, if *fallback* allows.
+        Results are kept for that only if *cache* or *fallback* is set.
+        """
+        mutations = self._mutations
+        endpoint = endpoint_key(path)
+        if self._breaker is not None and not self._breaker.allow(endpoint):
+            return self._stale(key, endpoint, fallback)
+        try:
+            data = await load()
+        except Exception as e:
+            if self._breaker is None or not is_transient(e):
+                self._record(endpoint, e)
+                raise
+            if self._record(endpoint, e):
+                self._probe(path, key, load)
+            return self._stale(key, endpoint, fallback, e)
+        self._record(endpoint, None)
+        if cache or fallback:
+            self._remember(key, data)
+        if cache and mutations == self._mutations:
+            await self._cache.set(key, data)
+        return data
+
+    def _record(self, endpoint: str, error: BaseException | None) -> bool:
+        """Tell the breaker how a request went; True if that opened the circuit."""
+        if self._breaker is None:
+            return False
+        return self._breaker.record(endpoint, error is None or not is_transient(error))
+
+    def _remember(self, key: str, data: Any) -> None:
+        self._last_good[key] = (time.monotonic(), data)
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > _LAST_GOOD_ENTRIES:
+            self._last_good.popitem(last=False)
+
+    def _stale(
+        self,
+        key: str,
+        endpoint: str,
+        fallback: bool,
+        error: BaseException | None = None,
+    ) -> Any:
+        """The last result for *key*, if recent enough; raise otherwise."""
+        item = self._last_good.get(key) if fallback else None
+        if item is not None:
+            age = time.monotonic() - item[0]
+            if age <= self._stale_max_age:
+                self._breaker.stats.stale_served += 1
+                note_stale(age)
+                return item[1]
+        if error is not None:
+            raise error
+        raise self._unavailable(endpoint)
+
+    def _unavailable(self, endpoint: str) -> SplitwiseAPIError:
+        return SplitwiseAPIError(
+            503,
+            f"Splitwise is failing on {endpoint}; not retrying for another "
+            f"{math.ceil(self._breaker.retry_in(endpoint))}s",
+        )
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run *coro* as a background-priority task owned by this client."""
+        with priority(BACKGROUND):
+            task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _revalidate_soon(
+        self, path: str, key: str, load: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh the cached *key* in the background if it is about to expire."""
+        if self._revalidate_after is None or key in self._refreshing:
+            return
+        item = self._last_good.get(key)
+        # Entries from the shared cache tier were not fetched here; let them be
+        if item is None or time.monotonic() - item[0] < self._revalidate_after:
+            return
+        self._refreshing.add(key)
+
+        async def revalidate() -> None:
+            try:
+                await self._read(path, key, load, cache=True, fallback=False)
+            except Exception as e:  # noqa: BLE001 — the cached copy stays until it expires
+                logger.debug("Revalidating %s failed: %s", key, e)
+            finally:
+                self._refreshing.discard(key)
+
+        self._spawn(revalidate())
+
+    def _probe(self, path: str, key: str, load: Callable[[], Awaitable[Any]]) -> None:
+        """Retry *load* in the background until the endpoint's circuit closes."""
+        breaker = self._breaker
+        endpoint = endpoint_key(path)
+        if endpoint in self._probing:
+            return
+        self._probing.add(endpoint)
+
+        async def probe() -> None:
+            try:
+                while breaker.is_open(endpoint):
+                    await asyncio.sleep(max(1.0, breaker.retry_in(endpoint)))
+                    if not breaker.allow(endpoint):
+                        continue
+                    breaker.stats.probes += 1
+                    try:
+                        data = await load()
+                    except Exception as e:  # noqa: BLE001 — recorded; the loop decides
+                        breaker.record(endpoint, not is_transient(e))
+                        continue
+                    breaker.record(endpoint, True)
+                    self._remember(key, data)
+            finally:
+                self._probing.discard(endpoint)
+
+        self._spawn(probe())
+
+    async def _hedged_get(
+        self, path: str, params: dict[str, Any] | None
+    ) -> httpx.Response:
+        """Issue a GET, duplicating it if it outlives the hedge threshold."""
+        hedge = self._hedge
+        key = endpoint_key(path)
+        hedge.on_request()
+        start = time.monotonic()
+        primary = asyncio.create_task(
+            self._client.get(path, params=params, headers=self._auth)
+        )
+        pending = {primary}
+        delay = hedge.delay_for(key)
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and hedge.try_acquire():
+                    pending.add(
+                        asyncio.create_task(
+                            self._client.get(path, params=params, headers=self._auth)
+                        )
+                    )
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            hedge.stats.hedge_wins += 1
+                        hedge.record(key, time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def _post(self, path: str, json: dict[str, Any] | None = None) -> Any:
-        resp = await self._client.post(path, json=json)
-        return self._handle(resp)
+        endpoint = endpoint_key(path)
+        if self._breaker is not None and not self._breaker.allow(endpoint):
+            raise self._unavailable(endpoint)
+        try:
+            async with self._slot():
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire()
+                resp = await self._client.post(path, json=json, headers=self._auth)
+            data = self._handle(resp)
+        except Exception as e:
+            self._record(endpoint, e)
+            raise
+        else:
+            self._record(endpoint, None)
+            return data
+        finally:
+            # Any mutation may change what every cached read returns
+            self._mutations += 1
+            self.names.mark_stale()
+            if self._reference is not None:
+                self._reference.mark_stale()
+            if self._cache is not None:
+                await self._cache.clear()
+
+    async def preflight_expense(
+        self,
+        *,
+        cost: str | None = None,
+        users: list[dict[str, Any]] | None = None,
+        category_id: int | None = None,
+        currency_code: str | None = None,
+        group_id: int | None = None,
+        current_currency: str | None = None,
+    ) -> None:
+        """Reject an expense create/update that Splitwise would refuse.
+
+        Amounts are checked at the scale of ``currency_code``, or, for an
+        update that keeps its currency, of ``current_currency``.
+        """
+        check_expense(cost, users, currency_code or current_currency)
+        if self._reference is None:
+            return
+        problems = await self._reference.problems(
+            category_id=category_id,
+            currency_code=currency_code,
+            group_id=group_id,
+            user_ids=[u["user_id"] for u in users or () if u.get("user_id")],
+        )
+        if problems:
+            raise UnknownReferenceError(problems)
+
+    def _ingest_expense(self, expense: dict) -> dict:
+        """Feed an expense read or written through this client to its indexes."""
+        self.indexes.observe(expense)
+        return self.store.add_expense(expense) if self.store else expense
+
+    def _ingest_body(self, data: Any) -> Any:
+        """Swap the entities in a GET body for their stored records.
+
+        Applied before caching, so the response cache and the stale fallback
+        hold the store's records rather than a second, raw copy.
+        """
+        if not isinstance(data, dict):
+            return data
+        if isinstance(data.get("expense"), dict):
+            data["expense"] = self._ingest_expense(data["expense"])
+        if self.store is not None:
+            if isinstance(data.get("group"), dict):
+                data["group"] = self.store.add_group(data["group"])
+            if isinstance(data.get("groups"), list):
+                data["groups"] = [self.store.add_group(g) for g in data["groups"]]
+        return data
+
+    def _store_expenses(self, data: dict) -> dict:
+        if data.get("expenses"):
+            data["expenses"] = [self._ingest_expense(e) for e in data["expenses"]]
+        return data
 
     @staticmethod
     def _handle(resp: httpx.Response) -> Any:
@@ -80,7 +682,9 @@ class SplitwiseClient:
 
     async def get_current_user(self) -> dict:
         data = await self._get("/get_current_user")
-        return data.get("user", data)
+        user = data.get("user", data)
+        self.names.set_current_user(user)
+        return user
 
     async def get_user(self, user_id: int) -> dict:
         data = await self._get(f"/get_user/{user_id}")
@@ -115,11 +719,13 @@ class SplitwiseClient:
     # ------------------------------------------------------------------
 
     async def get_groups(self) -> list[dict]:
-        data = await self._get("/get_groups")
-        return data.get("groups", data)
+        data = await self._get("/get_groups", ingest=self._ingest_body)
+        groups = data.get("groups", data)
+        self.names.set_groups(groups)
+        return groups
 
     async def get_group(self, group_id: int) -> dict:
-        data = await self._get(f"/get_group/{group_id}")
+        data = await self._get(f"/get_group/{group_id}", ingest=self._ingest_body)
         return data.get("group", data)
 
     async def create_group(
@@ -182,7 +788,9 @@ class SplitwiseClient:
 
     async def get_friends(self) -> list[dict]:
         data = await self._get("/get_friends")
-        return data.get("friends", data)
+        friends = data.get("friends", data)
+        self.names.set_friends(friends)
+        return friends
 
     async def get_friend(self, friend_id: int) -> dict:
         data = await self._get(f"/get_friend/{friend_id}")
@@ -219,7 +827,21 @@ class SplitwiseClient:
     # ------------------------------------------------------------------
 
     async def get_expense(self, expense_id: int) -> dict:
-        data = await self._get(f"/get_expense/{expense_id}")
+        data = await self._get(f"/get_expense/{expense_id}", ingest=self._ingest_body)
+        return data.get("expense", data)
+
+    async def current_expense(self, expense_id: int, *, fresh: bool = False) -> dict:
+        """The expense as last read or written here, fetched on a store miss.
+
+        With *fresh* it is always fetched, bypassing the store and the cache.
+        """
+        if not fresh and self.store is not None:
+            stored = self.store.get("expense", expense_id)
+            if stored is not None:
+                return stored
+        data = await self._get(
+            f"/get_expense/{expense_id}", use_cache=not fresh, ingest=self._ingest_body
+        )
         return data.get("expense", data)
 
     async def get_expenses(
@@ -233,7 +855,9 @@ class SplitwiseClient:
         updated_before: str | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        fields: Spec | None = EXPENSE_FIELDS,
     ) -> list[dict]:
+        """List expenses, trimmed to ``fields`` (``None`` keeps everything)."""
         params: dict[str, Any] = {}
         if group_id is not None:
             params["group_id"] = group_id
@@ -251,8 +875,63 @@ class SplitwiseClient:
             params["limit"] = limit
         if offset is not None:
             params["offset"] = offset
-        data = await self._get("/get_expenses", params=params)
-        return data.get("expenses", data)
+        return await self._get_items(
+            "/get_expenses",
+            "expenses",
+            params,
+            fields=fields,
+            ingest=self._ingest_expense,
+        )
+
+    async def iter_expenses(
+        self,
+        *,
+        page_size: int = 500,
+        group_id: int | None = None,
+        friend_id: int | None = None,
+        dated_after: str | None = None,
+        dated_before: str | None = None,
+        updated_after: str | None = None,
+        updated_before: str | None = None,
+        fields: Spec | None = EXPENSE_FIELDS,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield every matching expense, one page at a time.
+
+        Pages bypass the response cache and are parsed as they stream in,
+        trimmed to ``fields``, so walking the full history keeps only the
+        current (projected) page in memory.
+        """
+        params: dict[str, Any] = {"limit": page_size}
+        if group_id is not None:
+            params["group_id"] = group_id
+        if friend_id is not None:
+            params["friend_id"] = friend_id
+        if dated_after is not None:
+            params["dated_after"] = dated_after
+        if dated_before is not None:
+            params["dated_before"] = dated_before
+        if updated_after is not None:
+            params["updated_after"] = updated_after
+        if updated_before is not None:
+            params["updated_before"] = updated_before
+        offset = 0
+        while True:
+            params["offset"] = offset
+            # Pages are not kept for stale fallback, so a walk holds one
+            # page at a time
+            page = await self._get_items(
+                "/get_expenses",
+                "expenses",
+                params,
+                fields=fields,
+                use_cache=False,
+                fallback=False,
+            )
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += len(page)
 
     async def create_expense(
         self,
@@ -268,6 +947,13 @@ class SplitwiseClient:
         details: str | None = None,
         users: list[dict[str, Any]] | None = None,
     ) -> dict:
+        await self.preflight_expense(
+            cost=cost,
+            users=users,
+            category_id=category_id,
+            currency_code=currency_code,
+            group_id=group_id,
+        )
         body: dict[str, Any] = {
             "cost": cost,
             "description": description,
@@ -293,7 +979,7 @@ class SplitwiseClient:
         # 200 OK doesn't mean success — check errors
         if "errors" in data and data["errors"]:
             raise SplitwiseAPIError(200, str(data["errors"]))
-        return data
+        return self._store_expenses(data)
 
     async def update_expense(
         self,
@@ -308,35 +994,71 @@ class SplitwiseClient:
         repeat_interval: str | None = None,
         details: str | None = None,
         users: list[dict[str, Any]] | None = None,
+        expected_updated_at: str | None = None,
     ) -> dict:
-        body: dict[str, Any] = {}
-        if cost is not None:
-            body["cost"] = cost
-        if description is not None:
-            body["description"] = description
-        if group_id is not None:
-            body["group_id"] = group_id
-        if currency_code is not None:
-            body["currency_code"] = currency_code
-        if category_id is not None:
-            body["category_id"] = category_id
-        if date is not None:
-            body["date"] = date
-        if repeat_interval is not None:
-            body["repeat_interval"] = repeat_interval
-        if details is not None:
-            body["details"] = details
-        if users:
-            for i, user in enumerate(users):
-                for key, val in user.items():
-                    body[f"users__{i}__{key}"] = val
+        """Send only the fields that differ from the current expense.
+
+        The current expense comes from :meth:`current_expense`, so an
+        expense read or written earlier costs no GET, unless
+        ``expected_updated_at`` is given, in which case it is fetched fresh
+        and :class:`ConflictError` is raised if it has been updated since.
+        An update that changes nothing (including one already applied)
+        returns the current expense, marked ``unchanged``, without a POST.
+        A changed split is sent whole, since Splitwise replaces all shares
+        at once.
+        """
+        current = await self.current_expense(
+            expense_id, fresh=expected_updated_at is not None
+        )
+        try:
+            changes = expense_changes(
+                current,
+                {
+                    "cost": cost,
+                    "description": description,
+                    "group_id": group_id,
+                    "currency_code": currency_code,
+                    "category_id": category_id,
+                    "date": date,
+                    "repeat_interval": repeat_interval,
+                    "details": details,
+                    "users": users or None,
+                },
+            )
+        except SplitError as e:
+            raise SplitValidationError(str(e)) from e
+        if not changes:
+            return {"expenses": [current], "errors": {}, "unchanged": True}
+        if (
+            expected_updated_at is not None
+            and current.get("updated_at") != expected_updated_at
+        ):
+            raise ConflictError(
+                expense_id, expected_updated_at, current.get("updated_at")
+            )
+        await self.preflight_expense(
+            # New shares must add up to the cost the expense will have
+            cost=changes.get("cost", current.get("cost") if users else None),
+            users=changes.get("users"),
+            category_id=changes.get("category_id"),
+            currency_code=changes.get("currency_code"),
+            group_id=changes.get("group_id"),
+            current_currency=current.get("currency_code"),
+        )
+        body = {k: v for k, v in changes.items() if k != "users"}
+        for i, user in enumerate(changes.get("users") or ()):
+            for key, val in user.items():
+                body[f"users__{i}__{key}"] = val
         data = await self._post(f"/update_expense/{expense_id}", json=body)
         if "errors" in data and data["errors"]:
             raise SplitwiseAPIError(200, str(data["errors"]))
-        return data
+        return self._store_expenses(data)
 
     async def delete_expense(self, expense_id: int) -> dict:
         data = await self._post(f"/delete_expense/{expense_id}")
+        self.indexes.forget(expense_id)
+        if self.store is not None:
+            self.store.forget("expense", expense_id)
         return self._check_success(data)
 
     async def undelete_expense(self, expense_id: int) -> dict:
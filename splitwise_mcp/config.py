@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -11,20 +14,130 @@ class Settings(BaseSettings):
     Reads from environment variables or a `.env` file in the project root.
     """
 
-    # Required — Splitwise Bearer API key
-    splitwise_api_key: str
+    # Splitwise Bearer API key — required unless multi_tenant is enabled
+    splitwise_api_key: str | None = None
 
     # Splitwise API base URL (v3.0)
     splitwise_base_url: str = "https://secure.splitwise.com/api/v3.0"
 
+    # Serving — "stdio" for a single local client, "http" (streamable HTTP)
+    # or "sse" to serve many clients across `workers` processes
+    transport: Literal["stdio", "http", "sse"] = "stdio"
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 1
+    # Stateless HTTP lets any worker answer any request; defaults to on when
+    # workers > 1, since stateful sessions live in a single worker's memory
+    stateless_http: bool | None = None
+    # Seconds to let in-flight requests finish on SIGTERM before exiting
+    shutdown_timeout: float = 30.0
+
+    # Hedged GETs — duplicate a read that is slower than the endpoint's recent
+    # p-th percentile latency, spending at most `hedge_budget` extra requests
+    # per request sent
+    hedge_requests: bool = False
+    hedge_percentile: float = 0.95
+    hedge_budget: float = 0.05
+
+    # Seconds to keep GET responses cached; any mutation clears the cache.
+    # Defaults to 30 in multi-tenant mode and to 0 (off) otherwise, so a
+    # single-user server shows edits made elsewhere at once unless asked
+    cache_ttl: float | None = None
+    # Read-tool results kept (for up to cache_ttl) and reused for identical
+    # calls until a mutation touches their data; 0 disables the memo
+    tool_memo_size: int = 512
+    # "memory" keeps the cache per process; "sqlite" adds a tier shared by
+    # every worker on the host (WAL-mode database at cache_path)
+    cache_backend: Literal["memory", "sqlite"] = "memory"
+    cache_path: str = ".splitwise_cache.sqlite3"
+    # Seconds to keep categories, currencies, groups and friends for checking
+    # expense arguments before they are sent; 0 disables the checks
+    reference_ttl: float = 3600.0
+    # Memory budget (MB) for the normalized store of expenses and groups read
+    # through each client; tenants get their own, smaller budget
+    store_max_mb: float = 32.0
+    # Seconds between checks of subscribed resources for changes (they are
+    # also checked right after a mutation); 0 disables update notifications
+    resource_poll_interval: float = 60.0
+    # Requests in flight per client (per tenant in multi-tenant mode);
+    # background work (index syncs, journal flushes, subscription checks)
+    # and bulk work (imports, exports) get at most their own caps, so
+    # interactive tool calls keep a share. 0 disables scheduling
+    max_concurrent_requests: int = 8
+    background_max_concurrent: int = 4
+    bulk_max_concurrent: int = 2
+    # Per-endpoint circuit breaker: once `breaker_failure_rate` of recent
+    # requests to an endpoint fail (5xx, 429, timeouts), fail fast for
+    # `breaker_cooldown` seconds and answer reads with the last response,
+    # up to `stale_max_age` seconds old, marked stale
+    circuit_breaker: bool = True
+    breaker_failure_rate: float = 0.5
+    breaker_cooldown: float = 15.0
+    stale_max_age: float = 86400.0
+    # Fraction of cache_ttl after which a cache hit is refreshed in the
+    # background, so hot entries rarely expire; 0 disables
+    cache_revalidate_after: float = 0.75
+
+    # Record every Splitwise request/response (latency included, credentials
+    # redacted) to a cassette, or serve a recorded cassette instead of the
+    # API, optionally with the recorded latencies. Tool calls can be logged
+    # by session for `splitwise-mcp loadgen`. Record with a single worker
+    record_cassette: str | None = None
+    replay_cassette: str | None = None
+    replay_latency: bool = False
+    record_sessions: str | None = None
+
+    # Background jobs (exports and imports started with background=True):
+    # at most `job_max_workers` run at once, and their state and results
+    # are kept in `jobs_path` across restarts. Jobs need a single worker;
+    # 0 disables them
+    job_max_workers: int = 2
+    jobs_path: str = ".splitwise_jobs.jsonl"
+
     # Future OAuth fields (optional, for SaaS upgrade)
     oauth_client_id: str | None = None
     oauth_client_secret: str | None = None
     oauth_redirect_uri: str | None = None
 
+    # Directories the export/import tools write to and read from (tool paths
+    # are relative to these)
+    export_dir: str = "exports"
+    import_dir: str = "imports"
+
+    # Hosted mode — one client per OAuth access token (sent by the MCP client
+    # as a Bearer token), all sharing a single connection pool
+    multi_tenant: bool = False
+    tenant_max_clients: int = 1000
+    tenant_idle_ttl: float = 900.0
+    tenant_rate_limit: float = 5.0
+    tenant_rate_burst: int = 10
+    tenant_store_max_mb: float = 2.0
+    http_max_connections: int = 100
+
+    # Write-behind mode — queue mutations in a local journal and flush them
+    # to Splitwise in the background instead of blocking on each POST.
+    # Needs a single worker, since the journal belongs to one process
+    write_behind: bool = False
+    journal_path: str = ".splitwise_journal.jsonl"
+    journal_batch_size: int = 20
+    journal_max_attempts: int = 5
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
         # The .env file uses API_KEY but we map it here
         "extra": "ignore",
     }
+
+    @model_validator(mode="after")
+    def _check_credentials(self) -> Settings:
+        if not self.multi_tenant and not self.splitwise_api_key:
+            raise ValueError("SPLITWISE_API_KEY is required unless MULTI_TENANT is set")
+        if self.multi_tenant and self.write_behind:
+            raise ValueError("WRITE_BEHIND is not supported together with MULTI_TENANT")
+        if self.cache_ttl is None:
+            self.cache_ttl = 30.0 if self.multi_tenant else 0.0
+        if self.workers > 1 and self.write_behind:
+            # Every worker would replay and compact the same journal file
+            raise ValueError("WRITE_BEHIND needs a single worker (WORKERS=1)")
+        return self
@@ -0,0 +1,255 @@
+"""Near-duplicate expense detection with MinHash locality-sensitive hashing.
+
+Each expense's description is normalized and cut into character 3-gram
+shingles, summarized by a one-permutation MinHash signature of
+``_ROWS * _BANDS`` values.
+The signature is split into bands; two expenses land in the same bucket
+when one band matches *and* they share a group, an amount bucket and a
+date bucket. With 8 bands of 2 rows, descriptions with a Jaccard
+similarity of about 0.35 or more collide with even odds, and higher
+similarity makes a collision almost certain. Candidate pairs come only from
+shared buckets, so finding them is near-linear in the number of expenses
+instead of quadratic, and each pair is then checked against the exact
+date and amount limits and the exact Jaccard similarity of its shingles.
+
+Amounts are bucketed on a log scale of width ``amount_tolerance`` and
+dates in windows of ``window_days``. Lookups also probe the neighbouring
+buckets, so pairs just across a bucket edge are not missed.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from splitwise_mcp.indexing import ExpenseIndex
+from splitwise_mcp.money import places
+from splitwise_mcp.splits import SplitError, from_minor, to_minor
+from splitwise_mcp.streaming import fields_spec
+
+DUPLICATE_FIELDS = fields_spec(
+    (
+        "id",
+        "description",
+        "cost",
+        "currency_code",
+        "group_id",
+        "date",
+        "payment",
+        "created_by.id",
+        "updated_at",
+        "deleted_at",
+    )
+)
+
+_ROWS = 2
+_BANDS = 8
+_BINS = _ROWS * _BANDS
+_VALUE_BITS = 28  # 32-bit mixed hash: 4 bits pick the bin, 28 are the value
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_EMPTY = 1 << 32
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def shingles(text: str) -> set[int]:
+    """Hashed character 3-grams of the normalized *text*."""
+    words = _PUNCTUATION.sub(" ", text.casefold()).split()
+    norm = f" {' '.join(words)} "
+    if len(norm) <= 3:
+        return {zlib.crc32(norm.encode())} if words else set()
+    return {zlib.crc32(norm[i : i + 3].encode()) for i in range(len(norm) - 2)}
+
+
+def minhash(hashes: set[int]) -> tuple[int, ...]:
+    """One-permutation MinHash of *hashes*, one value per bin.
+
+    Each hash is mixed once and falls into one of ``_BINS`` bins, keeping
+    the smallest value per bin, rather than being rehashed ``_BINS`` times.
+    Empty bins borrow from the next non-empty bin to their right, offset by
+    the distance, so equal sets still get equal signatures.
+    """
+    bins = [_EMPTY] * _BINS
+    for h in hashes:
+        mixed = (h * 0x9E3779B1) & 0xFFFFFFFF
+        b = mixed >> _VALUE_BITS
+        if (mixed & _VALUE_MASK) < bins[b]:  # noqa: PLR1730 - min() is slower here
+            bins[b] = mixed & _VALUE_MASK
+    sig = list(bins)
+    for i in range(_BINS):
+        if bins[i] == _EMPTY:
+            for d in range(1, _BINS):
+                if bins[(i + d) % _BINS] != _EMPTY:
+                    sig[i] = bins[(i + d) % _BINS] + (d << _VALUE_BITS)
+                    break
+    return tuple(sig)
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+@dataclass(slots=True)
+class _Entry:
+    expense_id: int
+    group_id: int
+    description: str
+    cents: int
+    currency_code: str
+    day: int  # proleptic ordinal
+    created_by: int | None
+    bands: tuple[int, ...]  # one hash per LSH band
+
+
+@dataclass
+class DuplicatePair:
+    first: dict[str, Any]
+    second: dict[str, Any]
+    similarity: float
+
+
+# (amount, day) cell offsets probed for candidates
+_FORWARD = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+class DuplicateIndex(ExpenseIndex):
+    """MinHash-LSH buckets over every non-payment expense."""
+
+    fields = DUPLICATE_FIELDS
+
+    def __init__(
+        self,
+        *,
+        window_days: int = 3,
+        amount_tolerance: float = 0.02,
+    ) -> None:
+        self.window_days = window_days
+        self.amount_tolerance = amount_tolerance
+        # Wide enough that amounts within tolerance are at most a cell apart
+        self._log_step = -math.log1p(-amount_tolerance)
+        self._entries: dict[int, _Entry] = {}
+        self._buckets: defaultdict[tuple, set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _cells(self, entry: _Entry) -> tuple[int, int]:
+        return (
+            int(math.log(entry.cents) / self._log_step),
+            entry.day // self.window_days,
+        )
+
+    @staticmethod
+    def _keys(entry: _Entry, amount: int, day: int) -> list[tuple]:
+        scope = (entry.group_id, entry.currency_code, amount, day)
+        return [(*scope, band, value) for band, value in enumerate(entry.bands)]
+
+    def _apply(self, expense: dict[str, Any]) -> None:
+        expense_id = expense["id"]
+        self.forget(expense_id)
+        if expense.get("deleted_at") or expense.get("payment"):
+            return
+        description = expense.get("description") or ""
+        hashes = shingles(description)
+        try:
+            cents = to_minor(
+                expense.get("cost") or 0, places(expense.get("currency_code"))
+            )
+            day = date.fromisoformat((expense.get("date") or "")[:10]).toordinal()
+        except (SplitError, ValueError):
+            return
+        if not hashes or cents <= 0:
+            return
+        entry = _Entry(
+            expense_id=expense_id,
+            group_id=expense.get("group_id") or 0,
+            description=description,
+            cents=cents,
+            currency_code=expense.get("currency_code") or "",
+            day=day,
+            created_by=(expense.get("created_by") or {}).get("id"),
+            bands=_bands(minhash(hashes)),
+        )
+        self._entries[expense_id] = entry
+        for key in self._keys(entry, *self._cells(entry)):
+            self._buckets[key].add(expense_id)
+
+    def forget(self, expense_id: int) -> None:
+        entry = self._entries.pop(expense_id, None)
+        if entry is None:
+            return
+        for key in self._keys(entry, *self._cells(entry)):
+            bucket = self._buckets[key]
+            bucket.discard(expense_id)
+            if not bucket:
+                del self._buckets[key]
+
+    def _candidates(self, entry: _Entry) -> set[int]:
+        """IDs sharing a band bucket with *entry* in its or the next cells.
+
+        Only the cells at or above *entry*'s are probed: a pair in adjacent
+        cells is found from the lower one, which halves the lookups.
+        """
+        amount, day = self._cells(entry)
+        found: set[int] = set()
+        for da, dd in _FORWARD:
+            for key in self._keys(entry, amount + da, day + dd):
+                bucket = self._buckets.get(key)
+                if bucket:
+                    found |= bucket
+        found.discard(entry.expense_id)
+        return found
+
+    def _matches(self, a: _Entry, b: _Entry, min_similarity: float) -> float | None:
+        if abs(a.day - b.day) > self.window_days:
+            return None
+        if abs(a.cents - b.cents) > self.amount_tolerance * max(a.cents, b.cents):
+            return None
+        # Exact similarity; the signatures only pick the candidates
+        score = jaccard(shingles(a.description), shingles(b.description))
+        return score if score >= min_similarity else None
+
+    def pairs(
+        self, *, group_id: int | None = None, min_similarity: float = 0.5
+    ) -> list[DuplicatePair]:
+        """Likely duplicate pairs, most similar first."""
+        found: list[DuplicatePair] = []
+        for entry in self._entries.values():
+            if group_id is not None and entry.group_id != group_id:
+                continue
+            cell = self._cells(entry)
+            for other_id in self._candidates(entry):
+                other = self._entries[other_id]
+                # A pair in one cell is seen from both sides; keep one
+                if other_id < entry.expense_id and self._cells(other) == cell:
+                    continue
+                score = self._matches(entry, other, min_similarity)
+                if score is not None:
+                    found.append(
+                        DuplicatePair(_describe(entry), _describe(other), score)
+                    )
+        found.sort(key=lambda p: (-p.similarity, p.first["date"]))
+        return found
+
+    def stats(self) -> dict[str, int]:
+        return {"expenses": len(self._entries), "buckets": len(self._buckets)}
+
+
+def _bands(sig: tuple[int, ...]) -> tuple[int, ...]:
+    return tuple(hash(sig[i : i + _ROWS]) for i in range(0, _BINS, _ROWS))
+
+
+def _describe(entry: _Entry) -> dict[str, Any]:
+    return {
+        "id": entry.expense_id,
+        "description": entry.description,
+        "cost": from_minor(entry.cents, places(entry.currency_code)),
+        "currency_code": entry.currency_code,
+        "group_id": entry.group_id or None,
+        "date": date.fromordinal(entry.day).isoformat(),
+        "created_by": entry.created_by,
+    }
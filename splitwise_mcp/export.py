@@ -0,0 +1,231 @@
+"""Streaming export of expense history to JSONL, CSV or Parquet.
+
+Pages from ``SplitwiseClient.iter_expenses`` are projected onto the
+requested fields and written straight to the output file, so memory use is
+bounded by one page regardless of how long the history is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+from splitwise_mcp.client import SplitwiseClient
+from splitwise_mcp.streaming import fields_spec
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+# Dotted paths reach into nested objects, e.g. "category.name", and map over
+# lists, e.g. "users.owed_share" is the list of every user's owed share
+DEFAULT_FIELDS = (
+    "id",
+    "date",
+    "description",
+    "cost",
+    "currency_code",
+    "group_id",
+    "category.name",
+    "payment",
+    "created_by.id",
+    "updated_at",
+    "deleted_at",
+)
+
+
+@dataclass
+class ExportResult:
+    path: str
+    format: str
+    rows: int
+    pages: int
+    seconds: float
+
+
+# Expense fields holding lists of objects
+_LIST_FIELDS = ("users", "repayments")
+
+
+def _pluck(value: Any, parts: list[str]) -> Any:
+    for i, part in enumerate(parts):
+        if isinstance(value, list):
+            return [_pluck(v, parts[i:]) for v in value]
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _project(
+    expense: dict[str, Any], paths: list[tuple[str, list[str]]]
+) -> dict[str, Any]:
+    return {field: _pluck(expense, parts) for field, parts in paths}
+
+
+class _Writer(Protocol):
+    def write(self, rows: list[dict[str, Any]]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class _JsonlWriter:
+    def __init__(self, path: Path, fields: tuple[str, ...]) -> None:
+        self._fh = path.open("w", encoding="utf-8")
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._fh.writelines(
+            json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for r in rows
+        )
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, fields: tuple[str, ...]) -> None:
+        self._fh = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._fh, fieldnames=fields)
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        for r in rows:
+            self._writer.writerow(
+                {
+                    k: json.dumps(v) if isinstance(v, dict | list) else v
+                    for k, v in r.items()
+                }
+            )
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class _ParquetWriter:
+    """One Parquet row group per page; requires the optional ``pyarrow``."""
+
+    def __init__(self, path: Path, fields: tuple[str, ...]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError(
+                "Parquet export needs pyarrow: install splitwise-mcp[parquet]"
+            ) from e
+        self._pa = pa
+        self._fields = fields
+        # Values under a list field are lists, stored as JSON strings
+        self._schema = pa.schema(
+            [
+                (
+                    f,
+                    pa.string()
+                    if f.split(".")[0] in _LIST_FIELDS
+                    else pa.int64()
+                    if f == "id" or f.endswith(("_id", ".id"))
+                    else pa.bool_()
+                    if f in ("payment", "repeats")
+                    else pa.string(),
+                )
+                for f in fields
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        columns = {}
+        for field, dtype in zip(self._fields, self._schema.types, strict=True):
+            values = [r[field] for r in rows]
+            if dtype == self._pa.string():
+                values = [
+                    json.dumps(v) if isinstance(v, dict | list) else v for v in values
+                ]
+            columns[field] = values
+        self._writer.write_table(
+            self._pa.Table.from_pydict(columns, schema=self._schema)
+        )
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS: dict[str, type[_Writer]] = {
+    "jsonl": _JsonlWriter,
+    "csv": _CsvWriter,
+    "parquet": _ParquetWriter,
+}
+
+
+def infer_format(path: str) -> str:
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return {"json": "jsonl", "ndjson": "jsonl", "pq": "parquet"}.get(suffix, suffix)
+
+
+async def export_expenses(
+    client: SplitwiseClient,
+    path: str,
+    *,
+    format: str | None = None,
+    fields: list[str] | None = None,
+    include_deleted: bool = False,
+    include_payments: bool = True,
+    page_size: int = 500,
+    group_id: int | None = None,
+    friend_id: int | None = None,
+    dated_after: str | None = None,
+    dated_before: str | None = None,
+    updated_after: str | None = None,
+    updated_before: str | None = None,
+    progress: Callable[[int, int | None], Awaitable[None]] | None = None,
+) -> ExportResult:
+    """Stream every matching expense into *path* and report what was written.
+
+    *progress* is awaited with the rows written so far after every page.
+    """
+    fmt = format or infer_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}; use one of {FORMATS}")
+    columns = tuple(fields) if fields else DEFAULT_FIELDS
+    paths = [(f, f.split(".")) for f in columns]
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    writer = _WRITERS[fmt](out, columns)
+    start = time.perf_counter()
+    rows = pages = 0
+    try:
+        async for page in client.iter_expenses(
+            page_size=page_size,
+            group_id=group_id,
+            friend_id=friend_id,
+            dated_after=dated_after,
+            dated_before=dated_before,
+            updated_after=updated_after,
+            updated_before=updated_before,
+            # Filters read deleted_at and payment even when not exported
+            fields=fields_spec((*columns, "deleted_at", "payment")),
+        ):
+            batch = [
+                _project(e, paths)
+                for e in page
+                if (include_deleted or not e.get("deleted_at"))
+                and (include_payments or not e.get("payment"))
+            ]
+            pages += 1
+            if batch:
+                # File I/O off the event loop; the page is dropped afterwards
+                await asyncio.to_thread(writer.write, batch)
+                rows += len(batch)
+            if progress is not None:
+                await progress(rows, None)
+    finally:
+        writer.close()
+    return ExportResult(
+        path=str(out),
+        format=fmt,
+        rows=rows,
+        pages=pages,
+        seconds=round(time.perf_counter() - start, 3),
+    )
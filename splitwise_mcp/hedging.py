@@ -0,0 +1,88 @@
+"""Hedged-request policy for idempotent GETs.
+
+A hedge is a duplicate of a request that has not completed within the
+endpoint's recent p-th percentile latency; whichever copy answers first
+wins. Hedges are limited by a global budget so they can never add more than
+a fixed fraction of extra load on the API.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_key(path: str) -> str:
+    """Collapse numeric path segments so ``/get_group/12`` → ``/get_group/{id}``."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    budget_denied: int = 0
+
+
+class HedgePolicy:
+    """Adaptive per-endpoint hedge thresholds plus a global token budget.
+
+    Every primary request earns ``budget`` tokens (capped at ``burst``) and
+    every hedge spends one, so over time hedges stay below ``budget`` times
+    the request rate.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        burst: float = 10.0,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self._percentile = percentile
+        self._budget = budget
+        self._burst = burst
+        self._window = window
+        self._min_samples = min_samples
+        self._min_delay = min_delay
+        self._samples: dict[str, deque[float]] = {}
+        self._tokens = 0.0
+        self.stats = HedgeStats()
+
+    def delay_for(self, key: str) -> float | None:
+        """Seconds to wait before hedging *key*, or None if there is too little history."""
+        samples = self._samples.get(key)
+        if samples is None or len(samples) < self._min_samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(self._percentile * len(ordered)))
+        return max(self._min_delay, ordered[idx])
+
+    def record(self, key: str, seconds: float) -> None:
+        """Record the latency of a completed request."""
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def on_request(self) -> None:
+        self.stats.requests += 1
+        self._tokens = min(self._burst, self._tokens + self._budget)
+
+    def try_acquire(self) -> bool:
+        """Spend one budget token on a hedge, if one is available."""
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.stats.hedges += 1
+            return True
+        self.stats.budget_denied += 1
+        return False
@@ -0,0 +1,19 @@
+"""Who the current request is for.
+
+In multi-tenant mode each request carries the user's OAuth token in its
+``Authorization`` header. :func:`caller_id` turns that into a short, stable
+digest used to keep per-user state apart (tool memo entries, background
+jobs, export and import directories) without keeping the token itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from fastmcp.server.dependencies import get_http_headers
+
+
+def caller_id() -> str:
+    """A digest of the caller's ``Authorization`` header; ``""`` without one."""
+    auth = get_http_headers(include_all=True).get("authorization", "")
+    return hashlib.sha256(auth.encode()).hexdigest()[:16] if auth else ""
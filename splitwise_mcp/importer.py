@@ -0,0 +1,357 @@
+"""Bulk import of expenses from CSV files and bank statements.
+
+The pipeline streams the CSV (it is never loaded whole), maps each row onto
+``create_expense`` arguments, validates the split locally, drops rows that
+duplicate an existing expense, and submits the rest with bounded
+concurrency. Progress is checkpointed next to the CSV so an interrupted
+import can be re-run and will resume where it stopped.
+
+Duplicates are detected with a hashed ``(date, cost, currency,
+description)`` index built from the existing expenses in the file's date
+range. File reads run in a worker thread, a batch of rows at a time, so a
+large statement does not stall other tool calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from splitwise_mcp.client import SplitwiseAPIError, SplitwiseClient
+from splitwise_mcp.money import places
+from splitwise_mcp.splits import SplitError, build_users
+from splitwise_mcp.streaming import fields_spec
+
+logger = logging.getLogger(__name__)
+
+# create_expense field → default CSV column
+DEFAULT_MAPPING = {
+    "date": "date",
+    "description": "description",
+    "cost": "cost",
+    "currency_code": "currency_code",
+    "category_id": "category_id",
+    "details": "details",
+}
+
+_AMOUNT_JUNK = re.compile(r"[^\d.\-]")
+# Rows read from the file per trip to the worker thread
+_ROW_BATCH = 500
+
+
+class ImportRowError(ValueError):
+    """A CSV row that cannot be turned into a valid expense."""
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    accepted: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    already_done: int = 0
+    dry_run: bool = False
+    errors: list[str] = field(default_factory=list)
+
+
+def _parse_amount(raw: str, places: int = 2) -> Decimal:
+    text = (raw or "").strip()
+    negative = text.startswith("(") and text.endswith(")")  # accounting style
+    try:
+        value = Decimal(_AMOUNT_JUNK.sub("", text))
+    except InvalidOperation as e:
+        raise ImportRowError(f"unreadable amount {raw!r}") from e
+    # Bank exports show debits as negative; the expense cost is the magnitude
+    value = abs(-value if negative else value).quantize(
+        Decimal(1).scaleb(-places), ROUND_HALF_UP
+    )
+    if value == 0:
+        raise ImportRowError("zero amount")
+    return value
+
+
+def _parse_date(raw: str, date_format: str | None) -> date:
+    text = (raw or "").strip()
+    try:
+        if date_format:
+            return datetime.strptime(text, date_format).date()
+        return date.fromisoformat(text[:10])
+    except ValueError as e:
+        raise ImportRowError(f"unreadable date {raw!r}") from e
+
+
+def dedupe_key(
+    day: str, cost: str | Decimal, currency_code: str, description: str
+) -> bytes:
+    """Digest of an expense's identity for duplicate detection."""
+    currency = (currency_code or "").upper()
+    amount = Decimal(str(cost)).quantize(
+        Decimal(1).scaleb(-places(currency)), ROUND_HALF_UP
+    )
+    text = " ".join((description or "").casefold().split())
+    return hashlib.blake2b(
+        f"{day[:10]}|{amount}|{currency}|{text}".encode(), digest_size=12
+    ).digest()
+
+
+def _split_users(
+    cost: Decimal, template: list[dict[str, Any]], currency: str
+) -> list[dict[str, Any]]:
+    """Turn a percentage template into exact shares that sum to ``cost``.
+
+    Each template entry has ``user_id`` and ``paid_percent``/``owed_percent``.
+    """
+    try:
+        return build_users(
+            cost,
+            [t["user_id"] for t in template],
+            owed_method="percent",
+            owed=[t.get("owed_percent", 0) for t in template],
+            paid_method="percent",
+            paid=[t.get("paid_percent", 0) for t in template],
+            places=places(currency),
+        )
+    except SplitError as e:
+        raise ImportRowError(str(e)) from e
+
+
+@dataclass
+class ImportPlan:
+    """How rows map onto ``create_expense``."""
+
+    mapping: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_MAPPING))
+    date_format: str | None = None
+    group_id: int | None = None
+    currency_code: str = "USD"
+    category_id: int | None = None
+    split_equally: bool = False
+    users: list[dict[str, Any]] | None = None
+
+    def __post_init__(self) -> None:
+        if not self.split_equally and not self.users:
+            raise ValueError("choose split_equally (with a group) or a users template")
+        if self.split_equally and self.group_id is None:
+            raise ValueError("split_equally needs a group_id")
+
+    def build(self, row: dict[str, str]) -> dict[str, Any]:
+        """Map one CSV row onto create_expense keyword arguments."""
+        m = self.mapping
+
+        def col(name: str) -> str:
+            column = m.get(name)
+            return (row.get(column) or "").strip() if column else ""
+
+        description = col("description")
+        if not description:
+            raise ImportRowError("missing description")
+        currency = (col("currency_code") or self.currency_code).upper()
+        cost = _parse_amount(col("cost"), places(currency))
+        day = _parse_date(col("date"), self.date_format)
+        kwargs: dict[str, Any] = {
+            "cost": str(cost),
+            "description": description[:255],
+            "date": day.isoformat(),
+            "currency_code": currency,
+            "group_id": self.group_id,
+            "details": col("details") or None,
+        }
+        category = col("category_id") or self.category_id
+        if category:
+            kwargs["category_id"] = int(category)
+        if self.split_equally:
+            kwargs["split_equally"] = True
+        else:
+            kwargs["users"] = _split_users(cost, self.users, currency)
+        return kwargs
+
+
+class _Checkpoint:
+    """Set of finished row numbers, persisted atomically next to the CSV."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.done: set[int] = set()
+        if path.exists():
+            self.done = set(json.loads(path.read_text())["done"])
+
+    def mark(self, row_number: int) -> None:
+        self.done.add(row_number)
+
+    def save(self) -> None:
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"done": sorted(self.done)}))
+        os.replace(tmp, self._path)
+
+
+def _read_rows(path: Path) -> Iterator[tuple[int, dict[str, str]]]:
+    with path.open("r", encoding="utf-8-sig", newline="") as fh:
+        yield from enumerate(csv.DictReader(fh), start=1)
+
+
+async def _row_batches(path: Path) -> AsyncIterator[list[tuple[int, dict[str, str]]]]:
+    """The rows of *path* in batches, each read in a worker thread."""
+    rows = _read_rows(path)
+    try:
+        while batch := await asyncio.to_thread(
+            list, itertools.islice(rows, _ROW_BATCH)
+        ):
+            yield batch
+    finally:
+        rows.close()
+
+
+def _scan(path: Path, plan: ImportPlan) -> tuple[int, date | None, date | None]:
+    """Count the rows of *path* and find the range of their dates."""
+    first = last = None
+    total = 0
+    for _, row in _read_rows(path):
+        total += 1
+        try:
+            day = _parse_date(
+                row.get(plan.mapping.get("date", "")) or "", plan.date_format
+            )
+        except ImportRowError:
+            continue
+        first = day if first is None or day < first else first
+        last = day if last is None or day > last else last
+    return total, first, last
+
+
+async def _existing_index(
+    client: SplitwiseClient, plan: ImportPlan, first: date, last: date
+) -> Counter[bytes]:
+    # A multiset: a file may legitimately repeat an identical expense, and
+    # each copy should only be matched against one existing expense.
+    index: Counter[bytes] = Counter()
+    async for page in client.iter_expenses(
+        group_id=plan.group_id,
+        dated_after=(first - timedelta(days=1)).isoformat(),
+        dated_before=(last + timedelta(days=1)).isoformat(),
+        fields=fields_spec(
+            ("date", "cost", "currency_code", "description", "deleted_at")
+        ),
+    ):
+        for e in page:
+            if not e.get("deleted_at"):
+                index[
+                    dedupe_key(
+                        e.get("date") or "",
+                        e.get("cost") or 0,
+                        e.get("currency_code") or "",
+                        e.get("description"),
+                    )
+                ] += 1
+    return index
+
+
+async def import_expenses(
+    client: SplitwiseClient,
+    path: str,
+    plan: ImportPlan,
+    *,
+    concurrency: int = 4,
+    dry_run: bool = False,
+    checkpoint_every: int = 20,
+    progress: Callable[[int, int | None], Awaitable[None]] | None = None,
+) -> ImportResult:
+    """Import every row of the CSV at *path* according to *plan*.
+
+    *progress* is awaited with the rows handled so far and the row count
+    after every row.
+    """
+    csv_path = Path(path)
+    checkpoint = _Checkpoint(csv_path.with_name(csv_path.name + ".checkpoint.json"))
+    result = ImportResult(dry_run=dry_run)
+
+    # Pass 1: the date range, to bound the existing-expense index
+    total, first, last = await asyncio.to_thread(_scan, csv_path, plan)
+    seen = await _existing_index(client, plan, first, last) if first else Counter()
+
+    # Pass 2: validate, dedupe and submit
+    slots = asyncio.Semaphore(concurrency)
+    tasks: set[asyncio.Task[None]] = set()
+    finished = 0
+
+    async def submit(row_number: int, kwargs: dict[str, Any]) -> None:
+        nonlocal finished
+        try:
+            await client.create_expense(**kwargs)
+        except SplitwiseAPIError as e:
+            result.failed += 1
+            result.errors.append(f"row {row_number}: {e}")
+        except httpx.HTTPError as e:
+            # Not retried: the POST may have created the expense, and a
+            # re-run's duplicate check will find it if so
+            result.failed += 1
+            result.errors.append(f"row {row_number}: {type(e).__name__}: {e}")
+        else:
+            result.created += 1
+            checkpoint.mark(row_number)
+            finished += 1
+            if finished % checkpoint_every == 0:
+                checkpoint.save()
+        finally:
+            slots.release()
+
+    try:
+        async for batch in _row_batches(csv_path):
+            for row_number, row in batch:
+                if progress is not None:
+                    # Rows still being submitted are not handled yet
+                    await progress(result.rows - len(tasks), total)
+                result.rows += 1
+                try:
+                    kwargs = plan.build(row)
+                except (ImportRowError, ValueError, ArithmeticError) as e:
+                    if row_number not in checkpoint.done:
+                        result.invalid += 1
+                        result.errors.append(f"row {row_number}: {e}")
+                    continue
+                key = dedupe_key(
+                    kwargs["date"],
+                    kwargs["cost"],
+                    kwargs["currency_code"],
+                    kwargs["description"],
+                )
+                # Rows created by an earlier run match their own expense here
+                matched = seen[key] > 0
+                if matched:
+                    seen[key] -= 1
+                if row_number in checkpoint.done:
+                    result.already_done += 1
+                    continue
+                if matched:
+                    result.duplicates += 1
+                    continue
+                result.accepted += 1
+                if dry_run:
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(submit(row_number, kwargs))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        if progress is not None:
+            await progress(result.rows, total)
+    finally:
+        if not dry_run:
+            checkpoint.save()
+    return result
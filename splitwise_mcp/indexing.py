@@ -0,0 +1,97 @@
+"""Local indexes over a user's expenses, kept current by one shared sync.
+
+An :class:`ExpenseIndex` holds a projection of the expense history and is
+updated incrementally: ``SplitwiseClient`` passes every expense it reads or
+writes to :meth:`ExpenseIndexes.observe`, which hands it to each index.
+
+:class:`ExpenseIndexes` keeps the indexes in step with Splitwise. Its
+first :meth:`~ExpenseIndexes.refresh` walks the full history once, with
+the union of the indexes' projections, and feeds every index from that one
+pass. Later refreshes fetch only expenses updated after the sync
+watermark. The watermark is the newest ``updated_at`` returned by a
+completed walk. Expenses seen elsewhere (filtered listings, single
+fetches, the client's own writes) never move it. Such reads may be newer
+than changes that have not been synced yet, and those changes would then
+be skipped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+from splitwise_mcp.scheduler import BACKGROUND, priority
+from splitwise_mcp.streaming import Spec, merge_specs
+
+if TYPE_CHECKING:
+    from splitwise_mcp.client import SplitwiseClient
+
+
+class ExpenseIndex(ABC):
+    """An index over expenses; :class:`ExpenseIndexes` keeps it synced."""
+
+    # Fields the index reads; must include id, updated_at, deleted_at
+    fields: Spec
+
+    def observe(self, expense: dict[str, Any]) -> None:
+        """Add, update or drop *expense*."""
+        if expense.get("id") is not None:
+            self._apply(expense)
+
+    @abstractmethod
+    def _apply(self, expense: dict[str, Any]) -> None:
+        """Bring the index in line with *expense*, which has an ``id``."""
+
+    @abstractmethod
+    def forget(self, expense_id: int) -> None:
+        """Drop everything known about *expense_id*."""
+
+
+class ExpenseIndexes:
+    """Several :class:`ExpenseIndex` objects synced by one expense walk."""
+
+    def __init__(self, *indexes: ExpenseIndex, max_age: float = 300.0) -> None:
+        self._indexes = indexes
+        self._max_age = max_age
+        self.fields: Spec = {}
+        for index in indexes:
+            self.fields = merge_specs(self.fields, index.fields)
+        self._watermark: str | None = None  # newest updated_at synced
+        self._synced_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def observe(self, expense: dict[str, Any]) -> None:
+        for index in self._indexes:
+            index.observe(expense)
+
+    def forget(self, expense_id: int) -> None:
+        for index in self._indexes:
+            index.forget(expense_id)
+
+    async def refresh(self, client: SplitwiseClient, *, force: bool = False) -> None:
+        """Catch up with Splitwise if the last sync is older than ``max_age``."""
+        async with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and self._synced_at is not None
+                and now - self._synced_at < self._max_age
+            ):
+                return
+            # First sync walks the history once; later ones fetch only changes
+            watermark = self._watermark
+            newest = watermark
+            with priority(BACKGROUND):
+                async for page in client.iter_expenses(
+                    updated_after=watermark, fields=self.fields
+                ):
+                    for expense in page:
+                        self.observe(expense)
+                        updated = expense.get("updated_at")
+                        if updated and (newest is None or updated > newest):
+                            newest = updated
+            # Only a completed walk moves the watermark
+            self._watermark = newest
+            self._synced_at = now
@@ -0,0 +1,408 @@
+"""Background jobs for work that does not fit in one tool call.
+
+A full export or a large import can run for longer than a client waits
+for a tool result. Tools hand such work to :class:`JobManager`, which
+returns a job ID at once and runs the job in the background at bulk
+priority, at most ``max_workers`` jobs at a time. ``job_status`` shows a
+job's progress and result, and can wait for it while sending MCP progress
+notifications; ``cancel_job`` stops it.
+
+Job state is an append-only JSONL file, one event per line::
+
+    {"id": "3f2a9c", "event": "submitted", "kind": "export", "params": {...}, "owner": "", "created_at": "..."}
+    {"id": "3f2a9c", "event": "started", "at": "..."}
+    {"id": "3f2a9c", "event": "progress", "done": 1500, "total": null}
+    {"id": "3f2a9c", "event": "finished", "status": "done", "at": "...", "result": {...}, "error": null}
+
+so jobs and their results survive a restart. Jobs that were queued or
+running when the server stopped are run again when it starts: imports
+resume from their checkpoint and exports rewrite their file. In
+multi-tenant mode no credential is stored to run them with, so they are
+marked failed instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from splitwise_mcp.scheduler import BULK, priority
+
+if TYPE_CHECKING:
+    from splitwise_mcp.client import SplitwiseClient
+
+logger = logging.getLogger(__name__)
+
+# (done, total) — total is None when unknown
+Progress = Callable[[float, float | None], Awaitable[None]]
+# (client, params, progress) → JSON-serializable result
+Runner = Callable[["SplitwiseClient", dict[str, Any], Progress], Awaitable[Any]]
+
+FINISHED = frozenset({"done", "failed", "cancelled"})
+
+# Progress is written to disk at most this often per job, and passed on
+# to waiting callers at most this often
+_SAVE_PROGRESS_EVERY = 5.0
+_UPDATE_INTERVAL = 0.5
+# Appended records after which the state file is rewritten
+_COMPACT_AFTER = 1000
+
+# Job kind → the coroutine that runs it; tool modules register theirs
+_RUNNERS: dict[str, Runner] = {}
+
+
+def register_job(kind: str, runner: Runner) -> None:
+    """Run jobs of *kind* with *runner*."""
+    _RUNNERS[kind] = runner
+
+
+def throttled(report: Progress, interval: float = _UPDATE_INTERVAL) -> Progress:
+    """*report*, passed at most one update every *interval* seconds.
+
+    The final update (``done == total``) always goes through.
+    """
+    last = 0.0
+
+    async def throttled_report(done: float, total: float | None) -> None:
+        nonlocal last
+        now = time.monotonic()
+        if now - last >= interval or done == total:
+            last = now
+            await report(done, total)
+
+    return throttled_report
+
+
+def _now() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class Job:
+    """One background job and its state."""
+
+    id: str
+    kind: str
+    params: dict[str, Any]
+    # Digest of the credentials of the caller who started it
+    owner: str
+    created_at: str
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    done: float = 0
+    total: float | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+def _records(job: Job) -> list[dict[str, Any]]:
+    """The events that rebuild *job* as it is now."""
+    records: list[dict[str, Any]] = [
+        {
+            "id": job.id,
+            "event": "submitted",
+            "kind": job.kind,
+            "params": job.params,
+            "owner": job.owner,
+            "created_at": job.created_at,
+        }
+    ]
+    if job.started_at is not None:
+        records.append({"id": job.id, "event": "started", "at": job.started_at})
+    if job.done or job.total is not None:
+        records.append(
+            {"id": job.id, "event": "progress", "done": job.done, "total": job.total}
+        )
+    if job.finished:
+        records.append(
+            {
+                "id": job.id,
+                "event": "finished",
+                "status": job.status,
+                "at": job.finished_at,
+                "result": job.result,
+                "error": job.error,
+            }
+        )
+    return records
+
+
+class JobManager:
+    """Durable background jobs with bounded concurrency."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_workers: int = 2,
+        keep_finished: int = 100,
+        on_finished: Callable[[Job], None] | None = None,
+    ) -> None:
+        self._path = Path(path)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._keep_finished = keep_finished
+        self._on_finished = on_finished
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        # Set (and replaced) whenever a job changes, for waiting callers
+        self._changed: dict[str, asyncio.Event] = {}
+        self._cancelling: set[str] = set()
+        self._progress_saved: dict[str, float] = {}
+        self._appended = 0
+        self._write_lock = asyncio.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Rebuild the jobs by replaying the state file."""
+        if not self._path.exists():
+            return
+        with self._path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn final line from a crash mid-write
+                self._apply(record)
+        self._prune()
+        self._compact()
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        event = record["event"]
+        if event == "submitted":
+            self._jobs[record["id"]] = Job(
+                id=record["id"],
+                kind=record["kind"],
+                params=record["params"],
+                owner=record["owner"],
+                created_at=record["created_at"],
+            )
+            return
+        job = self._jobs.get(record["id"])
+        if job is None:
+            return
+        if event == "started":
+            job.status = "running"
+            job.started_at = record["at"]
+        elif event == "progress":
+            job.done = record["done"]
+            job.total = record["total"]
+        elif event == "finished":
+            job.status = record["status"]
+            job.finished_at = record["at"]
+            job.result = record.get("result")
+            job.error = record.get("error")
+
+    def _append_sync(self, records: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with self._path.open("a", encoding="utf-8") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    async def _append(self, records: list[dict[str, Any]]) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._append_sync, records)
+            self._appended += len(records)
+            if self._appended >= _COMPACT_AFTER:
+                await asyncio.to_thread(self._compact)
+
+    def _compact(self) -> None:
+        """Rewrite the state file with one set of events per kept job."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for job in list(self._jobs.values()):
+                for r in _records(job):
+                    fh.write(json.dumps(r, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self._path)
+        self._appended = 0
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond ``keep_finished``."""
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[: max(0, len(finished) - self._keep_finished)]:
+            del self._jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _notify(self, job: Job) -> None:
+        changed = self._changed.pop(job.id, None)
+        if changed is not None:
+            changed.set()
+
+    def _launch(self, job: Job, client: SplitwiseClient) -> None:
+        # The task inherits the priority of every request it sends
+        with priority(BULK):
+            task = asyncio.create_task(
+                self._run(job, client), name=f"splitwise-job-{job.id}"
+            )
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    async def _report(self, job: Job, done: float, total: float | None) -> None:
+        job.done = done
+        job.total = total
+        self._notify(job)
+        now = time.monotonic()
+        if now - self._progress_saved.get(job.id, 0.0) >= _SAVE_PROGRESS_EVERY:
+            self._progress_saved[job.id] = now
+            await self._append(
+                [{"id": job.id, "event": "progress", "done": done, "total": total}]
+            )
+
+    async def _run(self, job: Job, client: SplitwiseClient) -> None:
+        try:
+            async with self._slots:
+                runner = _RUNNERS.get(job.kind)
+                if runner is None:
+                    raise ValueError(f"Unknown job kind {job.kind!r}")
+                job.status = "running"
+                job.started_at = _now()
+                await self._append(
+                    [{"id": job.id, "event": "started", "at": job.started_at}]
+                )
+                self._notify(job)
+                result = await runner(client, job.params, partial(self._report, job))
+        except asyncio.CancelledError:
+            if job.id not in self._cancelling:
+                raise  # shutting down: the job stays unfinished and runs again
+            asyncio.current_task().uncancel()
+            await self._finish(job, "cancelled")
+        except Exception as exc:  # noqa: BLE001 — reported through job_status
+            logger.warning("Job %s (%s) failed: %s", job.id, job.kind, exc)
+            await self._finish(job, "failed", error=str(exc) or type(exc).__name__)
+        else:
+            await self._finish(job, "done", result=result)
+
+    async def _finish(
+        self, job: Job, status: str, *, result: Any = None, error: str | None = None
+    ) -> None:
+        job.status = status
+        job.finished_at = _now()
+        job.result = result
+        job.error = error
+        self._cancelling.discard(job.id)
+        self._progress_saved.pop(job.id, None)
+        await self._append(_records(job)[-1:])
+        self._notify(job)
+        self._prune()
+        if self._on_finished is not None:
+            self._on_finished(job)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self, client: SplitwiseClient | None) -> None:
+        """Run again the jobs left unfinished by the last shutdown.
+
+        Without a *client* (multi-tenant mode) they are marked failed.
+        """
+        unfinished = [j for j in self._jobs.values() if not j.finished]
+        if client is None:
+            for job in unfinished:
+                job.status = "failed"
+                job.finished_at = _now()
+                job.error = "Interrupted by a server restart; start it again"
+            if unfinished:
+                self._append_sync([_records(j)[-1] for j in unfinished])
+            return
+        for job in unfinished:
+            job.status = "queued"
+            self._launch(job, client)
+        if unfinished:
+            logger.info("Resuming %d background job(s)", len(unfinished))
+
+    async def submit(
+        self, kind: str, params: dict[str, Any], client: SplitwiseClient, owner: str
+    ) -> Job:
+        """Durably record a job of *kind* and start it in the background."""
+        if kind not in _RUNNERS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            kind=kind,
+            params=params,
+            owner=owner,
+            created_at=_now(),
+        )
+        await self._append(_records(job))
+        self._jobs[job.id] = job
+        self._launch(job, client)
+        return job
+
+    def get(self, job_id: str, owner: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.owner == owner else None
+
+    def owned_by(self, owner: str) -> list[Job]:
+        """*owner*'s jobs, newest first."""
+        return [j for j in reversed(self._jobs.values()) if j.owner == owner]
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a queued or running job; False if it has already finished."""
+        task = self._tasks.get(job_id)
+        if task is None or self._jobs[job_id].finished:
+            return False
+        self._cancelling.add(job_id)
+        task.cancel()
+        return True
+
+    async def wait(
+        self, job_id: str, timeout: float, progress: Progress | None = None
+    ) -> Job:
+        """Wait up to *timeout* seconds for a job to finish.
+
+        *progress* is told about the job's progress meanwhile.
+        """
+        job = self._jobs[job_id]
+        report = throttled(progress) if progress is not None else None
+        deadline = time.monotonic() + timeout
+        while not job.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            changed = self._changed.setdefault(job.id, asyncio.Event())
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except TimeoutError:
+                break
+            if report is not None:
+                await report(job.done, job.total)
+        return job
+
+    async def stop(self) -> None:
+        """Stop running jobs. They stay unfinished on disk for the next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        counts = dict.fromkeys(("queued", "running", *sorted(FINISHED)), 0)
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
@@ -0,0 +1,468 @@
+"""Durable write-behind journal for mutating Splitwise operations.
+
+When write-behind mode is enabled, mutating tools append their intent to an
+append-only JSONL journal (fsync'd before acknowledging) instead of blocking
+on the POST. A background flusher replays the journal against the API in
+order, in batches, with retries and idempotency checks for operations that
+are not naturally idempotent: a create whose outcome is unknown is only
+resent once Splitwise shows no trace of it. The file is compacted down to
+the entries still pending or failed whenever the queue drains, and every
+``_COMPACT_AFTER`` records while it does not.
+
+Journal records are one JSON object per line::
+
+    {"seq": 1, "event": "enqueued", "op": "create_expense", "kwargs": {...}, "created_at": "..."}
+    {"seq": 1, "event": "retry", "attempts": 1, "error": "..."}
+    {"seq": 1, "event": "done", "result_id": 123}
+    {"seq": 1, "event": "failed", "attempts": 5, "error": "..."}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from splitwise_mcp.client import SplitwiseAPIError, SplitwiseClient, is_transient
+from splitwise_mcp.money import Money
+from splitwise_mcp.scheduler import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+# Records appended before the journal is compacted with entries still queued
+_COMPACT_AFTER = 1000
+
+# How far the server's clock may be behind ours when matching in-doubt
+# creates against server timestamps
+_CLOCK_SKEW = timedelta(minutes=5)
+_TIMESTAMP = "%Y-%m-%dT%H:%M:%SZ"
+
+# Client methods that may be queued. Every one of them is called with keyword
+# arguments only, so the journal can store them as a plain JSON object.
+OPERATIONS = frozenset(
+    {
+        "update_user",
+        "create_group",
+        "delete_group",
+        "undelete_group",
+        "add_user_to_group",
+        "remove_user_from_group",
+        "create_friend",
+        "create_friends",
+        "delete_friend",
+        "create_expense",
+        "update_expense",
+        "delete_expense",
+        "undelete_expense",
+        "create_comment",
+        "delete_comment",
+    }
+)
+
+
+@dataclass
+class JournalEntry:
+    """One queued mutation and its delivery state."""
+
+    seq: int
+    op: str
+    kwargs: dict[str, Any]
+    created_at: str
+    status: str = "pending"  # pending | done | failed
+    attempts: int = 0
+    error: str | None = None
+    result_id: int | None = None
+    # True when a previous submission may have reached Splitwise without us
+    # seeing the response (network error, 5xx, or recovered after a restart).
+    in_doubt: bool = False
+
+
+def _rejected(exc: BaseException) -> bool:
+    """Whether *exc* proves Splitwise did not apply the request."""
+    return isinstance(exc, SplitwiseAPIError) and exc.status_code < 500
+
+
+def _result_id(data: Any) -> int | None:
+    if not isinstance(data, dict):
+        return None
+    expenses = data.get("expenses")
+    if expenses:
+        return expenses[0].get("id")
+    return data.get("id")
+
+
+class WriteJournal:
+    """Append-only, fsync'd queue of mutations with a background flusher."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        retry_delay: float = 2.0,
+        on_applied: Callable[[str, dict[str, Any]], None] | None = None,
+    ) -> None:
+        self._path = Path(path)
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        # Told (op, kwargs) of each entry once Splitwise has it
+        self._on_applied = on_applied
+        self._entries: dict[int, JournalEntry] = {}
+        self._next_seq = 1
+        self._write_lock = asyncio.Lock()
+        self._appended = 0  # records appended since the last compaction
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Rebuild in-memory state by replaying the journal file."""
+        if not self._path.exists():
+            return
+        with self._path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write — the entry was
+                    # never acknowledged, so dropping it is safe.
+                    continue
+                self._apply(record)
+        # Any of them may have been sent before the restart
+        for entry in self._entries.values():
+            entry.in_doubt = True
+        self._next_seq = max(self._entries, default=0) + 1
+        self._compact()
+        pending = len(self.pending())
+        if pending:
+            logger.info(
+                "Recovered %d pending journal entries from %s", pending, self._path
+            )
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        seq = record["seq"]
+        event = record["event"]
+        if event == "enqueued":
+            self._entries[seq] = JournalEntry(
+                seq=seq,
+                op=record["op"],
+                kwargs=record["kwargs"],
+                created_at=record["created_at"],
+            )
+            return
+        entry = self._entries.get(seq)
+        if entry is None:
+            return
+        if event == "retry":
+            entry.attempts = record["attempts"]
+            entry.error = record.get("error")
+        elif event == "done":
+            entry.status = "done"
+            entry.result_id = record.get("result_id")
+            entry.error = None
+        elif event == "failed":
+            entry.status = "failed"
+            entry.attempts = record.get("attempts", entry.attempts)
+            entry.error = record.get("error")
+        elif event == "requeued":
+            entry.status = "pending"
+            entry.attempts = 0
+            entry.error = None
+
+    def _append_sync(self, records: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with self._path.open("a", encoding="utf-8") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    async def _append(self, records: list[dict[str, Any]]) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._append_sync, records)
+            self._appended += len(records)
+
+    def _compact(self) -> None:
+        """Rewrite the journal keeping only entries that are not yet done.
+
+        Pending and failed entries are kept with their latest state, so a
+        permanently failed entry does not stop the file from shrinking.
+        """
+        live = [e for e in self._entries.values() if e.status != "done"]
+        self._entries = {e.seq: e for e in live}
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for e in live:
+                records: list[dict[str, Any]] = [
+                    {
+                        "seq": e.seq,
+                        "event": "enqueued",
+                        "op": e.op,
+                        "kwargs": e.kwargs,
+                        "created_at": e.created_at,
+                    }
+                ]
+                if e.status == "failed":
+                    records.append(
+                        {
+                            "seq": e.seq,
+                            "event": "failed",
+                            "attempts": e.attempts,
+                            "error": e.error,
+                        }
+                    )
+                elif e.attempts:
+                    records.append(
+                        {
+                            "seq": e.seq,
+                            "event": "retry",
+                            "attempts": e.attempts,
+                            "error": e.error,
+                        }
+                    )
+                for r in records:
+                    fh.write(json.dumps(r, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self._path)
+        self._appended = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, op: str, **kwargs: Any) -> JournalEntry:
+        """Durably record a mutation and return as soon as it is on disk."""
+        if op not in OPERATIONS:
+            raise ValueError(f"Operation {op!r} cannot be journaled")
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        entry = JournalEntry(
+            seq=self._next_seq,
+            op=op,
+            kwargs=kwargs,
+            created_at=datetime.now(UTC).strftime(_TIMESTAMP),
+        )
+        self._next_seq += 1
+        record = {
+            "seq": entry.seq,
+            "event": "enqueued",
+            "op": op,
+            "kwargs": kwargs,
+            "created_at": entry.created_at,
+        }
+        async with self._write_lock:
+            await asyncio.to_thread(self._append_sync, [record])
+            self._appended += 1
+            # Under the lock, so a compaction cannot drop the new entry
+            self._entries[entry.seq] = entry
+        self._wakeup.set()
+        return entry
+
+    def pending(self) -> list[JournalEntry]:
+        return [e for e in self._entries.values() if e.status == "pending"]
+
+    def failed(self) -> list[JournalEntry]:
+        return [e for e in self._entries.values() if e.status == "failed"]
+
+    async def retry_failed(self) -> int:
+        """Move every failed entry back into the pending queue."""
+        failed = self.failed()
+        if not failed:
+            return 0
+        await self._append([{"seq": e.seq, "event": "requeued"} for e in failed])
+        for e in failed:
+            e.status = "pending"
+            e.attempts = 0
+            e.error = None
+        self._wakeup.set()
+        return len(failed)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def _already_applied(
+        self, client: SplitwiseClient, entry: JournalEntry
+    ) -> int | None:
+        """Look for evidence that an in-doubt create already reached Splitwise.
+
+        Updates, deletes, restores and membership changes are idempotent and
+        are simply resent. Returns the ID of the matching object, or None if
+        none was found.
+        """
+        kw = entry.kwargs
+        # Our clock stamped the entry, the server's clock stamps its objects
+        since = (
+            datetime.strptime(entry.created_at, _TIMESTAMP).replace(tzinfo=UTC)
+            - _CLOCK_SKEW
+        ).strftime(_TIMESTAMP)
+        if entry.op == "create_expense":
+            cost = Money.parse(kw.get("cost"), kw.get("currency_code"))
+            # Every page: a busy group can update more than one page meanwhile
+            async for page in client.iter_expenses(
+                group_id=kw.get("group_id"), updated_after=since
+            ):
+                for e in page:
+                    if (
+                        e.get("description") == kw.get("description")
+                        and e.get("deleted_at") is None
+                        and Money.parse(e.get("cost"), e.get("currency_code")).minor
+                        == cost.minor
+                    ):
+                        return e.get("id")
+        elif entry.op == "create_comment":
+            comments = await client.get_comments(kw["expense_id"])
+            for c in comments:
+                if (
+                    c.get("content") == kw.get("content")
+                    and (c.get("created_at") or "") >= since
+                ):
+                    return c.get("id")
+        elif entry.op == "create_group":
+            for g in await client.get_groups():
+                if (
+                    g.get("name") == kw.get("name")
+                    and (g.get("updated_at") or "") >= since
+                ):
+                    return g.get("id")
+        elif entry.op == "create_friend":
+            return await self._friend_id(client, [kw.get("user_email")])
+        elif entry.op == "create_friends":
+            emails = [u.get("email") for u in kw.get("users") or ()]
+            return await self._friend_id(client, emails)
+        return None
+
+    @staticmethod
+    async def _friend_id(
+        client: SplitwiseClient, emails: list[str | None]
+    ) -> int | None:
+        """The first friend's ID, once every one of *emails* is a friend."""
+        wanted = [e.casefold() for e in emails if e]
+        friends = {
+            (f.get("email") or "").casefold(): f.get("id")
+            for f in await client.get_friends()
+        }
+        if not wanted or any(e not in friends for e in wanted):
+            return None
+        return friends[wanted[0]]
+
+    async def _submit(self, client: SplitwiseClient, entry: JournalEntry) -> Any:
+        if entry.in_doubt:
+            existing = await self._already_applied(client, entry)
+            if existing is not None:
+                logger.info(
+                    "Journal entry #%d already applied (ID %s)", entry.seq, existing
+                )
+                return {"id": existing}
+        return await getattr(client, entry.op)(**entry.kwargs)
+
+    async def flush_once(self, client: SplitwiseClient) -> bool:
+        """Submit up to one batch of pending entries, in order.
+
+        Returns False if the batch stopped on a transient error and the
+        caller should back off before trying again.
+        """
+        batch = sorted(self.pending(), key=lambda e: e.seq)[: self._batch_size]
+        records: list[dict[str, Any]] = []
+        healthy = True
+        for entry in batch:
+            try:
+                data = await self._submit(client, entry)
+            except Exception as exc:  # noqa: BLE001 — classified below
+                entry.attempts += 1
+                entry.error = str(exc)
+                if not _rejected(exc):
+                    # Sent, perhaps applied: reconcile before sending again
+                    entry.in_doubt = True
+                if is_transient(exc) and entry.attempts < self._max_attempts:
+                    records.append(
+                        {
+                            "seq": entry.seq,
+                            "event": "retry",
+                            "attempts": entry.attempts,
+                            "error": entry.error,
+                        }
+                    )
+                    healthy = False
+                    # Preserve ordering: later entries wait for this one.
+                    break
+                entry.status = "failed"
+                records.append(
+                    {
+                        "seq": entry.seq,
+                        "event": "failed",
+                        "attempts": entry.attempts,
+                        "error": entry.error,
+                    }
+                )
+                logger.warning(
+                    "Journal entry #%d (%s) failed: %s", entry.seq, entry.op, exc
+                )
+                continue
+            entry.status = "done"
+            entry.error = None
+            entry.result_id = _result_id(data)
+            if self._on_applied is not None:
+                self._on_applied(entry.op, entry.kwargs)
+            records.append(
+                {"seq": entry.seq, "event": "done", "result_id": entry.result_id}
+            )
+        if records:
+            await self._append(records)
+        if not self.pending() or self._appended >= _COMPACT_AFTER:
+            async with self._write_lock:
+                await asyncio.to_thread(self._compact)
+        return healthy
+
+    async def _run(self, client: SplitwiseClient) -> None:
+        delay = self._retry_delay
+        while True:
+            if not self.pending():
+                await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                healthy = await self.flush_once(client)
+            except Exception:  # pragma: no cover — keep the flusher alive
+                logger.exception("Journal flush failed")
+                healthy = False
+            if healthy:
+                delay = self._retry_delay
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except TimeoutError:
+                pass
+            delay = min(delay * 2, 60.0)
+
+    def start(self, client: SplitwiseClient) -> None:
+        """Start the background flusher for *client*."""
+        if self._task is None:
+            # The task inherits the priority of every request it sends
+            with priority(BACKGROUND):
+                self._task = asyncio.create_task(
+                    self._run(client), name="splitwise-journal-flusher"
+                )
+            if self.pending():
+                self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stop the flusher. Unflushed entries stay on disk for the next start."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
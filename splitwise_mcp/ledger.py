@@ -0,0 +1,218 @@
+"""Point-in-time balances between pairs of users.
+
+:class:`BalanceLedger` records, for every pair of users and currency,
+what one owes the other as a series of per-day changes with running
+totals. "What did Bob owe me on 31 March?" is then a binary search for the
+last day on or before that date, rather than a replay of the history.
+
+What each expense moves between a pair comes from its ``repayments``,
+which is how Splitwise itself accounts for it. When an expense has none,
+each debtor's share is split across the payers in proportion to what they
+paid.
+
+The ledger is an :class:`~splitwise_mcp.indexing.ExpenseIndex`, so a
+backdated edit found during a sync replaces that expense's old
+contributions. Inserting a change in the middle of a series invalidates
+the running totals from that day on; they are recomputed from there on
+the next query, so a sync with many edits pays for one pass.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from datetime import date
+from typing import Any
+
+from splitwise_mcp.indexing import ExpenseIndex
+from splitwise_mcp.money import places
+from splitwise_mcp.splits import SplitError, allocate, to_minor
+from splitwise_mcp.streaming import fields_spec
+
+LEDGER_FIELDS = fields_spec(
+    (
+        "id",
+        "date",
+        "currency_code",
+        "payment",
+        "repayments.from",
+        "repayments.to",
+        "repayments.amount",
+        "users.user_id",
+        "users.paid_share",
+        "users.owed_share",
+        "users.user.first_name",
+        "users.user.last_name",
+        "updated_at",
+        "deleted_at",
+    )
+)
+
+# (lower user id, higher user id); amounts are what the higher ID owes the
+# lower, so negative means the reverse
+_Pair = tuple[int, int]
+
+
+class _Series:
+    """Per-day changes of one balance, with lazily maintained running totals."""
+
+    __slots__ = ("days", "deltas", "totals", "valid")
+
+    def __init__(self) -> None:
+        self.days: list[int] = []  # proleptic ordinals, ascending
+        self.deltas: list[int] = []
+        self.totals: list[int] = []  # totals[i] = sum(deltas[: i + 1])
+        self.valid = 0  # totals[:valid] are up to date
+
+    def add(self, day: int, cents: int) -> None:
+        i = bisect.bisect_left(self.days, day)
+        if i < len(self.days) and self.days[i] == day:
+            self.deltas[i] += cents
+            if not self.deltas[i]:
+                del self.days[i], self.deltas[i], self.totals[i]
+        else:
+            self.days.insert(i, day)
+            self.deltas.insert(i, cents)
+            self.totals.insert(i, 0)
+        self.valid = min(self.valid, i)
+
+    def as_of(self, day: int) -> int:
+        if self.valid < len(self.days):
+            running = self.totals[self.valid - 1] if self.valid else 0
+            for i in range(self.valid, len(self.days)):
+                running += self.deltas[i]
+                self.totals[i] = running
+            self.valid = len(self.days)
+        i = bisect.bisect_right(self.days, day)
+        return self.totals[i - 1] if i else 0
+
+
+def _debts(expense: dict[str, Any]) -> list[tuple[int, int, int]]:
+    """(debtor, creditor, minor units) moved by *expense*."""
+    scale = places(expense.get("currency_code"))
+    if expense.get("repayments"):
+        return [
+            (r["from"], r["to"], to_minor(r["amount"], scale))
+            for r in expense["repayments"]
+            if r.get("from") is not None and r.get("to") is not None
+        ]
+    net = {
+        u["user_id"]: to_minor(u.get("paid_share") or 0, scale)
+        - to_minor(u.get("owed_share") or 0, scale)
+        for u in expense.get("users") or ()
+        if u.get("user_id") is not None
+    }
+    creditors = [(uid, n) for uid, n in net.items() if n > 0]
+    if not creditors:
+        return []
+    debts = []
+    for debtor, n in net.items():
+        if n < 0:
+            parts = allocate(-n, [c for _, c in creditors])
+            debts.extend(
+                (debtor, uid, part)
+                for (uid, _), part in zip(creditors, parts, strict=True)
+                if part
+            )
+    return debts
+
+
+class BalanceLedger(ExpenseIndex):
+    """Running balances per user pair and currency, queryable by date."""
+
+    fields = LEDGER_FIELDS
+
+    def __init__(self) -> None:
+        # pair → currency → series
+        self._series: dict[_Pair, dict[str, _Series]] = {}
+        # expense id → contributions, so an edit can be taken back out
+        self._contributions: dict[int, list[tuple[_Pair, str, int, int]]] = {}
+        self._partners: defaultdict[int, set[int]] = defaultdict(set)
+        self._names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def _add(self, pair: _Pair, currency: str, day: int, cents: int) -> None:
+        by_currency = self._series.get(pair)
+        if by_currency is None:
+            by_currency = self._series[pair] = {}
+            self._partners[pair[0]].add(pair[1])
+            self._partners[pair[1]].add(pair[0])
+        if currency not in by_currency:
+            by_currency[currency] = _Series()
+        by_currency[currency].add(day, cents)
+
+    def _apply(self, expense: dict[str, Any]) -> None:
+        if "users" not in expense and "repayments" not in expense:
+            return  # a partial object; says nothing about balances
+        expense_id = expense["id"]
+        self.forget(expense_id)
+        if expense.get("deleted_at"):
+            return
+        for u in expense.get("users") or ():
+            user = u.get("user") or {}
+            name = " ".join(
+                filter(None, (user.get("first_name"), user.get("last_name")))
+            )
+            if name and u.get("user_id") is not None:
+                self._names[u["user_id"]] = name
+        try:
+            day = date.fromisoformat((expense.get("date") or "")[:10]).toordinal()
+            debts = _debts(expense)
+        except (SplitError, ValueError, KeyError):
+            return
+        currency = expense.get("currency_code") or ""
+        contributions = []
+        for debtor, creditor, cents in debts:
+            if debtor == creditor:
+                continue
+            if debtor > creditor:
+                pair, signed = (creditor, debtor), cents
+            else:
+                pair, signed = (debtor, creditor), -cents
+            self._add(pair, currency, day, signed)
+            contributions.append((pair, currency, day, signed))
+        if contributions:
+            self._contributions[expense_id] = contributions
+
+    def forget(self, expense_id: int) -> None:
+        for pair, currency, day, signed in self._contributions.pop(expense_id, ()):
+            self._series[pair][currency].add(day, -signed)
+
+    def balance(self, user_id: int, other_id: int, day: date) -> dict[str, int]:
+        """What *other_id* owed *user_id* at the end of *day*, per currency.
+
+        Negative amounts are owed by *user_id* to *other_id*.
+        """
+        low, high = sorted((user_id, other_id))
+        sign = 1 if user_id == low else -1
+        found = {}
+        for currency, series in self._series.get((low, high), {}).items():
+            cents = series.as_of(day.toordinal())
+            if cents:
+                found[currency] = sign * cents
+        return found
+
+    def balances(self, user_id: int, day: date) -> dict[int, dict[str, int]]:
+        """:meth:`balance` with everyone *user_id* has shared expenses with."""
+        found = {}
+        for other_id in self._partners.get(user_id, ()):
+            owed = self.balance(user_id, other_id, day)
+            if owed:
+                found[other_id] = owed
+        return found
+
+    def name(self, user_id: int) -> str:
+        return self._names.get(user_id, "")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "expenses": len(self._contributions),
+            "pairs": len(self._series),
+            "points": sum(
+                len(s.days)
+                for by_currency in self._series.values()
+                for s in by_currency.values()
+            ),
+        }
@@ -0,0 +1,131 @@
+"""Replay recorded MCP tool-call sessions against a server, at scale.
+
+Sessions come from a log written by
+:class:`~splitwise_mcp.cassette.SessionRecorder` (``RECORD_SESSIONS``).
+Every recorded session is played ``scale`` times at once. Each copy keeps
+the session's order of calls and the gaps between them, divided by
+``speed`` (0 sends each call as soon as the previous one returns).
+
+Against a server at ``url`` every copy opens its own MCP session over
+streamable HTTP. Without a URL the calls go to this process's server over
+one in-memory session. Set ``REPLAY_CASSETTE`` then, so that no request
+reaches Splitwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Client
+
+from splitwise_mcp.cassette import read_jsonl
+
+Session = list[dict[str, Any]]
+
+
+@dataclass
+class LoadReport:
+    sessions: int = 0
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    # tool → calls, errors and latency percentiles in seconds
+    tools: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+def load_sessions(path: str | Path) -> list[Session]:
+    """The recorded sessions, each a list of calls timed from its first one."""
+    by_session: defaultdict[str, Session] = defaultdict(list)
+    for record in read_jsonl(path):
+        by_session[record["session"]].append(record)
+    sessions = []
+    for calls in by_session.values():
+        calls.sort(key=lambda c: c["at"])
+        first = calls[0]["at"]
+        sessions.append([{**c, "at": c["at"] - first} for c in calls])
+    return sessions
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _play(
+    client: Client,
+    session: Session,
+    speed: float,
+    latencies: defaultdict[str, list[float]],
+    errors: Counter[str],
+) -> None:
+    start = time.monotonic()
+    for call in session:
+        if speed > 0:
+            delay = call["at"] / speed - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tool = call["tool"]
+        sent = time.perf_counter()
+        try:
+            result = await client.call_tool(
+                tool, call["arguments"], raise_on_error=False
+            )
+            text = getattr(result.content[0], "text", "") if result.content else ""
+            failed = result.is_error or text.startswith("Error:")
+        except Exception:  # noqa: BLE001 — counted; the session goes on
+            failed = True
+        latencies[tool].append(time.perf_counter() - sent)
+        if failed:
+            errors[tool] += 1
+
+
+async def run_load(
+    path: str | Path,
+    *,
+    url: str | None = None,
+    scale: int = 1,
+    speed: float = 1.0,
+) -> LoadReport:
+    """Play every session in *path* *scale* times concurrently; report latencies."""
+    sessions = load_sessions(path)
+    latencies: defaultdict[str, list[float]] = defaultdict(list)
+    errors: Counter[str] = Counter()
+
+    async def remote(session: Session) -> None:
+        async with Client(url) as client:
+            await _play(client, session, speed, latencies, errors)
+
+    start = time.perf_counter()
+    if url is not None:
+        await asyncio.gather(*(remote(s) for s in sessions for _ in range(scale)))
+    else:
+        from splitwise_mcp.server import mcp  # registers the tools
+
+        async with Client(mcp) as client:
+            await asyncio.gather(
+                *(
+                    _play(client, s, speed, latencies, errors)
+                    for s in sessions
+                    for _ in range(scale)
+                )
+            )
+    report = LoadReport(
+        sessions=len(sessions) * scale,
+        calls=sum(map(len, latencies.values())),
+        errors=sum(errors.values()),
+        seconds=round(time.perf_counter() - start, 3),
+    )
+    for tool, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        report.tools[tool] = {
+            "calls": len(ordered),
+            "errors": errors[tool],
+            "p50": round(_percentile(ordered, 0.5), 4),
+            "p95": round(_percentile(ordered, 0.95), 4),
+            "max": round(ordered[-1], 4),
+        }
+    return report
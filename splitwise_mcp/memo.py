@@ -0,0 +1,309 @@
+"""Memoized read-tool results, invalidated by what each mutation touches.
+
+Agents repeat the same reads within seconds: ``get_group`` after every
+expense, ``list_expenses`` for the same page. :class:`ToolMemo` keeps the
+result of each read tool keyed on its normalized arguments, tagged with
+the data it depends on: ``get_group(5)`` with ``group:5``, a group-filtered
+``list_expenses`` page with ``expenses:group:5``, and so on. Each mutating
+tool (or write-journal operation) declares the tags it makes stale, so
+``create_expense`` in group 5 drops ``get_group(5)``, that group's expense
+pages and friend balances, and leaves other groups' results cached.
+
+Every specific tag also has a family tag (``group:*``) that a mutation
+falls back to when it cannot tell which group or friend it affects.
+Results expire after the response-cache TTL too, since other people's
+changes are not seen as mutations, and never outlive the cached responses
+they were built from, so a result is at most one TTL old. In multi-tenant mode entries and
+invalidations are scoped to the caller's access token.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from splitwise_mcp.breaker import is_stale
+from splitwise_mcp.cache import track_expiry
+from splitwise_mcp.identity import caller_id
+from splitwise_mcp.metrics import _is_error
+
+Args = dict[str, Any]
+# Tags for a call's arguments; None means "could be anything": clear the scope
+Tags = Callable[[Args], set[str] | None]
+
+
+def _tag(kind: str, value: Any) -> set[str]:
+    """``kind:value`` plus its family tag ``kind:*``."""
+    return {f"{kind}:{value}", f"{kind}:*"}
+
+
+def _expense_list_tags(a: Args) -> set[str]:
+    tags = set()
+    if a.get("group_id") is not None:
+        tags |= _tag("expenses:group", a["group_id"])
+    if a.get("friend_id") is not None:
+        tags |= _tag("expenses:friend", a["friend_id"])
+    return tags or {"expenses:all"}
+
+
+# Read tools → tags their results depend on
+READS: dict[str, Tags] = {
+    "get_current_user": lambda a: {"me"},
+    "get_user": lambda a: _tag("user", a.get("user_id")),
+    "list_groups": lambda a: {"groups"},
+    "get_group": lambda a: _tag("group", a.get("group_id")),
+    "list_friends": lambda a: {"friends", "balances"},
+    "get_friend": lambda a: _tag("friend", a.get("friend_id")) | {"balances"},
+    "list_expenses": _expense_list_tags,
+    "get_expense": lambda a: _tag("expense", a.get("expense_id")),
+    "get_comments": lambda a: _tag("comments", a.get("expense_id")),
+    "get_notifications": lambda a: {"notifications"},
+    "list_currencies": lambda a: {"currencies"},
+    "list_categories": lambda a: {"categories"},
+}
+
+
+def _expense_change_tags(a: Args) -> set[str]:
+    """What a created, edited, deleted or restored expense makes stale."""
+    tags = {"expenses:all", "balances"}
+    if a.get("expense_id") is not None:
+        tags.add(f"expense:{a['expense_id']}")
+    # stored_group_id is the group the expense was in before this change
+    groups = {a.get(k) for k in ("group_id", "stored_group_id")} - {None}
+    if groups:
+        for g in groups:
+            tags |= {f"group:{g}", f"expenses:group:{g}"}
+    else:
+        tags |= {"group:*", "expenses:group:*"}
+    user_ids = {u.get("user_id") for u in a.get("users") or ()} - {None}
+    if user_ids:
+        tags |= {f"expenses:friend:{uid}" for uid in user_ids}
+    else:
+        tags.add("expenses:friend:*")
+    return tags
+
+
+def _group_change_tags(a: Args) -> set[str]:
+    g = a.get("group_id")
+    if g is None:
+        return {"groups", "group:*", "expenses:group:*", "expenses:all", "balances"}
+    return {"groups", f"group:{g}", f"expenses:group:{g}", "expenses:all", "balances"}
+
+
+def _membership_tags(a: Args) -> set[str]:
+    return {"groups", f"group:{a.get('group_id')}", "friends", "friend:*", "balances"}
+
+
+# Mutating tools and write-journal operations → tags they make stale
+MUTATIONS: dict[str, Tags] = {
+    "create_expense": _expense_change_tags,
+    "update_expense": _expense_change_tags,
+    "delete_expense": _expense_change_tags,
+    "restore_expense": _expense_change_tags,
+    "undelete_expense": _expense_change_tags,
+    "create_comment": lambda a: {f"comments:{a.get('expense_id')}"},
+    "delete_comment": lambda a: {"comments:*"},
+    "create_group": lambda a: {"groups"},
+    "delete_group": _group_change_tags,
+    "restore_group": _group_change_tags,
+    "undelete_group": _group_change_tags,
+    "add_user_to_group": _membership_tags,
+    "remove_user_from_group": _membership_tags,
+    "add_friend": lambda a: {"friends", "friend:*"},
+    "create_friend": lambda a: {"friends", "friend:*"},
+    "add_friends": lambda a: {"friends", "friend:*"},
+    "create_friends": lambda a: {"friends", "friend:*"},
+    "delete_friend": lambda a: (
+        _tag("friend", a.get("friend_id"))
+        | {"friends", "balances", f"expenses:friend:{a.get('friend_id')}"}
+    ),
+    # A name change shows up in nearly every result
+    "update_user": lambda a: None,
+}
+
+# Tools that neither return memoizable API reads nor change anything.
+# Unknown tools are treated as mutations that could touch anything.
+PASSTHROUGH = frozenset(
+    {
+        "calculate_split",
+        "forecast_recurring",
+        "find_duplicate_expenses",
+        "export_expenses",
+        "balance_as_of",
+        "suggest_category",
+        "resolve",
+        "write_journal_status",
+        "job_status",
+        "cancel_job",
+    }
+)
+
+
+def _normalize(args: Args) -> str:
+    # Omitted and None arguments are the same call
+    return json.dumps(
+        {k: v for k, v in args.items() if v is not None},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class ToolMemo:
+    """LRU of read-tool results with tag-based invalidation."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (scope, tool, args) → (result, expires at, tags)
+        self._entries: OrderedDict[
+            tuple[str, str, str], tuple[Any, float, set[str]]
+        ] = OrderedDict()
+        # (scope, tag) → keys carrying that tag
+        self._tagged: dict[tuple[str, str], set[tuple[str, str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, scope: str, tool: str, args: Args) -> Any | None:
+        key = (scope, tool, _normalize(args))
+        item = self._entries.get(key)
+        if item is None or item[1] <= time.monotonic():
+            if item is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(
+        self,
+        scope: str,
+        tool: str,
+        args: Args,
+        result: Any,
+        not_after: float | None = None,
+    ) -> None:
+        """Keep *result* for ``ttl`` seconds, or until *not_after* if sooner."""
+        tags = READS[tool](args) or set()
+        key = (scope, tool, _normalize(args))
+        self._drop(key)
+        expires = time.monotonic() + self.ttl
+        if not_after is not None:
+            expires = min(expires, not_after)
+        self._entries[key] = (result, expires, tags)
+        for tag in tags:
+            self._tagged.setdefault((scope, tag), set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple[str, str, str]) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tagged.get((key[0], tag))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[key[0], tag]
+
+    def invalidate(self, scope: str, tags: set[str] | None) -> None:
+        """Drop *scope*'s results carrying any of *tags*; None drops them all."""
+        if tags is None:
+            keys = [k for k in self._entries if k[0] == scope]
+        else:
+            keys = {k for tag in tags for k in self._tagged.get((scope, tag), ())}
+        for key in keys:
+            self._drop(key)
+        self.invalidations += len(keys)
+
+    def invalidate_op(self, op: str, args: Args, scope: str = "") -> None:
+        """Invalidate what the mutation *op* called with *args* makes stale."""
+        tags = MUTATIONS[op](args) if op in MUTATIONS else None
+        self.invalidate(scope, None if tags is None else tags | {"notifications"})
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+def _stored_group(context: MiddlewareContext, expense_id: Any) -> int | None:
+    """The group of *expense_id* as last seen by the caller's client."""
+    try:
+        client = context.fastmcp_context.request_context.lifespan_context.splitwise
+        expense = client.store.get("expense", expense_id) if client.store else None
+    except Exception:  # noqa: BLE001 — no session or client; fall back to families
+        return None
+    return None if expense is None else expense.get("group_id") or 0
+
+
+class ToolMemoMiddleware(Middleware):
+    """Serve repeated read-tool calls from a :class:`ToolMemo`."""
+
+    def __init__(self, memo: ToolMemo) -> None:
+        self._memo = memo
+        # tool → its parameters' defaults, so spelling one out is the same call
+        self._defaults: dict[str, dict[str, Any]] = {}
+
+    async def _with_defaults(self, context: MiddlewareContext, args: Args) -> Args:
+        name = context.message.name
+        defaults = self._defaults.get(name)
+        if defaults is None:
+            tool = await context.fastmcp_context.fastmcp.get_tool(name)
+            defaults = self._defaults[name] = {
+                k: p["default"]
+                for k, p in tool.parameters.get("properties", {}).items()
+                if "default" in p
+            }
+        return {**defaults, **args}
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        memo = self._memo
+        name = context.message.name
+        if not memo.enabled or name in PASSTHROUGH:
+            return await call_next(context)
+        args = dict(context.message.arguments or {})
+        scope = caller_id()
+        if name in READS:
+            args = await self._with_defaults(context, args)
+            cached = memo.get(scope, name, args)
+            if cached is not None:
+                return cached
+            with track_expiry() as hits:
+                result = await call_next(context)
+            if not _is_error(result) and not is_stale(result):
+                memo.put(scope, name, args, result, min(hits, default=None))
+            return result
+        if args.get("expense_id") is not None:
+            # Read before the call: the change may move or delete the expense
+            args["stored_group_id"] = _stored_group(context, args["expense_id"])
+        try:
+            return await call_next(context)
+        finally:
+            # Even a failed mutation may have been applied
+            memo.invalidate_op(name, args, scope)
+
+
+# The memo of this worker; configured from Settings in the app lifespan
+tool_memo = ToolMemo()
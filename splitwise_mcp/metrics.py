@@ -0,0 +1,72 @@
+"""Per-worker tool-call metrics, collected by FastMCP middleware."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+
+class WorkerMetrics:
+    """Counters for the tool calls served by this worker process."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.seconds: Counter[str] = Counter()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "in_flight": self.in_flight,
+            "tool_calls": dict(self.calls),
+            "tool_errors": dict(self.errors),
+            "tool_seconds": {k: round(v, 3) for k, v in self.seconds.items()},
+        }
+
+
+def _is_error(result: ToolResult) -> bool:
+    # Tools report Splitwise failures as "Error: ..." text rather than raising
+    content = result.content
+    return bool(content) and getattr(content[0], "text", "").startswith("Error:")
+
+
+class MetricsMiddleware(Middleware):
+    """Record call counts, error counts and latency for every tool call."""
+
+    def __init__(self, metrics: WorkerMetrics) -> None:
+        self._metrics = metrics
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        metrics = self._metrics
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception:
+            metrics.errors[name] += 1
+            raise
+        else:
+            if _is_error(result):
+                metrics.errors[name] += 1
+            return result
+        finally:
+            metrics.in_flight -= 1
+            metrics.calls[name] += 1
+            metrics.seconds[name] += time.perf_counter() - start
+
+
+worker_metrics = WorkerMetrics()
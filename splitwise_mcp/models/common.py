@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from pydantic import BaseModel
 
+from splitwise_mcp.money import Money
+
 
 class Debt(BaseModel):
     """A debt between two users."""
@@ -17,11 +19,19 @@ class Debt(BaseModel):
         # Splitwise uses "from" which is a Python keyword
         fields = {"from_user": {"alias": "from"}}
 
+    @property
+    def money(self) -> Money:
+        return Money.parse(self.amount, self.currency_code)
+
 
 class Balance(BaseModel):
     currency_code: str | None = None
     amount: str | None = None
 
+    @property
+    def money(self) -> Money:
+        return Money.parse(self.amount, self.currency_code)
+
 
 class Currency(BaseModel):
     currency_code: str | None = None
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 
 from splitwise_mcp.models.comment import Comment
 from splitwise_mcp.models.common import Share
+from splitwise_mcp.money import Money
 
 
 class Repayment(BaseModel):
@@ -58,3 +59,17 @@ class Expense(BaseModel):
     receipt: Receipt | None = None
     users: list[Share] | None = None
     comments: list[Comment] | None = None
+
+    @property
+    def total(self) -> Money:
+        return Money.parse(self.cost, self.currency_code)
+
+    def shares(self) -> dict[int | None, tuple[Money, Money]]:
+        """(paid, owed) per user ID, in the expense's currency."""
+        return {
+            s.user_id: (
+                Money.parse(s.paid_share, self.currency_code),
+                Money.parse(s.owed_share, self.currency_code),
+            )
+            for s in self.users or ()
+        }
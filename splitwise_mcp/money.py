@@ -0,0 +1,84 @@
+"""Money amounts as integer minor units.
+
+Splitwise sends amounts (``cost``, ``paid_share``, ``owed_share``,
+``amount``) as decimal strings. ``float()`` on them is inexact, and sums
+of floats drift, so amounts are parsed once into integer minor units and
+everything computed locally (balances, totals, comparisons) is integer
+arithmetic. :class:`Money` pairs the units with their currency. Display
+code needs only an amount's sign, which :func:`sign` reads off the string.
+
+A currency's scale is its ISO 4217 minor unit, but never less than two
+places. Splitwise's ``get_currencies`` lists only codes and symbols, and
+it keeps amounts to the cent even in currencies without one (yen, won).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from splitwise_mcp.splits import from_minor, to_minor
+
+# ISO 4217 currencies with more than two decimal places
+_EXPONENTS = {
+    "BHD": 3,
+    "IQD": 3,
+    "JOD": 3,
+    "KWD": 3,
+    "LYD": 3,
+    "OMR": 3,
+    "TND": 3,
+    "CLF": 4,
+    "UYW": 4,
+}
+
+
+def sign(amount: str | None) -> int:
+    """-1, 0 or 1 for a decimal string such as ``"-12.50"``, without parsing it."""
+    text = (amount or "").strip()
+    if not text.strip("+-0."):
+        return 0
+    return -1 if text.startswith("-") else 1
+
+
+def places(currency: str | None) -> int:
+    """Decimal places of *currency*'s minor unit as Splitwise stores it."""
+    return _EXPONENTS.get((currency or "").upper(), 2)
+
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    """An exact amount of one currency."""
+
+    minor: int
+    currency: str
+
+    @classmethod
+    def parse(cls, amount: str | int | Decimal | None, currency: str | None) -> Money:
+        """*amount* as Splitwise sends it; None and "" are zero."""
+        currency = currency or ""
+        return cls(to_minor(amount or 0, places(currency)), currency)
+
+    def __str__(self) -> str:
+        return from_minor(self.minor, places(self.currency))
+
+    def __bool__(self) -> bool:
+        return self.minor != 0
+
+    def __neg__(self) -> Money:
+        return Money(-self.minor, self.currency)
+
+    def __abs__(self) -> Money:
+        return Money(abs(self.minor), self.currency)
+
+    def _same(self, other: Money) -> None:
+        if other.currency != self.currency:
+            raise ValueError(f"cannot combine {self.currency} and {other.currency}")
+
+    def __add__(self, other: Money) -> Money:
+        self._same(other)
+        return Money(self.minor + other.minor, self.currency)
+
+    def __sub__(self, other: Money) -> Money:
+        self._same(other)
+        return Money(self.minor - other.minor, self.currency)
@@ -0,0 +1,174 @@
+"""Index of recurring expenses and a forecaster for their upcoming charges.
+
+``RecurringIndex`` holds only the expenses with ``repeats`` set, keyed by
+ID and ordered by ``next_repeat``, and is kept current like every
+:class:`~splitwise_mcp.indexing.ExpenseIndex`. Forecasts are answered from
+the index alone.
+"""
+
+from __future__ import annotations
+
+import bisect
+import calendar
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from splitwise_mcp.indexing import ExpenseIndex
+from splitwise_mcp.money import Money
+from splitwise_mcp.streaming import fields_spec
+
+RECURRING_FIELDS = fields_spec(
+    (
+        "id",
+        "description",
+        "cost",
+        "currency_code",
+        "group_id",
+        "date",
+        "repeats",
+        "repeat_interval",
+        "next_repeat",
+        "updated_at",
+        "deleted_at",
+        "payment",
+    )
+)
+
+_STEP_DAYS = {"weekly": 7, "fortnightly": 14}
+_STEP_MONTHS = {"monthly": 1, "yearly": 12}
+
+
+@dataclass(frozen=True)
+class RecurringSeries:
+    expense_id: int
+    description: str
+    cost: str
+    currency_code: str
+    group_id: int | None
+    interval: str
+    anchor: date
+    next_repeat: date
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    day: date
+    series: RecurringSeries
+
+
+def _day(value: str | None) -> date | None:
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def _add_months(day: date, months: int, anchor_day: int) -> date:
+    """*day* moved by *months*, keeping the series' day of month when possible."""
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(series: RecurringSeries, start: date, end: date) -> Iterator[date]:
+    """Charge dates of *series* from *start* to *end*, inclusive."""
+    day = series.next_repeat
+    n = 0
+    while day <= end:
+        if day >= start:
+            yield day
+        n += 1
+        if series.interval in _STEP_DAYS:
+            day = series.next_repeat + timedelta(days=_STEP_DAYS[series.interval] * n)
+        else:
+            # Step from next_repeat each time, so a 31st is not clamped forever
+            day = _add_months(
+                series.next_repeat,
+                _STEP_MONTHS[series.interval] * n,
+                series.anchor.day,
+            )
+
+
+class RecurringIndex(ExpenseIndex):
+    """Recurring expenses by ID, ordered by their next charge date."""
+
+    fields = RECURRING_FIELDS
+
+    def __init__(self) -> None:
+        self._series: dict[int, RecurringSeries] = {}
+        # (next_repeat, expense_id), kept sorted for window queries
+        self._order: list[tuple[date, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def _remove(self, expense_id: int) -> None:
+        old = self._series.pop(expense_id, None)
+        if old is not None:
+            i = bisect.bisect_left(self._order, (old.next_repeat, expense_id))
+            del self._order[i]
+
+    def _apply(self, expense: dict[str, Any]) -> None:
+        expense_id = expense["id"]
+        if "repeats" not in expense and "repeat_interval" not in expense:
+            return  # a partial object; says nothing about recurrence
+        self._remove(expense_id)
+        interval = expense.get("repeat_interval")
+        anchor = _day(expense.get("date"))
+        if (
+            not expense.get("repeats")
+            or expense.get("deleted_at")
+            or interval not in (*_STEP_DAYS, *_STEP_MONTHS)
+            or anchor is None
+        ):
+            return
+        next_repeat = _day(expense.get("next_repeat"))
+        if next_repeat is None:
+            # Not reported: roll the first charge forward to today
+            series = RecurringSeries(
+                expense_id, "", "0", "", None, interval, anchor, anchor
+            )
+            next_repeat = next(occurrences(series, date.today(), date.max), anchor)
+        series = RecurringSeries(
+            expense_id=expense_id,
+            description=expense.get("description") or "",
+            cost=str(expense.get("cost") or "0"),
+            currency_code=expense.get("currency_code") or "",
+            group_id=expense.get("group_id") or None,
+            interval=interval,
+            anchor=anchor,
+            next_repeat=next_repeat,
+        )
+        self._series[expense_id] = series
+        bisect.insort(self._order, (next_repeat, expense_id))
+
+    def forget(self, expense_id: int) -> None:
+        self._remove(expense_id)
+
+    def forecast(
+        self, start: date, end: date, *, group_id: int | None = None
+    ) -> tuple[list[Occurrence], dict[tuple[int | None, str], str]]:
+        """Charges due between *start* and *end*, and totals per group/currency."""
+        found: list[Occurrence] = []
+        totals: dict[tuple[int | None, str], Money] = {}
+        # Series whose next charge is after *end* cannot fall in the window
+        stop = bisect.bisect_right(self._order, (end, float("inf")))
+        for _, expense_id in self._order[:stop]:
+            series = self._series[expense_id]
+            if group_id is not None and series.group_id != group_id:
+                continue
+            due = [Occurrence(day, series) for day in occurrences(series, start, end)]
+            if not due:
+                continue
+            found.extend(due)
+            cost = Money.parse(series.cost, series.currency_code)
+            charged = Money(cost.minor * len(due), cost.currency)
+            key = (series.group_id, series.currency_code)
+            totals[key] = totals[key] + charged if key in totals else charged
+        found.sort(key=lambda o: (o.day, o.series.expense_id))
+        return found, {key: str(v) for key, v in totals.items()}
+
+    def stats(self) -> dict[str, int]:
+        return {"series": len(self._series)}
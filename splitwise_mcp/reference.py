@@ -0,0 +1,190 @@
+"""Cached reference data for pre-flight checks of expense arguments.
+
+Categories, currencies, groups and the users you can split with change
+rarely, so ``SplitwiseClient`` keeps them here and checks ``category_id``,
+``currency_code``, ``group_id`` and ``users`` locally before a mutation is
+sent. An unknown value yields a message with the nearest valid matches,
+which gives an agent something better to retry with than a bare API error.
+
+A miss never rejects on stale data alone: the table is reloaded first
+unless it was fetched within ``min_refresh`` seconds and nothing has been
+mutated through the client since. If the reference data itself cannot be
+fetched the check is skipped and the API has the final word.
+"""
+
+from __future__ import annotations
+
+import difflib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Suggestions offered per unknown value
+_MAX_SUGGESTIONS = 3
+
+
+@dataclass
+class _Table:
+    loaded_at: float
+    # value → label shown in suggestions
+    entries: dict[Any, str]
+    # group id → member ids (groups table only)
+    members: dict[int, set[int]] = field(default_factory=dict)
+
+
+def _name(user: dict) -> str:
+    return " ".join(filter(None, (user.get("first_name"), user.get("last_name"))))
+
+
+class ReferenceData:
+    """Lazily loaded categories, currencies, groups and users.
+
+    ``fetch`` performs an uncached GET of an API path. Tables expire after
+    ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Any]],
+        ttl: float = 3600.0,
+        min_refresh: float = 10.0,
+    ) -> None:
+        self._fetch = fetch
+        self._ttl = ttl
+        self._min_refresh = min_refresh
+        self._tables: dict[str, _Table] = {}
+        # Set by mutations; groups and friends may have changed
+        self._stale = False
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    async def _load(self, kind: str) -> _Table:
+        now = time.monotonic()
+        if kind == "categories":
+            data = await self._fetch("/get_categories")
+            entries: dict[Any, str] = {}
+            for parent in data.get("categories", []):
+                entries[parent["id"]] = parent.get("name", "")
+                for sub in parent.get("subcategories") or []:
+                    entries[sub["id"]] = f"{parent.get('name')} › {sub.get('name')}"
+            return _Table(now, entries)
+        if kind == "currencies":
+            data = await self._fetch("/get_currencies")
+            return _Table(
+                now,
+                {c["currency_code"]: c.get("unit", "") for c in data["currencies"]},
+            )
+        if kind == "groups":
+            data = await self._fetch("/get_groups")
+            table = _Table(now, {})
+            for g in data.get("groups", []):
+                table.entries[g["id"]] = g.get("name", "")
+                table.members[g["id"]] = {m["id"] for m in g.get("members") or []}
+            return table
+        # "users": yourself, your friends and everyone in your groups
+        me = (await self._fetch("/get_current_user")).get("user", {})
+        friends = (await self._fetch("/get_friends")).get("friends", [])
+        entries = {f["id"]: _name(f) for f in friends}
+        entries[me.get("id")] = _name(me) or "you"
+        for ids in (await self._table("groups")).members.values():
+            for uid in ids:
+                entries.setdefault(uid, "")
+        return _Table(now, entries)
+
+    async def _table(self, kind: str, *, refresh: bool = False) -> _Table:
+        table = self._tables.get(kind)
+        if refresh or table is None or time.monotonic() - table.loaded_at > self._ttl:
+            table = self._tables[kind] = await self._load(kind)
+        return table
+
+    async def _lookup(self, kind: str, present: Callable[[_Table], bool]) -> _Table:
+        """The table for *kind*, reloaded once if *present* says it is lacking."""
+        table = await self._table(kind)
+        if present(table):
+            return table
+        if self._stale or time.monotonic() - table.loaded_at > self._min_refresh:
+            if kind in ("groups", "users"):
+                # Users are derived from groups, so both are reloaded
+                self._stale = False
+                self._tables.pop("groups", None)
+                self._tables.pop("users", None)
+            table = await self._table(kind, refresh=True)
+        return table
+
+    @staticmethod
+    def _unknown(label: str, value: Any, entries: dict[Any, str]) -> str:
+        message = f"unknown {label} {value!r}"
+        if isinstance(value, int):
+            # IDs sharing digits are no likelier to be meant; name a few real ones
+            named = [k for k, name in entries.items() if name][:_MAX_SUGGESTIONS]
+            if named:
+                known = ", ".join(f"{k} ({entries[k]})" for k in named)
+                message += f"; valid ones include {known}"
+            return message
+        by_text = {str(k).upper(): k for k in entries}
+        close = difflib.get_close_matches(
+            str(value).upper(), by_text, n=_MAX_SUGGESTIONS, cutoff=0.5
+        )
+        if close:
+            options = []
+            for text in close:
+                key = by_text[text]
+                name = entries[key]
+                options.append(f"{key} ({name})" if name else str(key))
+            message += f"; did you mean {', '.join(options)}?"
+        return message
+
+    async def problems(
+        self,
+        *,
+        category_id: int | None = None,
+        currency_code: str | None = None,
+        group_id: int | None = None,
+        user_ids: Iterable[int] = (),
+    ) -> list[str]:
+        """Describe every argument that refers to something that does not exist."""
+        found: list[str] = []
+        try:
+            if category_id is not None:
+                table = await self._lookup(
+                    "categories", lambda t: category_id in t.entries
+                )
+                if category_id not in table.entries:
+                    found.append(
+                        self._unknown("category_id", category_id, table.entries)
+                    )
+            if currency_code is not None:
+                table = await self._lookup(
+                    "currencies", lambda t: currency_code in t.entries
+                )
+                if currency_code not in table.entries:
+                    found.append(
+                        self._unknown("currency_code", currency_code, table.entries)
+                    )
+            # group_id 0 means "no group" to Splitwise
+            if group_id:
+                table = await self._lookup("groups", lambda t: group_id in t.entries)
+                if group_id not in table.entries:
+                    found.append(self._unknown("group_id", group_id, table.entries))
+                    group_id = None
+            for uid in user_ids:
+                table = await self._lookup("users", lambda t, uid=uid: uid in t.entries)
+                if uid not in table.entries:
+                    found.append(self._unknown("user_id", uid, table.entries))
+                    continue
+                if group_id:
+                    table = await self._lookup(
+                        "groups",
+                        lambda t, uid=uid: uid in t.members.get(group_id, ()),
+                    )
+                    if uid not in table.members.get(group_id, ()):
+                        found.append(f"user {uid} is not a member of group {group_id}")
+        except Exception as e:  # noqa: BLE001 — fail open; the API still validates
+            logger.debug("Reference data unavailable, skipping checks: %s", e)
+            return []
+        return found
@@ -0,0 +1,352 @@
+"""Fuzzy lookup of friends, group members and groups by name.
+
+Tools take numeric IDs, so without help an agent lists friends or groups
+and scans the output to turn "Alice" or "Goa trip" into an ID.
+:class:`NameIndex` answers that locally. It is built from the
+``get_current_user``, ``get_friends`` and ``get_groups`` responses that
+``SplitwiseClient`` already reads, so it is refreshed whenever those are,
+and mutations mark it stale.
+
+Names and emails are casefolded and stripped of accents and punctuation.
+Each entry is indexed two ways: a sorted list of its words, searched by
+prefix with :mod:`bisect`, and an inverted index of character trigrams
+that finds candidates for misspellings. A lookup only scores the entries
+these return.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from splitwise_mcp.client import SplitwiseClient
+
+KINDS = ("friend", "user", "group")
+
+_NON_WORD = re.compile(r"[\W_]+")
+# Matches scoring below this are not worth showing
+_MIN_SCORE = 0.3
+# Lowest score of a match on word prefixes
+_PREFIX_SCORE = 0.8
+# Entries sharing the most trigrams with a query that are then scored for
+# misspellings
+_FUZZY_CANDIDATES = 10
+_SELF_ALIASES = ("me", "you", "myself")
+
+
+def normalize(text: str) -> str:
+    """Casefolded *text* without accents or punctuation."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_NON_WORD.sub(" ", stripped).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _full_name(user: dict) -> str:
+    return " ".join(filter(None, (user.get("first_name"), user.get("last_name"))))
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    kind: str  # "friend", "user" (a group member who is not a friend) or "group"
+    id: int
+    name: str
+    detail: str
+    score: float
+
+
+@dataclass
+class _Entry:
+    kind: str
+    id: int
+    name: str
+    detail: str
+    keys: tuple[str, ...]  # normalized full strings that match exactly
+    grams: set[str]
+
+
+class NameIndex:
+    """Prefix and trigram index over the user's friends and groups."""
+
+    def __init__(self, max_age: float = 300.0) -> None:
+        self._max_age = max_age
+        # Latest responses, by source ("me", "friends", "groups")
+        self._sources: dict[str, Any] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._stale = False
+        self._entries: list[_Entry] | None = None  # None until (re)built
+        self._words: list[tuple[str, int]] = []  # sorted (word, entry index)
+        self._grams: dict[str, list[int]] = {}
+        self._exact: dict[str, list[int]] = {}  # key → entry indexes
+        self._lock = asyncio.Lock()
+
+    def _set(self, source: str, value: Any) -> None:
+        self._sources[source] = value
+        self._loaded_at[source] = time.monotonic()
+        self._entries = None
+
+    def set_current_user(self, user: dict) -> None:
+        self._set("me", user)
+
+    def set_friends(self, friends: list[dict]) -> None:
+        self._set("friends", friends)
+
+    def set_groups(self, groups: list[dict]) -> None:
+        self._set("groups", groups)
+
+    def mark_stale(self) -> None:
+        """Friends or groups may have changed; refetch if a lookup misses."""
+        self._stale = True
+
+    async def refresh(self, client: SplitwiseClient, *, force: bool = False) -> None:
+        """Fetch the sources that are missing or expired, or all if *force*.
+
+        The client's getters feed the results back through the setters.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            fetchers = {
+                "me": client.get_current_user,
+                "friends": client.get_friends,
+                "groups": client.get_groups,
+            }
+            due = [
+                fetch()
+                for source, fetch in fetchers.items()
+                if force
+                or now - self._loaded_at.get(source, -self._max_age) >= self._max_age
+            ]
+            if force:
+                self._stale = False
+            if due:
+                await asyncio.gather(*due)
+
+    async def resolve(
+        self,
+        client: SplitwiseClient,
+        query: str,
+        *,
+        kind: str | None = None,
+        limit: int = 5,
+    ) -> list[NameMatch]:
+        """:meth:`lookup` against fresh data.
+
+        After a mutation the index is refetched only if the lookup finds no
+        exact or prefix match, so most lookups cost no request at all.
+        """
+        await self.refresh(client)
+        matches = self.lookup(query, kind=kind, limit=limit)
+        if self._stale and (not matches or matches[0].score < _PREFIX_SCORE):
+            await self.refresh(client, force=True)
+            matches = self.lookup(query, kind=kind, limit=limit)
+        return matches
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def _collect(self) -> list[_Entry]:
+        me = self._sources.get("me") or {}
+        friends = self._sources.get("friends") or []
+        groups = self._sources.get("groups") or []
+        groups_of: defaultdict[int, list[str]] = defaultdict(list)
+        members: dict[int, dict] = {}
+        entries: list[_Entry] = []
+        for g in groups:
+            if g.get("id") is None:
+                continue
+            for m in g.get("members") or ():
+                if m.get("id") is not None:
+                    groups_of[m["id"]].append(g.get("name") or "")
+                    members.setdefault(m["id"], m)
+            # Group 0 holds non-group expenses and has no useful name
+            if g["id"]:
+                names = ", ".join(
+                    filter(None, (_full_name(m) for m in g.get("members") or ()))
+                )
+                entries.append(
+                    self._entry("group", g["id"], g.get("name") or "", names)
+                )
+
+        def shared(uid: int) -> str:
+            return f"in {', '.join(groups_of[uid])}" if groups_of.get(uid) else ""
+
+        seen: set[int] = set()
+        if me.get("id") is not None:
+            seen.add(me["id"])
+            entries.append(
+                self._entry(
+                    "user",
+                    me["id"],
+                    _full_name(me) or "you",
+                    "you",
+                    email=me.get("email"),
+                    aliases=_SELF_ALIASES,
+                )
+            )
+        for f in friends:
+            if f.get("id") is None or f["id"] in seen:
+                continue
+            seen.add(f["id"])
+            detail = "; ".join(filter(None, (f.get("email"), shared(f["id"]))))
+            entries.append(
+                self._entry(
+                    "friend", f["id"], _full_name(f), detail, email=f.get("email")
+                )
+            )
+        for uid, m in members.items():
+            if uid not in seen:
+                entries.append(
+                    self._entry(
+                        "user", uid, _full_name(m), shared(uid), email=m.get("email")
+                    )
+                )
+        return entries
+
+    @staticmethod
+    def _entry(
+        kind: str,
+        entity_id: int,
+        name: str,
+        detail: str,
+        *,
+        email: str | None = None,
+        aliases: tuple[str, ...] = (),
+    ) -> _Entry:
+        keys = [normalize(name), *aliases]
+        if email:
+            keys.append(email.casefold())
+            keys.append(normalize(email.split("@")[0]))
+        keys = [k for k in keys if k]
+        return _Entry(
+            kind,
+            entity_id,
+            name,
+            detail,
+            tuple(keys),
+            set().union(*(trigrams(k) for k in keys)) if keys else set(),
+        )
+
+    def _build(self) -> list[_Entry]:
+        entries = self._collect()
+        words: set[tuple[str, int]] = set()
+        grams: defaultdict[str, list[int]] = defaultdict(list)
+        exact: defaultdict[str, list[int]] = defaultdict(list)
+        for i, entry in enumerate(entries):
+            for key in set(entry.keys):
+                exact[key].append(i)
+                words.update((w, i) for w in key.split())
+            for gram in entry.grams:
+                grams[gram].append(i)
+        self._words = sorted(words)
+        self._grams = dict(grams)
+        self._exact = dict(exact)
+        self._entries = entries
+        return entries
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _prefixed(self, word: str) -> set[int]:
+        """Entries with a word starting with *word*."""
+        start = bisect.bisect_left(self._words, (word,))
+        found = set()
+        for w, i in self._words[start:]:
+            if not w.startswith(word):
+                break
+            found.add(i)
+        return found
+
+    def lookup(
+        self, query: str, *, kind: str | None = None, limit: int = 5
+    ) -> list[NameMatch]:
+        """Entries matching *query*, best first.
+
+        An exact name, email or alias scores 1.0; every query word being the
+        start of a word in the entry scores from 0.8 to 0.95. Otherwise the
+        entries sharing the most trigrams with *query* are scored by edit
+        similarity, scaled below the prefix matches.
+        """
+        entries = self._entries if self._entries is not None else self._build()
+        q = normalize(query) if "@" not in query else query.strip().casefold()
+        if not q:
+            return []
+        exact = self._exact.get(q, [])
+        # Entries where every query word starts a word of theirs
+        words = q.split()
+        prefixed = self._prefixed(words[0])
+        for w in words[1:]:
+            prefixed &= self._prefixed(w)
+        matches = []
+        for i in prefixed.union(exact):
+            entry = entries[i]
+            if kind is None or entry.kind == kind:
+                score = (
+                    1.0
+                    if q in entry.keys
+                    else _PREFIX_SCORE
+                    + 0.15 * min(1.0, len(q) / max(map(len, entry.keys)))
+                )
+                matches.append(self._match(entry, score))
+        # Misspellings score below every prefix match, so they are only
+        # looked for when nothing matched directly
+        if not matches:
+            matches = self._fuzzy(q, kind)
+        matches.sort(key=lambda m: (-m.score, m.name))
+        return matches[:limit]
+
+    def _fuzzy(self, q: str, kind: str | None) -> list[NameMatch]:
+        """Entries sharing the most trigrams with *q*, by edit similarity."""
+        entries = self._entries or []
+        # Trigrams common to many entries (" @e", "com") say little; skip them
+        common = max(_FUZZY_CANDIDATES, len(entries) // 4)
+        shared: Counter[int] = Counter()
+        for gram in trigrams(q):
+            postings = self._grams.get(gram, ())
+            if len(postings) <= common:
+                shared.update(postings)
+        found = []
+        if kind is not None:
+            shared = Counter(
+                {i: n for i, n in shared.items() if entries[i].kind == kind}
+            )
+        # SequenceMatcher caches its analysis of the second sequence
+        matcher = SequenceMatcher(None, "", q)
+        for i, _ in shared.most_common(_FUZZY_CANDIDATES):
+            entry = entries[i]
+            best = 0.0
+            # A one-word query is compared with single words, so "alcie"
+            # matches "alice smith"
+            texts = (
+                entry.keys if " " in q else {w for k in entry.keys for w in k.split()}
+            )
+            for text in texts:
+                matcher.set_seq1(text)
+                if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+                    best = max(best, matcher.ratio())
+            score = 0.75 * best
+            if score >= _MIN_SCORE:
+                found.append(self._match(entry, score))
+        return found
+
+    @staticmethod
+    def _match(entry: _Entry, score: float) -> NameMatch:
+        return NameMatch(
+            entry.kind, entry.id, entry.name, entry.detail, round(score, 2)
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries or ()), "words": len(self._words)}
@@ -0,0 +1,88 @@
+"""MCP resources for groups, friends, balances and expenses.
+
+The same data the list/get tools return, addressable by URI so clients can
+read it without a tool call, keep a copy and subscribe to updates (see
+:mod:`splitwise_mcp.subscriptions`).
+"""
+
+from __future__ import annotations
+
+from splitwise_mcp.app import get_app_context, mcp, resource_hub
+from splitwise_mcp.client import SplitwiseClient
+from splitwise_mcp.subscriptions import Renderer
+from splitwise_mcp.utils.formatters import (
+    format_balance_summary,
+    format_expense,
+    format_expense_list,
+    format_friend,
+    format_friend_list,
+    format_group,
+    format_group_list,
+)
+
+# Expenses shown by the recent-expenses resources
+RECENT_EXPENSES = 20
+
+
+def _client() -> SplitwiseClient:
+    app = get_app_context()
+    if app is None:
+        raise RuntimeError("MCP session not initialized")
+    return app.splitwise
+
+
+def _resource(uri: str, description: str):
+    """Register *uri* with FastMCP and with the subscription hub."""
+
+    def decorator(render: Renderer) -> Renderer:
+        resource_hub.register(uri, render)
+        mcp.resource(uri, description=description, mime_type="text/plain")(render)
+        return render
+
+    return decorator
+
+
+@_resource("splitwise://groups", "Your groups and their members")
+async def groups() -> str:
+    return format_group_list(await _client().get_groups())
+
+
+@_resource("splitwise://friends", "Your friends and your balance with each")
+async def friends() -> str:
+    return format_friend_list(await _client().get_friends())
+
+
+@_resource("splitwise://balances", "What you owe and are owed, by friend and group")
+async def balances() -> str:
+    client = _client()
+    me = await client.get_current_user()
+    return format_balance_summary(
+        me["id"], await client.get_friends(), await client.get_groups()
+    )
+
+
+@_resource("splitwise://expenses/recent", "Your most recent expenses")
+async def recent_expenses() -> str:
+    return format_expense_list(await _client().get_expenses(limit=RECENT_EXPENSES))
+
+
+@_resource("splitwise://group/{group_id}", "A group with its members and debts")
+async def group(group_id: int) -> str:
+    return format_group(await _client().get_group(group_id))
+
+
+@_resource("splitwise://group/{group_id}/expenses", "A group's most recent expenses")
+async def group_expenses(group_id: int) -> str:
+    return format_expense_list(
+        await _client().get_expenses(group_id=group_id, limit=RECENT_EXPENSES)
+    )
+
+
+@_resource("splitwise://friend/{friend_id}", "A friend and your balance with them")
+async def friend(friend_id: int) -> str:
+    return format_friend(await _client().get_friend(friend_id))
+
+
+@_resource("splitwise://expense/{expense_id}", "One expense with its shares")
+async def expense(expense_id: int) -> str:
+    return format_expense(await _client().get_expense(expense_id))
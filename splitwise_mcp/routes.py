@@ -0,0 +1,59 @@
+"""Worker-level health and metrics HTTP routes (HTTP/SSE transports only)."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from splitwise_mcp.app import get_app_context, mcp
+from splitwise_mcp.metrics import worker_metrics
+
+
+def _flatten(prefix: str, stats: dict[str, Any]) -> list[tuple[str, float]]:
+    items: list[tuple[str, float]] = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            items.extend(_flatten(name, value))
+        elif isinstance(value, int | float):
+            items.append((name, value))
+    return items
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> Response:
+    """Liveness/readiness probe for this worker."""
+    app = get_app_context()
+    snapshot = worker_metrics.snapshot()
+    body = {
+        "status": "ok" if app is not None else "starting",
+        "pid": snapshot["pid"],
+        "uptime_seconds": snapshot["uptime_seconds"],
+        "in_flight": snapshot["in_flight"],
+    }
+    return JSONResponse(body, status_code=200 if app is not None else 503)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Prometheus text exposition of this worker's counters."""
+    snapshot = worker_metrics.snapshot()
+    pid = snapshot["pid"]
+    lines = [
+        f'splitwise_mcp_uptime_seconds{{pid="{pid}"}} {snapshot["uptime_seconds"]}',
+        f'splitwise_mcp_in_flight{{pid="{pid}"}} {snapshot["in_flight"]}',
+    ]
+    for metric, key in (
+        ("tool_calls_total", "tool_calls"),
+        ("tool_errors_total", "tool_errors"),
+        ("tool_seconds_total", "tool_seconds"),
+    ):
+        for tool, value in sorted(snapshot[key].items()):
+            lines.append(f'splitwise_mcp_{metric}{{pid="{pid}",tool="{tool}"}} {value}')
+    app = get_app_context()
+    if app is not None:
+        for name, value in _flatten("splitwise_mcp", app.stats()):
+            lines.append(f'{name}{{pid="{pid}"}} {value}')
+    return PlainTextResponse("\n".join(lines) + "\n")
@@ -0,0 +1,173 @@
+"""Priority scheduling of Splitwise requests.
+
+Every tool shares one ``SplitwiseClient``, so without coordination an
+import posting hundreds of expenses, or a full-history walk for the
+indexes, fills the connection pool while a user's quick ``get_friend``
+queues behind it. :class:`Scheduler` sits between the client and the
+network and admits each request according to its priority class:
+
+* ``interactive`` — tool calls an agent is waiting on (the default)
+* ``background`` — index refreshes, the write-journal flusher, resource
+  subscription checks
+* ``bulk`` — imports and exports
+
+The class comes from a context variable, so code starts a class with
+``with priority(BULK): ...`` and every request made below it, including
+in tasks it spawns, is queued as bulk. At most ``max_concurrent``
+requests are in flight, and background and bulk have lower caps of their
+own so interactive calls always find a free slot. When more requests
+wait than there are slots, the next one is chosen by weighted fair
+queuing: each class is served in proportion to its weight, so bulk work
+slows down under interactive load but never stops. Queue wait times are
+recorded per class.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, BACKGROUND, BULK)
+
+# Share of the slots each class gets when all of them are waiting
+WEIGHTS = {INTERACTIVE: 8, BACKGROUND: 2, BULK: 1}
+
+_priority: ContextVar[str] = ContextVar("splitwise_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: str) -> Iterator[None]:
+    """Send the requests made inside the block at priority *level*."""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority {level!r}; use one of {PRIORITIES}")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class _ClassStats:
+    running: int = 0
+    admitted: int = 0
+    waited: int = 0  # admitted after queueing
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class Scheduler:
+    """Concurrency slots shared by priority classes with weighted fair queuing."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        caps: dict[str, int] | None = None,
+        weights: dict[str, int] | None = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self._caps = {level: max_concurrent for level in PRIORITIES}
+        self._caps.update(caps or {})
+        self._weights = {**WEIGHTS, **(weights or {})}
+        # Per class: (virtual finish time, enqueued at, waiter) in FIFO order
+        self._queues: dict[str, deque[tuple[float, float, asyncio.Future]]] = {
+            level: deque() for level in PRIORITIES
+        }
+        self._last_finish = dict.fromkeys(PRIORITIES, 0.0)
+        self._virtual_time = 0.0
+        self._running = 0
+        self._stats = {level: _ClassStats() for level in PRIORITIES}
+
+    def _eligible(self, level: str) -> bool:
+        return self._stats[level].running < self._caps[level]
+
+    def _admit(self, level: str) -> None:
+        self._running += 1
+        self._stats[level].running += 1
+        self._stats[level].admitted += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, lowest virtual finish time first."""
+        while self._running < self.max_concurrent:
+            best = None
+            for level, queue in self._queues.items():
+                # Waiters cancelled while queued are dropped here
+                while queue and queue[0][2].done():
+                    queue.popleft()
+                if (
+                    queue
+                    and self._eligible(level)
+                    and (best is None or queue[0][0] < self._queues[best][0][0])
+                ):
+                    best = level
+            if best is None:
+                return
+            finish, enqueued, waiter = self._queues[best].popleft()
+            self._virtual_time = finish
+            self._admit(best)
+            stats = self._stats[best]
+            wait = time.monotonic() - enqueued
+            stats.waited += 1
+            stats.wait_seconds += wait
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+            waiter.set_result(None)
+
+    def _release(self, level: str) -> None:
+        self._running -= 1
+        self._stats[level].running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the current priority class."""
+        level = _priority.get()
+        queue = self._queues[level]
+        if (
+            self._running < self.max_concurrent
+            and self._eligible(level)
+            and not any(self._queues.values())
+        ):
+            self._admit(level)
+        else:
+            # A class that has been idle starts at the current virtual time
+            # rather than cashing in service it did not use
+            finish = (
+                max(self._virtual_time, self._last_finish[level])
+                + 1.0 / self._weights[level]
+            )
+            self._last_finish[level] = finish
+            waiter = asyncio.get_running_loop().create_future()
+            queue.append((finish, time.monotonic(), waiter))
+            self._dispatch()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Admitted just as we were cancelled; pass the slot on
+                    self._release(level)
+                raise
+        try:
+            yield
+        finally:
+            self._release(level)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            level: {
+                "queued": sum(not w.done() for _, _, w in self._queues[level]),
+                "running": s.running,
+                "admitted": s.admitted,
+                "waited": s.waited,
+                "wait_seconds": round(s.wait_seconds, 6),
+                "max_wait_seconds": round(s.max_wait_seconds, 6),
+            }
+            for level, s in self._stats.items()
+        }
@@ -1,18 +1,220 @@
 """Splitwise MCP Server — entry point.
 
-Imports the shared mcp instance from app.py, registers all tools,
-and provides the CLI entry point.
+Imports the shared mcp instance from app.py, registers all tools, resources
+and HTTP routes, and provides the CLI entry point.
 """
 
-from splitwise_mcp.app import mcp  # noqa: F401
+import argparse
+import asyncio
+import json
+import os
+from dataclasses import asdict
 
-# Register all tools (side-effect imports)
+from splitwise_mcp.app import mcp
+
+# Register all tools, resources and HTTP routes (side-effect imports)
+import splitwise_mcp.resources  # noqa: E402, F401
+import splitwise_mcp.routes  # noqa: E402, F401
 import splitwise_mcp.tools  # noqa: E402, F401
+from splitwise_mcp.client import SplitwiseClient
+from splitwise_mcp.config import Settings
+from splitwise_mcp.export import FORMATS, export_expenses
+from splitwise_mcp.importer import DEFAULT_MAPPING, ImportPlan, import_expenses
+from splitwise_mcp.loadgen import run_load
+from splitwise_mcp.utils.formatters import (
+    format_export_result,
+    format_import_result,
+    format_load_report,
+)
+
+
+def http_app():
+    """ASGI app factory — uvicorn calls this once in every worker process."""
+    settings = Settings()
+    stateless = settings.stateless_http
+    if stateless is None:
+        stateless = settings.workers > 1
+    return mcp.http_app(transport=settings.transport, stateless_http=stateless)
+
+
+async def _export(args: argparse.Namespace, settings: Settings) -> None:
+    client = SplitwiseClient(settings.splitwise_api_key, settings.splitwise_base_url)
+    try:
+        result = await export_expenses(
+            client,
+            args.output,
+            format=args.format,
+            fields=args.fields.split(",") if args.fields else None,
+            include_deleted=args.include_deleted,
+            include_payments=args.include_payments,
+            page_size=args.page_size,
+            group_id=args.group_id,
+            friend_id=args.friend_id,
+            dated_after=args.dated_after,
+            dated_before=args.dated_before,
+            updated_after=args.updated_after,
+            updated_before=args.updated_before,
+        )
+    finally:
+        await client.close()
+    print(format_export_result(asdict(result)))
+
+
+async def _import(args: argparse.Namespace, settings: Settings) -> None:
+    mapping = dict(DEFAULT_MAPPING)
+    for item in args.map or []:
+        field, _, column = item.partition("=")
+        mapping[field] = column
+    plan = ImportPlan(
+        mapping=mapping,
+        date_format=args.date_format,
+        group_id=args.group_id,
+        currency_code=args.currency,
+        category_id=args.category_id,
+        split_equally=args.split_equally,
+        users=json.loads(args.users) if args.users else None,
+    )
+    client = SplitwiseClient(
+        settings.splitwise_api_key,
+        settings.splitwise_base_url,
+        reference_ttl=settings.reference_ttl,
+    )
+    try:
+        result = await import_expenses(
+            client,
+            args.input,
+            plan,
+            concurrency=args.concurrency,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await client.close()
+    print(format_import_result(asdict(result)))
+
 
+async def _loadgen(args: argparse.Namespace) -> None:
+    report = await run_load(
+        args.sessions, url=args.url, scale=args.scale, speed=args.speed
+    )
+    print(format_load_report(asdict(report)))
 
-def main() -> None:
+
+def main(argv: list[str] | None = None) -> None:
     """CLI entry point."""
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(
+        prog="splitwise-mcp", description="Splitwise MCP server"
+    )
+    parser.add_argument("--transport", choices=["stdio", "http", "sse"])
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int, help="Worker processes (HTTP only)")
+    parser.add_argument(
+        "--stateless-http",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Serve every request without session state (default: on if workers > 1)",
+    )
+    commands = parser.add_subparsers(dest="command")
+    export = commands.add_parser(
+        "export", help="Stream the full expense history to a JSONL/CSV/Parquet file"
+    )
+    export.add_argument("output", help="Output file path")
+    export.add_argument("--format", choices=FORMATS, help="Default: from extension")
+    export.add_argument("--fields", help="Comma-separated fields, e.g. id,cost")
+    export.add_argument("--group-id", type=int)
+    export.add_argument("--friend-id", type=int)
+    export.add_argument("--dated-after")
+    export.add_argument("--dated-before")
+    export.add_argument("--updated-after")
+    export.add_argument("--updated-before")
+    export.add_argument("--include-deleted", action="store_true")
+    export.add_argument(
+        "--include-payments", action=argparse.BooleanOptionalAction, default=True
+    )
+    export.add_argument("--page-size", type=int, default=500)
+    import_ = commands.add_parser(
+        "import", help="Create expenses from a CSV file or bank statement"
+    )
+    import_.add_argument("input", help="CSV file path")
+    import_.add_argument(
+        "--map",
+        action="append",
+        metavar="FIELD=COLUMN",
+        help="Map an expense field to a CSV column (repeatable)",
+    )
+    import_.add_argument("--date-format", help="strptime format (default ISO)")
+    import_.add_argument("--group-id", type=int)
+    import_.add_argument("--currency", default="USD")
+    import_.add_argument("--category-id", type=int)
+    import_.add_argument("--split-equally", action="store_true")
+    import_.add_argument(
+        "--users",
+        help='JSON split template, e.g. \'[{"user_id": 1, "paid_percent": 100, '
+        '"owed_percent": 50}, ...]\'',
+    )
+    import_.add_argument("--concurrency", type=int, default=4)
+    import_.add_argument("--dry-run", action="store_true")
+    loadgen = commands.add_parser(
+        "loadgen", help="Replay recorded tool-call sessions against a server"
+    )
+    loadgen.add_argument("sessions", help="Session log written with RECORD_SESSIONS")
+    loadgen.add_argument(
+        "--url",
+        help="MCP endpoint, e.g. http://127.0.0.1:8000/mcp (default: in-process)",
+    )
+    loadgen.add_argument(
+        "--scale", type=int, default=1, help="Concurrent copies of each session"
+    )
+    loadgen.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Divide the gaps between calls by this (0: no gaps)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "loadgen":
+        asyncio.run(_loadgen(args))
+        return
+
+    if args.command in ("export", "import"):
+        settings = Settings()
+        if not settings.splitwise_api_key:
+            parser.error(f"{args.command} needs SPLITWISE_API_KEY")
+        command = _export if args.command == "export" else _import
+        try:
+            asyncio.run(command(args, settings))
+        except ValueError as e:
+            parser.error(str(e))
+        return
+
+    # CLI flags override .env; export them so that uvicorn worker processes,
+    # which each build their own Settings, see the same configuration.
+    for name in ("transport", "host", "port", "workers"):
+        value = getattr(args, name)
+        if value is not None:
+            os.environ[name.upper()] = str(value)
+    if args.stateless_http is not None:
+        os.environ["STATELESS_HTTP"] = str(args.stateless_http).lower()
+
+    settings = Settings()
+    if settings.transport == "stdio":
+        mcp.run(transport="stdio")
+        return
+    if settings.transport == "sse" and settings.workers > 1:
+        parser.error("the sse transport keeps sessions in memory; use --workers 1")
+
+    import uvicorn
+
+    uvicorn.run(
+        "splitwise_mcp.server:http_app",
+        factory=True,
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        lifespan="on",
+        timeout_graceful_shutdown=settings.shutdown_timeout,
+    )
 
 
 if __name__ == "__main__":
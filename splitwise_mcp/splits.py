@@ -0,0 +1,191 @@
+"""Exact split arithmetic for expense shares.
+
+Splitwise rejects an expense whose ``users__{i}__paid_share`` or
+``owed_share`` values do not add up to ``cost`` — but only after a round
+trip, as a 200 response carrying ``errors``. This module computes shares in
+integer minor units (cents), so totals always match exactly, and validates
+hand-written ``users`` payloads before they are sent.
+
+Rounding remainders are handed out by the largest-remainder method: every
+share is rounded down, and the leftover cents go to the shares with the
+largest fractional parts, ties broken by position. The same inputs always
+produce the same split.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+METHODS = ("equal", "percent", "shares", "exact")
+
+
+class SplitError(ValueError):
+    """An amount or split that Splitwise would reject."""
+
+
+def to_minor(amount: str | int | Decimal, places: int = 2) -> int:
+    """Parse *amount* into integer minor units, refusing sub-unit precision."""
+    try:
+        value = Decimal(str(amount).strip())
+    except InvalidOperation as e:
+        raise SplitError(f"not a number: {amount!r}") from e
+    if not value.is_finite():
+        raise SplitError(f"not a number: {amount!r}")
+    minor = value.scaleb(places)
+    if minor != minor.to_integral_value():
+        raise SplitError(f"{amount!r} has more than {places} decimal places")
+    return int(minor)
+
+
+def from_minor(minor: int, places: int = 2) -> str:
+    """Format integer minor units as the decimal string Splitwise expects."""
+    return str(Decimal(minor).scaleb(-places).quantize(Decimal(1).scaleb(-places)))
+
+
+def allocate(total: int, weights: Sequence[int | Decimal]) -> list[int]:
+    """Split *total* minor units in proportion to *weights*, summing exactly."""
+    weights = [Decimal(w) for w in weights]
+    if not weights:
+        raise SplitError("nobody to split between")
+    if any(w < 0 for w in weights):
+        raise SplitError("split weights cannot be negative")
+    weight_sum = sum(weights)
+    if weight_sum == 0:
+        raise SplitError("split weights add up to zero")
+    parts: list[int] = []
+    fractions: list[Decimal] = []
+    for w in weights:
+        exact = total * w / weight_sum
+        part = int(exact)  # truncates toward zero; total is never negative
+        parts.append(part)
+        fractions.append(exact - part)
+    leftover = total - sum(parts)
+    # Largest fractional part first; the stable sort keeps ties in order
+    for i in sorted(range(len(parts)), key=lambda i: -fractions[i])[:leftover]:
+        parts[i] += 1
+    return parts
+
+
+def split(
+    cost: str | Decimal,
+    method: str,
+    values: Sequence[str | int | Decimal | None],
+    places: int = 2,
+) -> list[str]:
+    """Divide *cost* between ``len(values)`` people.
+
+    ``method`` decides what ``values`` mean:
+
+    * ``equal`` — ignored; everyone owes the same (± one cent).
+    * ``percent`` — percentages, which must add up to 100.
+    * ``shares`` — relative weights, e.g. nights stayed.
+    * ``exact`` — the amounts themselves, which must add up to ``cost``.
+    """
+    total = to_minor(cost, places)
+    if total <= 0:
+        raise SplitError("cost must be positive")
+    if method == "equal":
+        return [from_minor(p, places) for p in allocate(total, [1] * len(values))]
+    if method == "exact":
+        parts = [to_minor(v or 0, places) for v in values]
+        if sum(parts) != total:
+            raise SplitError(
+                f"amounts add up to {from_minor(sum(parts), places)}, "
+                f"not {from_minor(total, places)}"
+            )
+        return [from_minor(p, places) for p in parts]
+    if method not in METHODS:
+        raise SplitError(f"unknown split method {method!r}; use one of {METHODS}")
+    try:
+        weights = [Decimal(str(v if v is not None else 0)) for v in values]
+    except InvalidOperation as e:
+        raise SplitError(f"unreadable {method} value") from e
+    if method == "percent" and sum(weights) != 100:
+        raise SplitError(f"percentages add up to {sum(weights)}, not 100")
+    return [from_minor(p, places) for p in allocate(total, weights)]
+
+
+def build_users(
+    cost: str | Decimal,
+    user_ids: Sequence[int],
+    *,
+    owed_method: str = "equal",
+    owed: Sequence[str | int | Decimal | None] | None = None,
+    paid_method: str = "exact",
+    paid: Sequence[str | int | Decimal | None] | None = None,
+    paid_by: int | None = None,
+    places: int = 2,
+) -> list[dict[str, Any]]:
+    """Build a ``users`` payload for ``create_expense``/``update_expense``.
+
+    The payer side is either a single ``paid_by`` user who paid everything,
+    or ``paid`` values interpreted with ``paid_method``. Shares have
+    *places* decimal places, the scale of the expense's currency.
+    """
+    if len(set(user_ids)) != len(user_ids):
+        raise SplitError("each user may appear only once")
+    n = len(user_ids)
+    if paid_by is not None:
+        if paid_by not in user_ids:
+            raise SplitError(f"payer {paid_by} is not one of the users")
+        paid_method = "exact"
+        paid = [cost if uid == paid_by else 0 for uid in user_ids]
+    if paid is None:
+        raise SplitError("give paid_by or paid values")
+    for name, values in (("owed", owed), ("paid", paid)):
+        if values is not None and len(values) != n:
+            raise SplitError(f"{n} users but {len(values)} {name} values")
+    owed_shares = split(cost, owed_method, owed or [None] * n, places)
+    paid_shares = split(cost, paid_method, paid, places)
+    return [
+        {"user_id": uid, "paid_share": p, "owed_share": o}
+        for uid, p, o in zip(user_ids, paid_shares, owed_shares, strict=True)
+    ]
+
+
+def validate_users(
+    cost: str | None, users: Sequence[dict[str, Any]], places: int = 2
+) -> None:
+    """Check a ``users`` payload the way Splitwise will, without the round trip.
+
+    Every entry needs a ``user_id`` or ``email``; shares must be
+    non-negative amounts in whole minor units (*places* decimal places);
+    paid and owed shares must each add up to ``cost``. When ``cost`` is ``None`` (an update that keeps the
+    existing cost) they must at least add up to the same total.
+    """
+    paid_total = owed_total = 0
+    seen: set[Any] = set()
+    for i, user in enumerate(users):
+        who = user.get("user_id") or user.get("email")
+        if not who:
+            raise SplitError(f"users[{i}] needs a user_id or email")
+        if who in seen:
+            raise SplitError(f"users[{i}]: {who} appears more than once")
+        seen.add(who)
+        for key in ("paid_share", "owed_share"):
+            try:
+                minor = to_minor(user.get(key) or 0, places)
+            except SplitError as e:
+                raise SplitError(f"users[{i}].{key}: {e}") from e
+            if minor < 0:
+                raise SplitError(f"users[{i}].{key} cannot be negative")
+            if key == "paid_share":
+                paid_total += minor
+            else:
+                owed_total += minor
+    if cost is None:
+        if paid_total != owed_total:
+            raise SplitError(
+                f"paid shares add up to {from_minor(paid_total, places)} but "
+                f"owed shares add up to {from_minor(owed_total, places)}"
+            )
+        return
+    total = to_minor(cost, places)
+    for label, got in (("paid", paid_total), ("owed", owed_total)):
+        if got != total:
+            raise SplitError(
+                f"{label} shares add up to {from_minor(got, places)}, "
+                f"not the cost {from_minor(total, places)}"
+            )
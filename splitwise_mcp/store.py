@@ -0,0 +1,218 @@
+"""Normalized in-memory store of expenses, groups, users and categories.
+
+Splitwise embeds a full user object in every ``users[].user``,
+``created_by`` and ``updated_by`` of every expense, and a full category
+object in each one too. :class:`EntityStore` keeps one shared record per
+user and category ID and points every expense at it, so a thousand
+expenses between the same three people hold three user dicts rather than
+thousands. Repeated strings (names, dates, currency codes) are interned.
+
+Records keep the API's shape, so formatters read stored expenses exactly as
+they read raw ones. ``SplitwiseClient`` swaps the entities in a response for
+their records before caching it, so the response cache holds the same
+objects rather than a raw copy. Shared records are updated in place when fresher data
+arrives. Expenses and groups are evicted least-recently-used once their
+estimated size exceeds ``max_bytes``; users and categories are dropped when
+nothing references them any more.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import Counter, OrderedDict
+from typing import Any
+
+# Expense fields holding one embedded user
+_USER_FIELDS = ("created_by", "updated_by", "deleted_by")
+# Free text is unlikely to repeat; interning it would only grow the table
+_NO_INTERN = frozenset({"description", "details", "comment", "content"})
+_MAX_INTERN = 64
+
+
+def _intern(value: Any, field: str = "") -> Any:
+    if isinstance(value, str):
+        if len(value) <= _MAX_INTERN and field not in _NO_INTERN:
+            return sys.intern(value)
+        return value
+    if isinstance(value, dict):
+        return {sys.intern(k): _intern(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_intern(v, field) for v in value]
+    return value
+
+
+def _size(value: Any, shared: set[int], field: str = "") -> int:
+    """Approximate bytes owned by *value*, not counting shared records."""
+    if id(value) in shared:
+        return 0
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(v, shared, k) for k, v in value.items())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(_size(v, shared, field) for v in value)
+    if isinstance(value, str) and len(value) <= _MAX_INTERN and field not in _NO_INTERN:
+        return 0  # interned, so owned by the intern table
+    return sys.getsizeof(value)
+
+
+class EntityStore:
+    """Expenses and groups keyed by ID, with users and categories shared."""
+
+    def __init__(self, max_bytes: int = 32 * 2**20) -> None:
+        self._max_bytes = max_bytes
+        # kind → id → (record, estimated bytes); LRU order
+        self._entities: dict[str, OrderedDict[int, tuple[dict, int]]] = {
+            "expense": OrderedDict(),
+            "group": OrderedDict(),
+        }
+        self._users: dict[int, dict] = {}
+        self._categories: dict[int, dict] = {}
+        self._refs: Counter[tuple[str, int]] = Counter()
+        self._bytes = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Shared records
+    # ------------------------------------------------------------------
+
+    def _shared(self, table: dict[int, dict], kind: str, obj: Any) -> Any:
+        """The shared record for *obj*, merging any new fields into it."""
+        if not isinstance(obj, dict) or obj.get("id") is None:
+            return obj
+        record = table.get(obj["id"])
+        if record is None:
+            record = table[obj["id"]] = _intern(obj)
+        elif record is not obj:
+            record.update(_intern(obj))
+        self._refs[kind, obj["id"]] += 1
+        return record
+
+    def _release(self, record: dict) -> None:
+        """Drop the references *record* holds on shared users and categories."""
+        for key in self._references(record):
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                table = self._users if key[0] == "user" else self._categories
+                table.pop(key[1], None)
+
+    @staticmethod
+    def _references(record: dict) -> list[tuple[str, int]]:
+        keys = []
+        for u in record.get("users") or ():
+            if isinstance(u.get("user"), dict) and u["user"].get("id") is not None:
+                keys.append(("user", u["user"]["id"]))
+        for field in _USER_FIELDS:
+            value = record.get(field)
+            if isinstance(value, dict) and value.get("id") is not None:
+                keys.append(("user", value["id"]))
+        category = record.get("category")
+        if isinstance(category, dict) and category.get("id") is not None:
+            keys.append(("category", category["id"]))
+        return keys
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def _put(self, kind: str, record: dict) -> dict:
+        entities = self._entities[kind]
+        old = entities.pop(record["id"], None)
+        if old is not None:
+            self._bytes -= old[1]
+            self._release(old[0])
+        shared = {
+            id(self._users.get(i) if k == "user" else self._categories.get(i))
+            for k, i in self._references(record)
+        }
+        size = _size(record, shared)
+        entities[record["id"]] = (record, size)
+        self._bytes += size
+        self._evict()
+        return record
+
+    def add_expense(self, expense: dict) -> dict:
+        """Store *expense* and return the normalized record."""
+        if expense.get("id") is None:
+            return expense
+        record = _intern(
+            {
+                k: v
+                for k, v in expense.items()
+                if k not in ("users", "category", *_USER_FIELDS)
+            }
+        )
+        if "users" in expense:
+            record["users"] = [
+                {
+                    **_intern({k: v for k, v in u.items() if k != "user"}),
+                    **(
+                        {"user": self._shared(self._users, "user", u["user"])}
+                        if "user" in u
+                        else {}
+                    ),
+                }
+                for u in expense["users"] or ()
+            ]
+        for field in _USER_FIELDS:
+            if field in expense:
+                record[field] = self._shared(self._users, "user", expense[field])
+        if "category" in expense:
+            record["category"] = self._shared(
+                self._categories, "category", expense["category"]
+            )
+        return self._put("expense", record)
+
+    def add_group(self, group: dict) -> dict:
+        """Store *group*; member objects carry per-group balances and are kept."""
+        if group.get("id") is None:
+            return group
+        return self._put("group", _intern(group))
+
+    def forget(self, kind: str, entity_id: int) -> None:
+        old = self._entities[kind].pop(entity_id, None)
+        if old is not None:
+            self._bytes -= old[1]
+            self._release(old[0])
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes:
+            # LRU within each kind; expenses, the bulk, are evicted first
+            for entities in self._entities.values():
+                if entities:
+                    _, (record, size) = entities.popitem(last=False)
+                    self._bytes -= size
+                    self._release(record)
+                    self.evictions += 1
+                    break
+            else:
+                return
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, kind: str, entity_id: int) -> dict | None:
+        """The stored expense or group, marking it recently used."""
+        entities = self._entities[kind]
+        item = entities.get(entity_id)
+        if item is None:
+            return None
+        entities.move_to_end(entity_id)
+        return item[0]
+
+    def user_name(self, user_id: int) -> str | None:
+        """The name of a user embedded in a stored expense, if any."""
+        user = self._users.get(user_id)
+        if user is None:
+            return None
+        return " ".join(filter(None, (user.get("first_name"), user.get("last_name"))))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "expenses": len(self._entities["expense"]),
+            "groups": len(self._entities["group"]),
+            "users": len(self._users),
+            "categories": len(self._categories),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,190 @@
+"""Incremental parsing of large list responses.
+
+``resp.json()`` materialises the whole body and every object in it. For a
+``get_expenses`` page of thousands of expenses most of that is never read:
+each expense carries ``picture``, ``receipt``, ``created_by`` and other
+nested objects the formatters ignore. :func:`iter_array` decodes the items
+of one top-level array as the body arrives, and :func:`project` trims each
+item to the fields that are used, so the full body is never held at once.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+# A projection spec: field → True to keep the value whole, or a nested spec
+# applied to a dict value (or to each dict in a list value)
+Spec = dict[str, Any]
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_WHITESPACE = re.compile(r"\s*")
+
+# Expense fields read by the formatters, the journal, the importer,
+# update_expense's diff and the balance ledger
+EXPENSE_FIELDS: Spec = {
+    "id": True,
+    "group_id": True,
+    "friendship_id": True,
+    "description": True,
+    "details": True,
+    "payment": True,
+    "cost": True,
+    "currency_code": True,
+    "date": True,
+    "repeats": True,
+    "repeat_interval": True,
+    "next_repeat": True,
+    "created_at": True,
+    "updated_at": True,
+    "deleted_at": True,
+    "category": {"id": True, "name": True},
+    "created_by": {"id": True},
+    "repayments": {"from": True, "to": True, "amount": True},
+    "users": {
+        "user_id": True,
+        "paid_share": True,
+        "owed_share": True,
+        "net_balance": True,
+        "user": {"id": True, "first_name": True, "last_name": True},
+    },
+}
+
+
+def fields_spec(paths: Iterable[str]) -> Spec:
+    """Build a spec from dotted paths such as ``"category.name"``."""
+    spec: Spec = {}
+    for path in paths:
+        node = spec
+        *parents, leaf = path.split(".")
+        for part in parents:
+            child = node.get(part)
+            if child is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = True
+    return spec
+
+
+def merge_specs(a: Spec, b: Spec) -> Spec:
+    """A spec keeping every field kept by *a* or *b*."""
+    merged = dict(a)
+    for field, sub in b.items():
+        mine = merged.get(field)
+        if mine is None or sub is True:
+            merged[field] = sub
+        elif mine is not True:
+            merged[field] = merge_specs(mine, sub)
+    return merged
+
+
+def project(value: Any, spec: Spec) -> Any:
+    """Keep only the fields of *value* named in *spec*."""
+    if isinstance(value, list):
+        return [project(v, spec) for v in value]
+    if not isinstance(value, dict):
+        return value
+    out = {}
+    for field, sub in spec.items():
+        if field in value:
+            out[field] = value[field] if sub is True else project(value[field], sub)
+    return out
+
+
+class ArrayNotFound(ValueError):
+    """A JSON object body without the expected top-level array.
+
+    ``errors`` holds the body's top-level ``error``/``errors`` values, if
+    any, which say why.
+    """
+
+    def __init__(self, key: str, errors: dict[str, Any]) -> None:
+        self.key = key
+        self.errors = errors
+        super().__init__(
+            f"response has no {key!r} array" + (f": {errors}" if errors else "")
+        )
+
+
+async def iter_array(chunks: AsyncIterator[bytes], key: str) -> AsyncIterator[Any]:
+    """Yield the items of the array at ``body[key]`` as the body streams in.
+
+    Only *key* at the top level of the body counts. Other top-level values
+    are decoded whole and skipped, and the item being decoded is the only
+    part of the array buffered. Raises :class:`ArrayNotFound` if the body
+    has no such array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    state = "start"
+    name: Any = None  # the top-level key being read
+    errors: dict[str, Any] = {}
+
+    def decode() -> Any:
+        nonlocal pos
+        value, end = decoder.raw_decode(buf, pos)
+        if end == len(buf) and buf[pos] not in '{["':
+            # A number or literal may go on in the next chunk
+            raise json.JSONDecodeError("incomplete", buf, pos)
+        pos = end
+        return value
+
+    async for chunk in chunks:
+        buf += text.decode(chunk)
+        while True:
+            if state == "items":
+                pos = _SEPARATORS.match(buf, pos).end()
+            else:
+                pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            char = buf[pos]
+            try:
+                if state == "items":
+                    if char == "]":
+                        return
+                    yield decode()
+                elif state == "start":
+                    if char != "{":
+                        raise ValueError("response body is not a JSON object")
+                    pos += 1
+                    state = "name"
+                elif state == "name":
+                    if char == "}":
+                        raise ArrayNotFound(key, errors)
+                    name = decode()
+                    state = "colon"
+                elif state == "colon":
+                    if char != ":":
+                        raise ValueError(f"malformed JSON at {name!r}")
+                    pos += 1
+                    state = "value"
+                elif state == "value":
+                    if name == key:
+                        if char != "[":
+                            raise ArrayNotFound(key, errors)
+                        pos += 1
+                        state = "items"
+                    else:
+                        value = decode()
+                        if name in ("error", "errors"):
+                            errors[name] = value
+                        state = "next"
+                elif char == ",":  # state == "next"
+                    pos += 1
+                    state = "name"
+                elif char == "}":
+                    raise ArrayNotFound(key, errors)
+                else:
+                    raise ValueError(f"malformed JSON after {name!r}")
+            except json.JSONDecodeError:
+                break  # the value continues in the next chunk
+        buf = buf[pos:]
+        pos = 0
+    raise ValueError(f"response ended before the {key!r} array did")
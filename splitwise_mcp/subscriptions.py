@@ -0,0 +1,192 @@
+"""Push notifications for subscribed MCP resources.
+
+Clients that subscribe to a resource such as ``splitwise://groups`` are
+sent ``notifications/resources/updated`` when its content changes, so they
+can keep a copy instead of polling tools. :class:`ResourceHub` tracks the
+subscribed URIs and the sessions behind them. A background task re-renders
+only the subscribed resources, and only on a timer or right after a
+mutation through the client. It compares a digest of each one with the last
+digest it saw and notifies the subscribers of the resources that differ.
+
+Renderers are the same functions that serve ``resources/read``, registered
+with their URI template. Push needs the single-user client and a session
+that outlives the request: stdio or stateful HTTP.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from pydantic import AnyUrl
+
+from splitwise_mcp.scheduler import BACKGROUND, priority
+
+if TYPE_CHECKING:
+    from mcp.server.lowlevel import Server
+    from mcp.server.session import ServerSession
+
+    from splitwise_mcp.client import SplitwiseClient
+
+logger = logging.getLogger(__name__)
+
+Renderer = Callable[..., Awaitable[str]]
+
+_PARAM = re.compile(r"\{(\w+)\}")
+
+
+def _pattern(template: str) -> re.Pattern[str]:
+    parts = _PARAM.split(template)
+    # Even parts are literal text, odd parts parameter names
+    return re.compile(
+        "".join(
+            re.escape(p) if i % 2 == 0 else rf"(?P<{p}>\d+)"
+            for i, p in enumerate(parts)
+        )
+        + r"\Z"
+    )
+
+
+class ResourceHub:
+    """Subscriptions to resources and the task that pushes their updates."""
+
+    def __init__(self) -> None:
+        self._renderers: list[tuple[re.Pattern[str], Renderer]] = []
+        # uri → sessions subscribed to it; sessions drop out when closed
+        self._subscribers: dict[str, weakref.WeakSet[ServerSession]] = {}
+        self._digests: dict[str, bytes] = {}
+        self._task: asyncio.Task | None = None
+        self.notifications_sent = 0
+
+    def register(self, template: str, render: Renderer) -> None:
+        """Serve *template* (``{name}`` parts match integer IDs) with *render*."""
+        self._renderers.append((_pattern(template), render))
+
+    async def render(self, uri: str) -> str | None:
+        for pattern, render in self._renderers:
+            match = pattern.match(uri)
+            if match:
+                return await render(**{k: int(v) for k, v in match.groupdict().items()})
+        return None
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def install(self, server: Server) -> None:
+        """Handle resources/subscribe and /unsubscribe on *server*."""
+
+        @server.subscribe_resource()
+        async def subscribe(uri: AnyUrl) -> None:
+            self.subscribe(str(uri), server.request_context.session)
+            if str(uri) not in self._digests:
+                # Changes are measured from what the subscriber can read now
+                await self._render_digest(str(uri))
+
+        @server.unsubscribe_resource()
+        async def unsubscribe(uri: AnyUrl) -> None:
+            self.unsubscribe(str(uri), server.request_context.session)
+
+        # The SDK always advertises subscribe=False; say we support it
+        base = server.get_capabilities
+
+        def get_capabilities(*args: Any, **kwargs: Any) -> Any:
+            capabilities = base(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+
+        server.get_capabilities = get_capabilities
+
+    def subscribe(self, uri: str, session: ServerSession) -> None:
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: ServerSession) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+                self._digests.pop(uri, None)
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+
+    async def _render_digest(self, uri: str) -> bytes | None:
+        try:
+            content = await self.render(uri)
+        except Exception as e:  # noqa: BLE001 — a failed read is retried next round
+            logger.debug("Could not render %s: %s", uri, e)
+            return None
+        if content is None:
+            return None
+        digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        self._digests[uri] = digest
+        return digest
+
+    async def check(self) -> list[str]:
+        """Re-render subscribed resources; notify and return those that changed."""
+        changed = []
+        for uri, sessions in list(self._subscribers.items()):
+            if not sessions:
+                del self._subscribers[uri]
+                self._digests.pop(uri, None)
+                continue
+            previous = self._digests.get(uri)
+            digest = await self._render_digest(uri)
+            # Without an earlier digest there is nothing to compare against
+            if previous is None or digest is None or previous == digest:
+                continue
+            changed.append(uri)
+            for session in list(sessions):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    self.notifications_sent += 1
+                except Exception:  # noqa: BLE001 — the session has gone away
+                    sessions.discard(session)
+        return changed
+
+    async def _watch(self, client: SplitwiseClient, interval: float) -> None:
+        seen = client.mutations
+        next_check = time.monotonic()
+        while True:
+            await asyncio.sleep(1.0)
+            # Nothing to do without subscribers; no API calls are made
+            if not self._subscribers:
+                continue
+            # A mutation through this client likely changed something; look now
+            if client.mutations != seen or time.monotonic() >= next_check:
+                seen = client.mutations
+                next_check = time.monotonic() + interval
+                await self.check()
+
+    def start(self, client: SplitwiseClient, interval: float) -> None:
+        """Check subscribed resources every *interval* seconds and after mutations."""
+        if self._task is None:
+            with priority(BACKGROUND):
+                self._task = asyncio.create_task(
+                    self._watch(client, interval), name="splitwise-resource-watch"
+                )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribed": len(self._subscribers),
+            "notifications": self.notifications_sent,
+        }
@@ -0,0 +1,168 @@
+"""Per-user SplitwiseClient registry for hosted, OAuth-based deployments."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import httpx
+
+from splitwise_mcp.breaker import CircuitBreaker
+from splitwise_mcp.cache import SQLiteCache, build_cache
+from splitwise_mcp.client import BASE_URL, SplitwiseClient, create_http_client
+from splitwise_mcp.hedging import HedgePolicy
+from splitwise_mcp.ratelimit import RateLimiter
+from splitwise_mcp.scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Tenant:
+    client: SplitwiseClient
+    limiter: RateLimiter
+    last_used: float
+
+
+class TenantPool:
+    """LRU registry of SplitwiseClients keyed by OAuth access token.
+
+    Every tenant gets its own response cache and rate limiter, but all of
+    them share one httpx connection pool. Tenants idle for longer than
+    ``idle_ttl`` seconds, or the least recently used ones beyond
+    ``max_tenants``, are evicted and closed; a returning user simply gets a
+    fresh client with a cold local cache (its ``shared_cache`` namespace, if
+    any, survives eviction). Rate limiters outlive their clients until their
+    bucket has refilled, so churning through evictions does not reset a
+    tenant's rate limit. A ``hedge`` policy, if given, is shared so its
+    extra-load budget is global rather than per tenant, and so is a
+    ``breaker``, since an endpoint that is down is down for everyone. With
+    ``max_concurrent`` set, each tenant's requests are scheduled by
+    priority, with per-class ``concurrency_caps``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        *,
+        max_tenants: int = 1000,
+        idle_ttl: float = 900.0,
+        cache_ttl: float = 30.0,
+        rate_limit: float = 5.0,
+        rate_burst: int = 10,
+        max_connections: int = 100,
+        transport: httpx.AsyncBaseTransport | None = None,
+        hedge: HedgePolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        stale_max_age: float = 86400.0,
+        revalidate_after: float | None = None,
+        shared_cache: SQLiteCache | None = None,
+        reference_ttl: float | None = None,
+        store_max_bytes: int = 2 * 2**20,
+        max_concurrent: int = 0,
+        concurrency_caps: dict[str, int] | None = None,
+    ) -> None:
+        self._base_url = base_url
+        self._max_tenants = max_tenants
+        self._idle_ttl = idle_ttl
+        self._cache_ttl = cache_ttl
+        self._rate_limit = rate_limit
+        self._rate_burst = rate_burst
+        self._hedge = hedge
+        self._breaker = breaker
+        self._stale_max_age = stale_max_age
+        self._revalidate_after = revalidate_after
+        self._shared_cache = shared_cache
+        self._reference_ttl = reference_ttl
+        self._store_max_bytes = store_max_bytes
+        self._max_concurrent = max_concurrent
+        self._concurrency_caps = concurrency_caps
+        self._http = create_http_client(
+            base_url, max_connections=max_connections, transport=transport
+        )
+        self._tenants: OrderedDict[str, _Tenant] = OrderedDict()
+        # Limiters of evicted tenants → eviction time, oldest first; at most
+        # max_tenants, each kept until its bucket would be full again
+        self._limiters: OrderedDict[str, tuple[RateLimiter, float]] = OrderedDict()
+        self._closing: set[asyncio.Task[None]] = set()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        # Keyed by digest so raw tokens never appear in logs or metrics
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, access_token: str) -> SplitwiseClient:
+        """Return the client for *access_token*, creating it on first use."""
+        key = self._key(access_token)
+        now = time.monotonic()
+        tenant = self._tenants.get(key)
+        if tenant is not None:
+            tenant.last_used = now
+            self._tenants.move_to_end(key)
+            return tenant.client
+        kept = self._limiters.pop(key, None)
+        limiter = kept[0] if kept else RateLimiter(self._rate_limit, self._rate_burst)
+        client = SplitwiseClient(
+            access_token,
+            self._base_url,
+            http_client=self._http,
+            hedge=self._hedge,
+            breaker=self._breaker,
+            stale_max_age=self._stale_max_age,
+            revalidate_after=self._revalidate_after,
+            cache=build_cache(self._cache_ttl, self._shared_cache, namespace=key),
+            rate_limiter=limiter,
+            scheduler=(
+                Scheduler(self._max_concurrent, self._concurrency_caps)
+                if self._max_concurrent
+                else None
+            ),
+            reference_ttl=self._reference_ttl,
+            store_max_bytes=self._store_max_bytes,
+        )
+        self._tenants[key] = _Tenant(client=client, limiter=limiter, last_used=now)
+        self._evict(now)
+        return client
+
+    def _evict(self, now: float) -> None:
+        # The OrderedDict is in LRU order, so idle tenants are at the front
+        while self._tenants:
+            key, oldest = next(iter(self._tenants.items()))
+            if (
+                len(self._tenants) <= self._max_tenants
+                and now - oldest.last_used < self._idle_ttl
+            ):
+                break
+            del self._tenants[key]
+            self.evictions += 1
+            self._limiters[key] = (oldest.limiter, now)
+            # Stop its revalidation and probe tasks
+            task = asyncio.get_running_loop().create_task(oldest.client.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        refill = self._rate_burst / self._rate_limit if self._rate_limit > 0 else 0.0
+        while self._limiters:
+            _, evicted_at = next(iter(self._limiters.values()))
+            if len(self._limiters) <= self._max_tenants and now - evicted_at < refill:
+                break
+            self._limiters.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"tenants": len(self._tenants), "evictions": self.evictions}
+
+    async def close(self) -> None:
+        for tenant in self._tenants.values():
+            await tenant.client.close()
+        self._tenants.clear()
+        self._limiters.clear()
+        if self._closing:
+            await asyncio.gather(*self._closing)
+        await self._http.aclose()
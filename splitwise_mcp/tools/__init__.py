@@ -8,3 +8,6 @@ import splitwise_mcp.tools.expenses  # noqa: F401
 import splitwise_mcp.tools.comments  # noqa: F401
 import splitwise_mcp.tools.notifications  # noqa: F401
 import splitwise_mcp.tools.other  # noqa: F401
+import splitwise_mcp.tools.journal  # noqa: F401
+import splitwise_mcp.tools.jobs  # noqa: F401
+import splitwise_mcp.tools.resolve  # noqa: F401
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from fastmcp import Context
 
 from splitwise_mcp.app import mcp
 from splitwise_mcp.client import SplitwiseAPIError
-from splitwise_mcp.utils.formatters import format_comment, format_comment_list
+from splitwise_mcp.utils.formatters import (
+    format_comment,
+    format_comment_list,
+    format_journal_entry,
+)
 
 
 @mcp.tool()
@@ -37,7 +43,13 @@ async def create_comment(
         content: The comment text.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "create_comment", expense_id=expense_id, content=content
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         comment = await client.create_comment(expense_id, content)
         return f"Comment added.\n{format_comment(comment)}"
     except SplitwiseAPIError as e:
@@ -52,7 +64,11 @@ async def delete_comment(comment_id: int, ctx: Context) -> str:
         comment_id: The comment ID to delete.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("delete_comment", comment_id=comment_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.delete_comment(comment_id)
         return f"Comment deleted (ID: {comment_id})."
     except SplitwiseAPIError as e:
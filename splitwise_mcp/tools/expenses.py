@@ -2,15 +2,31 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+from datetime import date, timedelta
 from typing import Any
 
 from fastmcp import Context
 
 from splitwise_mcp.app import mcp
-from splitwise_mcp.client import SplitwiseAPIError
+from splitwise_mcp.client import SplitwiseAPIError, SplitwiseClient
+from splitwise_mcp.export import export_expenses as run_export
+from splitwise_mcp.importer import DEFAULT_MAPPING, ImportPlan
+from splitwise_mcp.importer import import_expenses as run_import
+from splitwise_mcp.jobs import Progress, register_job, throttled
+from splitwise_mcp.money import places
+from splitwise_mcp.scheduler import BULK, priority
+from splitwise_mcp.splits import SplitError, build_users
+from splitwise_mcp.tools.jobs import start_job
 from splitwise_mcp.utils.formatters import (
+    format_duplicates,
     format_expense,
     format_expense_list,
+    format_export_result,
+    format_forecast,
+    format_import_result,
+    format_journal_entry,
+    format_split,
     format_success,
 )
 
@@ -93,16 +109,42 @@ async def create_expense(
         group_id: Group to add the expense to (optional).
         split_equally: If True, split equally among group members.
         currency_code: Currency code (default "USD").
-        category_id: Expense category ID (optional).
+        category_id: Expense category ID (optional); suggest_category
+            proposes one from the description.
         date: ISO date string for the expense date.
         repeat_interval: One of "never", "weekly", "fortnightly", "monthly", "yearly".
         details: Additional notes about the expense.
         users: Custom split — list of dicts with keys like "user_id",
                "paid_share", "owed_share". Required if split_equally is False
-               and no group_id is given.
+               and no group_id is given. Shares are checked against cost
+               before sending; use calculate_split to build them.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            # Reject bad arguments now rather than when the flusher sends them
+            await app.client.preflight_expense(
+                cost=cost,
+                users=users,
+                category_id=category_id,
+                currency_code=currency_code,
+                group_id=group_id,
+            )
+            entry = await app.journal.enqueue(
+                "create_expense",
+                cost=cost,
+                description=description,
+                group_id=group_id,
+                split_equally=split_equally,
+                currency_code=currency_code,
+                category_id=category_id,
+                date=date,
+                repeat_interval=repeat_interval,
+                details=details,
+                users=users,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.create_expense(
             cost=cost,
             description=description,
@@ -124,6 +166,53 @@ async def create_expense(
         return f"Error: {e}"
 
 
+@mcp.tool()
+async def calculate_split(
+    cost: str,
+    user_ids: list[int],
+    ctx: Context,
+    method: str = "equal",
+    values: list[str] | None = None,
+    paid_by: int | None = None,
+    paid: list[str] | None = None,
+    currency_code: str = "USD",
+) -> str:
+    """Work out exact shares for a custom split, without creating anything.
+
+    The result can be passed as ``users`` to create_expense or update_expense.
+    Shares always add up to the cost; leftover cents from rounding go to the
+    users with the largest fractional shares.
+
+    Args:
+        cost: Total cost as a string (e.g. "100.00").
+        user_ids: The users taking part, in order.
+        method: How the cost is owed — "equal", "percent" (values sum to 100),
+                "shares" (relative weights, e.g. nights stayed) or "exact"
+                (values are amounts that sum to cost).
+        values: One value per user for the percent, shares and exact methods.
+        paid_by: The user who paid the whole cost.
+        paid: Exact amounts each user paid, instead of paid_by.
+        currency_code: The expense's currency, which sets how many decimal
+                       places shares have (default "USD").
+    """
+    try:
+        users = build_users(
+            cost,
+            user_ids,
+            owed_method=method,
+            owed=values,
+            paid=paid,
+            paid_by=paid_by,
+            places=places(currency_code),
+        )
+    except SplitError as e:
+        return f"Error: {e}"
+    # Names of users seen in earlier expenses, from the client's entity store
+    store = ctx.request_context.lifespan_context.splitwise.store
+    names = {uid: store.user_name(uid) for uid in user_ids} if store else None
+    return format_split(cost, users, names)
+
+
 @mcp.tool()
 async def update_expense(
     expense_id: int,
@@ -137,9 +226,13 @@ async def update_expense(
     repeat_interval: str | None = None,
     details: str | None = None,
     users: list[dict[str, Any]] | None = None,
+    expected_updated_at: str | None = None,
 ) -> str:
     """Update an existing Splitwise expense.
 
+    Only fields that differ from the current expense are sent; an update
+    that changes nothing makes no write.
+
     Args:
         expense_id: The Splitwise expense ID to update.
         cost: New total cost.
@@ -151,9 +244,41 @@ async def update_expense(
         repeat_interval: New repeat interval.
         details: New notes.
         users: New custom split (list of dicts with user_id, paid_share, owed_share).
+        expected_updated_at: The expense's updated_at as last seen; the update
+            is refused if someone has changed the expense since.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            current_currency = None
+            if currency_code is None and (cost is not None or users):
+                # Amounts are checked at the scale of the expense's currency
+                current = await app.client.current_expense(expense_id)
+                current_currency = current.get("currency_code")
+            await app.client.preflight_expense(
+                cost=cost,
+                users=users,
+                category_id=category_id,
+                currency_code=currency_code,
+                group_id=group_id,
+                current_currency=current_currency,
+            )
+            entry = await app.journal.enqueue(
+                "update_expense",
+                expense_id=expense_id,
+                cost=cost,
+                description=description,
+                group_id=group_id,
+                currency_code=currency_code,
+                category_id=category_id,
+                date=date,
+                repeat_interval=repeat_interval,
+                details=details,
+                users=users,
+                expected_updated_at=expected_updated_at,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.update_expense(
             expense_id,
             cost=cost,
@@ -165,8 +290,11 @@ async def update_expense(
             repeat_interval=repeat_interval,
             details=details,
             users=users,
+            expected_updated_at=expected_updated_at,
         )
         expenses = data.get("expenses") or []
+        if expenses and data.get("unchanged"):
+            return f"No changes needed.\n{format_expense(expenses[0])}"
         if expenses:
             return f"Expense updated.\n{format_expense(expenses[0])}"
         return f"Expense updated.\n{data}"
@@ -182,7 +310,11 @@ async def delete_expense(expense_id: int, ctx: Context) -> str:
         expense_id: The Splitwise expense ID to delete.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("delete_expense", expense_id=expense_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.delete_expense(expense_id)
         return format_success(data)
     except SplitwiseAPIError as e:
@@ -197,8 +329,254 @@ async def restore_expense(expense_id: int, ctx: Context) -> str:
         expense_id: The Splitwise expense ID to restore.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("undelete_expense", expense_id=expense_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.undelete_expense(expense_id)
         return format_success(data)
     except SplitwiseAPIError as e:
         return f"Error: {e}"
+
+
+@mcp.tool()
+async def forecast_recurring(
+    ctx: Context,
+    days: int = 30,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    group_id: int | None = None,
+) -> str:
+    """Forecast the charges from recurring expenses over a date window.
+
+    Answered from a local index of recurring expenses, which is refreshed
+    with only the expenses changed since the last refresh.
+
+    Args:
+        days: Length of the window from start_date (default 30).
+        start_date: First day of the window, ISO format (default today).
+        end_date: Last day of the window; overrides days.
+        group_id: Only forecast this group's recurring expenses.
+    """
+    try:
+        start = date.fromisoformat(start_date) if start_date else date.today()
+        end = (
+            date.fromisoformat(end_date)
+            if end_date
+            else start + timedelta(days=days - 1)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    try:
+        client = ctx.request_context.lifespan_context.splitwise
+        await client.indexes.refresh(client)
+        found, totals = client.recurring.forecast(start, end, group_id=group_id)
+        return format_forecast(
+            start.isoformat(),
+            end.isoformat(),
+            [
+                {"date": o.day.isoformat(), **asdict(o.series)}
+                for o in found
+            ],
+            [
+                {"group_id": g, "currency_code": c, "total": t}
+                for (g, c), t in sorted(totals.items(), key=str)
+            ],
+        )
+    except SplitwiseAPIError as e:
+        return f"Error: {e}"
+
+
+@mcp.tool()
+async def find_duplicate_expenses(
+    ctx: Context,
+    group_id: int | None = None,
+    min_similarity: float = 0.5,
+    limit: int = 20,
+) -> str:
+    """Find expenses that look like the same charge entered twice.
+
+    Pairs have similar descriptions, amounts within 2% in the same currency
+    and dates within 3 days of each other. Answered from a local index that
+    is refreshed with only the expenses changed since the last refresh.
+
+    Args:
+        group_id: Only look within this group.
+        min_similarity: Minimum description similarity from 0 to 1
+            (default 0.5).
+        limit: Maximum number of pairs to show (default 20).
+    """
+    try:
+        client = ctx.request_context.lifespan_context.splitwise
+        await client.indexes.refresh(client)
+        found = client.duplicates.pairs(
+            group_id=group_id, min_similarity=min_similarity
+        )
+        return format_duplicates([asdict(p) for p in found], limit)
+    except SplitwiseAPIError as e:
+        return f"Error: {e}"
+
+
+@mcp.tool()
+async def export_expenses(
+    path: str,
+    ctx: Context,
+    format: str | None = None,
+    fields: list[str] | None = None,
+    group_id: int | None = None,
+    friend_id: int | None = None,
+    dated_after: str | None = None,
+    dated_before: str | None = None,
+    updated_after: str | None = None,
+    updated_before: str | None = None,
+    include_deleted: bool = False,
+    include_payments: bool = True,
+    background: bool = False,
+) -> str:
+    """Export the full expense history to a file on the server, page by page.
+
+    Use this instead of list_expenses for complete dumps — the data is
+    streamed to disk and only a summary is returned. For long histories
+    pass background=True and follow the job with job_status.
+
+    Args:
+        path: Output file path, relative to the server's export directory.
+        format: "jsonl", "csv" or "parquet" (default: from the file extension).
+        fields: Fields to include; dotted paths reach nested values
+                (e.g. "category.name") and map over lists (e.g.
+                "users.owed_share"). Defaults to a standard set.
+        group_id: Only expenses in this group.
+        friend_id: Only expenses with this friend.
+        dated_after: ISO date string — only expenses after this date.
+        dated_before: ISO date string — only expenses before this date.
+        updated_after: ISO date string — only expenses updated after this.
+        updated_before: ISO date string — only expenses updated before this.
+        include_deleted: Include deleted expenses.
+        include_payments: Include settle-up payments.
+        background: Run as a background job and return its ID at once.
+    """
+    try:
+        app = ctx.request_context.lifespan_context
+        root = app.files_root(app.export_dir)
+        target = (root / path).resolve()
+        if not target.is_relative_to(root):
+            return f"Error: export path must stay inside {root}"
+        params = {
+            "path": str(target),
+            "format": format,
+            "fields": fields,
+            "include_deleted": include_deleted,
+            "include_payments": include_payments,
+            "group_id": group_id,
+            "friend_id": friend_id,
+            "dated_after": dated_after,
+            "dated_before": dated_before,
+            "updated_after": updated_after,
+            "updated_before": updated_before,
+        }
+        if background:
+            return await start_job(app, "export", params)
+        with priority(BULK):
+            result = await _export_job(
+                app.splitwise, params, throttled(ctx.report_progress)
+            )
+        return format_export_result(result)
+    except (SplitwiseAPIError, ValueError, RuntimeError, OSError) as e:
+        return f"Error: {e}"
+
+
+async def _export_job(
+    client: SplitwiseClient, params: dict[str, Any], progress: Progress
+) -> dict[str, Any]:
+    return asdict(await run_export(client, **params, progress=progress))
+
+
+register_job("export", _export_job)
+
+
+@mcp.tool()
+async def import_expenses(
+    path: str,
+    ctx: Context,
+    columns: dict[str, str] | None = None,
+    date_format: str | None = None,
+    group_id: int | None = None,
+    currency_code: str = "USD",
+    category_id: int | None = None,
+    split_equally: bool = False,
+    users: list[dict[str, Any]] | None = None,
+    concurrency: int = 4,
+    dry_run: bool = False,
+    background: bool = False,
+) -> str:
+    """Bulk-create expenses from a CSV file or bank statement on the server.
+
+    Rows that match an existing expense on (date, cost, description) are
+    skipped, and re-running an interrupted import resumes where it stopped.
+    Try dry_run=True first to check the mapping. For large files pass
+    background=True and follow the job with job_status.
+
+    Args:
+        path: CSV file path, relative to the server's import directory.
+        columns: Map of expense field → CSV column, for fields "date",
+                 "description", "cost", "currency_code", "category_id",
+                 "details". Defaults to columns named after the fields.
+        date_format: strptime format of the date column (default ISO).
+        group_id: Group to add every expense to.
+        currency_code: Currency when the CSV has no currency column.
+        category_id: Category when the CSV has no category column.
+        split_equally: Split each expense equally in the group.
+        users: Split template instead of split_equally — list of dicts with
+               "user_id", "paid_percent" and "owed_percent" (each summing to 100).
+        concurrency: Maximum expenses submitted at once.
+        dry_run: Validate and dedupe only; create nothing.
+        background: Run as a background job and return its ID at once.
+    """
+    try:
+        app = ctx.request_context.lifespan_context
+        root = app.files_root(app.import_dir)
+        source = (root / path).resolve()
+        if not source.is_relative_to(root):
+            return f"Error: import path must stay inside {root}"
+        plan = ImportPlan(
+            mapping={**DEFAULT_MAPPING, **(columns or {})},
+            date_format=date_format,
+            group_id=group_id,
+            currency_code=currency_code,
+            category_id=category_id,
+            split_equally=split_equally,
+            users=users,
+        )
+        params = {
+            "path": str(source),
+            "plan": asdict(plan),
+            "concurrency": max(1, min(concurrency, 16)),
+            "dry_run": dry_run,
+        }
+        if background:
+            return await start_job(app, "import", params)
+        with priority(BULK):
+            result = await _import_job(
+                app.splitwise, params, throttled(ctx.report_progress)
+            )
+        return format_import_result(result)
+    except (SplitwiseAPIError, ValueError, OSError) as e:
+        return f"Error: {e}"
+
+
+async def _import_job(
+    client: SplitwiseClient, params: dict[str, Any], progress: Progress
+) -> dict[str, Any]:
+    result = await run_import(
+        client,
+        params["path"],
+        ImportPlan(**params["plan"]),
+        concurrency=params["concurrency"],
+        dry_run=params["dry_run"],
+        progress=progress,
+    )
+    return asdict(result)
+
+
+register_job("import", _import_job)
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+from datetime import date
+
 from fastmcp import Context
 
 from splitwise_mcp.app import mcp
 from splitwise_mcp.client import SplitwiseAPIError
+from splitwise_mcp.money import Money
 from splitwise_mcp.utils.formatters import (
+    format_balances_as_of,
     format_friend,
     format_friend_list,
+    format_journal_entry,
     format_success,
 )
 
@@ -54,7 +60,16 @@ async def add_friend(
         user_last_name: Last name (optional, for new users).
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "create_friend",
+                user_email=user_email,
+                user_first_name=user_first_name,
+                user_last_name=user_last_name,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         friend = await client.create_friend(
             user_email=user_email,
             user_first_name=user_first_name,
@@ -77,7 +92,11 @@ async def add_friends(
                  "first_name" and "last_name".
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("create_friends", users=friends)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.create_friends(friends)
         return format_success(data)
     except SplitwiseAPIError as e:
@@ -92,8 +111,52 @@ async def delete_friend(friend_id: int, ctx: Context) -> str:
         friend_id: The Splitwise friend (user) ID to remove.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("delete_friend", friend_id=friend_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.delete_friend(friend_id)
         return format_success(data)
     except SplitwiseAPIError as e:
         return f"Error: {e}"
+
+
+@mcp.tool()
+async def balance_as_of(
+    as_of: str, ctx: Context, friend_id: int | None = None
+) -> str:
+    """Show what you and your friends owed each other at the end of a date.
+
+    Answers questions like "what did Bob owe me at the end of Q1?" from a
+    local ledger of your expense history, kept current incrementally.
+
+    Args:
+        as_of: ISO date, e.g. "2024-03-31". Expenses dated that day count.
+        friend_id: Only show the balance with this user.
+    """
+    try:
+        day = date.fromisoformat(as_of)
+    except ValueError as e:
+        return f"Error: {e}"
+    try:
+        client = ctx.request_context.lifespan_context.splitwise
+        me = await client.get_current_user()
+        await client.indexes.refresh(client)
+        if friend_id is not None:
+            owed = {friend_id: client.ledger.balance(me["id"], friend_id, day)}
+        else:
+            owed = client.ledger.balances(me["id"], day)
+        rows = [
+            {
+                "user_id": uid,
+                "name": client.ledger.name(uid),
+                "currency_code": currency,
+                "amount": str(Money(cents, currency)),
+            }
+            for uid, by_currency in sorted(owed.items())
+            for currency, cents in sorted(by_currency.items())
+        ]
+        return format_balances_as_of(day.isoformat(), rows)
+    except SplitwiseAPIError as e:
+        return f"Error: {e}"
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import Any
 
 from fastmcp import Context
@@ -11,6 +12,7 @@ from splitwise_mcp.client import SplitwiseAPIError
 from splitwise_mcp.utils.formatters import (
     format_group,
     format_group_list,
+    format_journal_entry,
     format_success,
 )
 
@@ -59,7 +61,17 @@ async def create_group(
                "user_id", "first_name", "last_name", "email".
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "create_group",
+                name=name,
+                group_type=group_type,
+                simplify_by_default=simplify_by_default,
+                users=users,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         group = await client.create_group(
             name=name,
             group_type=group_type,
@@ -79,7 +91,11 @@ async def delete_group(group_id: int, ctx: Context) -> str:
         group_id: The Splitwise group ID to delete.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("delete_group", group_id=group_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.delete_group(group_id)
         return format_success(data)
     except SplitwiseAPIError as e:
@@ -94,7 +110,11 @@ async def restore_group(group_id: int, ctx: Context) -> str:
         group_id: The Splitwise group ID to restore.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue("undelete_group", group_id=group_id)
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.undelete_group(group_id)
         return format_success(data)
     except SplitwiseAPIError as e:
@@ -120,7 +140,18 @@ async def add_user_to_group(
         email: Email address to invite.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "add_user_to_group",
+                group_id=group_id,
+                user_id=user_id,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.add_user_to_group(
             group_id,
             user_id=user_id,
@@ -146,7 +177,13 @@ async def remove_user_from_group(
         user_id: The Splitwise user ID to remove.
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "remove_user_from_group", group_id=group_id, user_id=user_id
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         data = await client.remove_user_from_group(group_id, user_id)
         return format_success(data)
     except SplitwiseAPIError as e:
@@ -0,0 +1,73 @@
+"""MCP tools for following and cancelling background jobs."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from fastmcp import Context
+
+from splitwise_mcp.app import AppContext, mcp
+from splitwise_mcp.identity import caller_id
+from splitwise_mcp.utils.formatters import (
+    format_job,
+    format_job_list,
+    format_job_started,
+)
+
+_DISABLED = (
+    "Background jobs are disabled — they need a single server worker "
+    "and JOB_MAX_WORKERS above 0."
+)
+
+# Longest a job_status call waits for a job to finish
+MAX_WAIT = 300.0
+
+
+async def start_job(app: AppContext, kind: str, params: dict[str, Any]) -> str:
+    """Start a background job of *kind* for the caller; the reply names its ID."""
+    if app.jobs is None:
+        return f"Error: {_DISABLED}"
+    job = await app.jobs.submit(kind, params, app.splitwise, caller_id())
+    return format_job_started(asdict(job))
+
+
+@mcp.tool()
+async def job_status(ctx: Context, job_id: str | None = None, wait: float = 0) -> str:
+    """Show a background job's progress and result, or list your recent jobs.
+
+    Args:
+        job_id: The job to show; omit to list your jobs, newest first.
+        wait: Seconds to wait for the job to finish (at most 300), sending
+              progress notifications meanwhile.
+    """
+    jobs = ctx.request_context.lifespan_context.jobs
+    if jobs is None:
+        return _DISABLED
+    owner = caller_id()
+    if job_id is None:
+        return format_job_list([asdict(j) for j in jobs.owned_by(owner)])
+    job = jobs.get(job_id, owner)
+    if job is None:
+        return f"Error: no job {job_id}"
+    if wait > 0 and not job.finished:
+        job = await jobs.wait(job.id, min(wait, MAX_WAIT), ctx.report_progress)
+    return format_job(asdict(job))
+
+
+@mcp.tool()
+async def cancel_job(job_id: str, ctx: Context) -> str:
+    """Stop a queued or running background job.
+
+    Work already done stays done: an import keeps the expenses it created
+    and resumes after them if started again.
+    """
+    jobs = ctx.request_context.lifespan_context.jobs
+    if jobs is None:
+        return _DISABLED
+    job = jobs.get(job_id, caller_id())
+    if job is None:
+        return f"Error: no job {job_id}"
+    if not jobs.cancel(job.id):
+        return f"Job {job_id} has already finished ({job.status})."
+    return format_job(asdict(await jobs.wait(job.id, 5.0)))
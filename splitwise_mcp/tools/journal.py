@@ -0,0 +1,34 @@
+"""MCP tools for inspecting the write-behind journal."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+
+from fastmcp import Context
+
+from splitwise_mcp.app import mcp
+from splitwise_mcp.utils.formatters import format_journal_status
+
+_DISABLED = "Write-behind mode is disabled — writes are sent to Splitwise immediately."
+
+
+@mcp.tool()
+async def write_journal_status(ctx: Context) -> str:
+    """Show queued writes that have not reached Splitwise yet, and any that failed."""
+    journal = ctx.request_context.lifespan_context.journal
+    if journal is None:
+        return _DISABLED
+    return format_journal_status(
+        [asdict(e) for e in journal.pending()],
+        [asdict(e) for e in journal.failed()],
+    )
+
+
+@mcp.tool()
+async def retry_failed_writes(ctx: Context) -> str:
+    """Re-queue every failed write in the journal for another delivery attempt."""
+    journal = ctx.request_context.lifespan_context.journal
+    if journal is None:
+        return _DISABLED
+    count = await journal.retry_failed()
+    return f"Re-queued {count} failed write(s)."
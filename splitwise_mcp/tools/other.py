@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from fastmcp import Context
 
 from splitwise_mcp.app import mcp
 from splitwise_mcp.client import SplitwiseAPIError
-from splitwise_mcp.utils.formatters import format_category_list, format_currency_list
+from splitwise_mcp.utils.formatters import (
+    format_category_list,
+    format_category_suggestions,
+    format_currency_list,
+)
 
 
 def _get_client(ctx: Context):
@@ -40,3 +46,28 @@ async def list_categories(ctx: Context) -> str:
         return f"Error: {e}"
     except RuntimeError as e:
         return f"Error: {e}"
+
+
+@mcp.tool()
+async def suggest_category(description: str, ctx: Context, limit: int = 3) -> str:
+    """Suggest a category_id for an expense description, with confidence.
+
+    Learned from how your own past expenses were categorized, so no
+    list_categories call is needed for descriptions like ones you have
+    entered before.
+
+    Args:
+        description: The expense description, e.g. "Uber to airport".
+        limit: Maximum number of suggestions (default 3).
+    """
+    try:
+        client = _get_client(ctx)
+        await client.indexes.refresh(client)
+        suggestions = client.categorizer.suggest(description, limit=limit)
+        return format_category_suggestions(
+            description, [asdict(s) for s in suggestions]
+        )
+    except SplitwiseAPIError as e:
+        return f"Error: {e}"
+    except RuntimeError as e:
+        return f"Error: {e}"
@@ -0,0 +1,41 @@
+"""MCP tool for looking up Splitwise IDs by name."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+
+from fastmcp import Context
+
+from splitwise_mcp.app import mcp
+from splitwise_mcp.client import SplitwiseAPIError
+from splitwise_mcp.resolver import KINDS
+from splitwise_mcp.utils.formatters import format_matches
+
+
+@mcp.tool()
+async def resolve(
+    query: str,
+    ctx: Context,
+    kind: str | None = None,
+    limit: int = 5,
+) -> str:
+    """Find the ID of a friend, group member or group from a name or email.
+
+    Use this instead of listing friends or groups to turn "Alice" or
+    "Goa trip" into a user_id, friend_id or group_id. Matches are ranked;
+    partial names and small misspellings are found too. "me" is you.
+
+    Args:
+        query: A name, part of a name, or an email address.
+        kind: Only return "friend", "user" (group members who are not
+            friends) or "group" matches.
+        limit: Maximum number of matches (default 5).
+    """
+    if kind is not None and kind not in KINDS:
+        return f"Error: kind must be one of {', '.join(KINDS)}"
+    try:
+        client = ctx.request_context.lifespan_context.splitwise
+        matches = await client.names.resolve(client, query, kind=kind, limit=limit)
+        return format_matches(query, [asdict(m) for m in matches])
+    except SplitwiseAPIError as e:
+        return f"Error: {e}"
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from fastmcp import Context
 
 from splitwise_mcp.app import mcp
 from splitwise_mcp.client import SplitwiseAPIError
-from splitwise_mcp.utils.formatters import format_user
+from splitwise_mcp.utils.formatters import format_journal_entry, format_user
 
 
 @mcp.tool()
@@ -56,7 +58,19 @@ async def update_user(
         locale: New locale (e.g. "en").
     """
     try:
-        client = ctx.request_context.lifespan_context.splitwise
+        app = ctx.request_context.lifespan_context
+        if app.journal is not None:
+            entry = await app.journal.enqueue(
+                "update_user",
+                user_id=user_id,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                default_currency=default_currency,
+                locale=locale,
+            )
+            return format_journal_entry(asdict(entry))
+        client = app.splitwise
         user = await client.update_user(
             user_id,
             first_name=first_name,
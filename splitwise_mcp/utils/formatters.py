@@ -1,9 +1,21 @@
-"""Format Splitwise API responses into concise, LLM-friendly text."""
+"""Format Splitwise API responses into concise, LLM-friendly text.
+
+List formatters run over every row of a response, so they use
+precompiled patterns and build their output in a single join. Amounts
+are shown as Splitwise sent them; only their sign is read, exactly, with
+:func:`~splitwise_mcp.money.sign`.
+"""
 
 from __future__ import annotations
 
+import json
+import re
 from typing import Any
 
+from splitwise_mcp.money import sign
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
 
 def _name(user: dict) -> str:
     first = user.get("first_name") or ""
@@ -36,10 +48,13 @@ def format_group(group: dict) -> str:
         lines.append(f"  Members ({len(members)}): {', '.join(member_names)}")
     debts = group.get("simplified_debts") or group.get("original_debts") or []
     if debts:
+        names = {m.get("id"): _name(m) for m in members}
         lines.append("  Debts:")
         for d in debts:
+            debtor = names.get(d.get("from")) or f"User {d.get('from')}"
+            creditor = names.get(d.get("to")) or f"User {d.get('to')}"
             lines.append(
-                f"    User {d.get('from')} owes User {d.get('to')}: "
+                f"    {debtor} owes {creditor}: "
                 f"{d.get('amount')} {d.get('currency_code', '')}"
             )
     if group.get("invite_link"):
@@ -67,37 +82,36 @@ def format_friend(friend: dict) -> str:
         f"  Email: {friend.get('email', 'N/A')}",
     ]
     balances = friend.get("balance") or []
-    if balances:
-        for b in balances:
-            amt = b.get("amount", "0")
-            cur = b.get("currency_code", "")
-            sign = "owed to you" if float(amt) > 0 else "you owe"
-            lines.append(f"  Balance: {abs(float(amt))} {cur} ({sign})")
-    else:
+    for b in balances:
+        amt = b.get("amount", "0")
+        owed = "owed to you" if sign(amt) > 0 else "you owe"
+        lines.append(
+            f"  Balance: {amt.lstrip('-')} {b.get('currency_code', '')} ({owed})"
+        )
+    if not balances:
         lines.append("  Balance: settled up")
     return "\n".join(lines)
 
 
+def _balance_tag(balances: list[dict] | None) -> str:
+    parts = []
+    for b in balances or ():
+        amt = b.get("amount", "0")
+        direction = sign(amt)
+        if direction:
+            plus = "+" if direction > 0 else ""
+            parts.append(f"{plus}{amt} {b.get('currency_code', '')}")
+    return ", ".join(parts) or "settled"
+
+
 def format_friend_list(friends: list[dict]) -> str:
     if not friends:
         return "No friends found."
-    parts = []
-    for f in friends:
-        bal_str = "settled"
-        balances = f.get("balance") or []
-        if balances:
-            bal_parts = []
-            for b in balances:
-                amt = float(b.get("amount", "0"))
-                cur = b.get("currency_code", "")
-                if amt > 0:
-                    bal_parts.append(f"+{amt} {cur}")
-                elif amt < 0:
-                    bal_parts.append(f"{amt} {cur}")
-            if bal_parts:
-                bal_str = ", ".join(bal_parts)
-        parts.append(f"- {_name(f)} (ID: {f.get('id')}) [{bal_str}]")
-    return f"Friends ({len(friends)}):\n" + "\n".join(parts)
+    rows = [
+        f"- {_name(f)} (ID: {f.get('id')}) [{_balance_tag(f.get('balance'))}]"
+        for f in friends
+    ]
+    return f"Friends ({len(friends)}):\n" + "\n".join(rows)
 
 
 def format_expense(expense: dict) -> str:
@@ -117,16 +131,19 @@ def format_expense(expense: dict) -> str:
 
     users = expense.get("users") or []
     if users:
-        payers = [
-            f"{_name(u.get('user', u))} paid {u.get('paid_share', '0')}"
-            for u in users
-            if float(u.get("paid_share", "0")) > 0
-        ]
-        debtors = [
-            f"{_name(u.get('user', u))} owes {u.get('owed_share', '0')}"
-            for u in users
-            if float(u.get("owed_share", "0")) > 0
-        ]
+        payers = []
+        debtors = []
+        for u in users:
+            paid = u.get("paid_share", "0")
+            owed = u.get("owed_share", "0")
+            pays = sign(paid) > 0
+            owes = sign(owed) > 0
+            if pays or owes:
+                name = _name(u.get("user", u))
+                if pays:
+                    payers.append(f"{name} paid {paid}")
+                if owes:
+                    debtors.append(f"{name} owes {owed}")
         if payers:
             lines.append(f"  Paid by: {'; '.join(payers)}")
         if debtors:
@@ -134,6 +151,8 @@ def format_expense(expense: dict) -> str:
 
     if expense.get("repeat_interval") and expense["repeat_interval"] != "never":
         lines.append(f"  Repeats: {expense['repeat_interval']}")
+    if expense.get("updated_at"):
+        lines.append(f"  Last updated: {expense['updated_at']}")
     if expense.get("deleted_at"):
         lines.append(f"  DELETED at {expense['deleted_at']}")
     return "\n".join(lines)
@@ -142,15 +161,13 @@ def format_expense(expense: dict) -> str:
 def format_expense_list(expenses: list[dict]) -> str:
     if not expenses:
         return "No expenses found."
-    parts = []
-    for e in expenses:
-        desc = e.get("description", "N/A")
-        cost = e.get("cost", "?")
-        cur = e.get("currency_code", "")
-        date = (e.get("date") or "")[:10]
-        deleted = " [DELETED]" if e.get("deleted_at") else ""
-        parts.append(f"- #{e.get('id')} {desc} — {cost} {cur} ({date}){deleted}")
-    return f"Expenses ({len(expenses)}):\n" + "\n".join(parts)
+    rows = [
+        f"- #{e.get('id')} {e.get('description', 'N/A')} — "
+        f"{e.get('cost', '?')} {e.get('currency_code', '')} "
+        f"({(e.get('date') or '')[:10]}){' [DELETED]' if e.get('deleted_at') else ''}"
+        for e in expenses
+    ]
+    return f"Expenses ({len(expenses)}):\n" + "\n".join(rows)
 
 
 def format_comment(comment: dict) -> str:
@@ -171,16 +188,15 @@ def format_comment_list(comments: list[dict]) -> str:
 
 def format_notification(n: dict) -> str:
     # Strip HTML tags for cleaner LLM reading
-    import re
-    content = re.sub(r"<[^>]+>", "", n.get("content", ""))
+    content = _HTML_TAG.sub("", n.get("content", ""))
     return f"[{n.get('created_at', '')}] {content}"
 
 
 def format_notification_list(notifications: list[dict]) -> str:
     if not notifications:
         return "No notifications."
-    parts = [format_notification(n) for n in notifications]
-    return f"Notifications ({len(notifications)}):\n" + "\n".join(parts)
+    rows = [format_notification(n) for n in notifications]
+    return f"Notifications ({len(notifications)}):\n" + "\n".join(rows)
 
 
 def format_currency_list(currencies: list[dict]) -> str:
@@ -211,3 +227,257 @@ def format_success(data: Any) -> str:
         if data.get("success") is False:
             return f"Failed: {data.get('errors', 'Unknown error')}"
     return str(data)
+
+
+def format_journal_entry(entry: dict) -> str:
+    return (
+        f"Queued as write #{entry.get('seq')} ({entry.get('op')}). "
+        "It will be sent to Splitwise in the background; "
+        "use write_journal_status to check delivery."
+    )
+
+
+def format_journal_status(pending: list[dict], failed: list[dict]) -> str:
+    if not pending and not failed:
+        return "Write journal is empty — all queued writes have been delivered."
+    lines = [f"Write journal: {len(pending)} pending, {len(failed)} failed"]
+    for e in pending:
+        retry = (
+            f", {e.get('attempts')} attempts, last error: {e.get('error')}"
+            if e.get("attempts")
+            else ""
+        )
+        lines.append(
+            f"- #{e.get('seq')} {e.get('op')} (queued {e.get('created_at')}{retry})"
+        )
+    if failed:
+        lines.append("Failed:")
+        for e in failed:
+            lines.append(
+                f"- #{e.get('seq')} {e.get('op')} {e.get('kwargs')} — "
+                f"{e.get('attempts')} attempts: {e.get('error')}"
+            )
+    return "\n".join(lines)
+
+
+def format_export_result(result: dict) -> str:
+    return (
+        f"Exported {result.get('rows')} expenses ({result.get('pages')} pages) "
+        f"to {result.get('path')} as {result.get('format')} "
+        f"in {result.get('seconds')}s."
+    )
+
+
+def format_import_result(result: dict) -> str:
+    if result.get("dry_run"):
+        head = f"Dry run: would create {result.get('accepted')}"
+    else:
+        head = f"Created {result.get('created')}"
+    lines = [
+        f"{head} expenses from {result.get('rows')} rows",
+        f"  Duplicates skipped: {result.get('duplicates')}",
+        f"  Invalid rows: {result.get('invalid')}",
+        f"  Failed submissions: {result.get('failed')}",
+    ]
+    if result.get("already_done"):
+        lines.append(f"  Already imported (checkpoint): {result['already_done']}")
+    errors = result.get("errors") or []
+    if errors:
+        lines.append("  Problems:")
+        lines.extend(f"    {e}" for e in errors[:20])
+        if len(errors) > 20:
+            lines.append(f"    … and {len(errors) - 20} more")
+    return "\n".join(lines)
+
+
+def format_load_report(report: dict) -> str:
+    calls = report.get("calls") or 0
+    seconds = report.get("seconds") or 0
+    rate = f"{calls / seconds:.1f}" if seconds else "n/a"
+    head = (
+        f"Replayed {calls} tool calls in {report.get('sessions')} sessions "
+        f"in {seconds}s ({rate} calls/s), {report.get('errors')} errors"
+    )
+    lines = [head]
+    tools = report.get("tools") or {}
+    if tools:
+        width = max(map(len, tools))
+        lines.append(
+            f"  {'tool':<{width}}  {'calls':>6}  {'errors':>6}  "
+            f"{'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}"
+        )
+        for name, t in tools.items():
+            lines.append(
+                f"  {name:<{width}}  {t['calls']:>6}  {t['errors']:>6}  "
+                f"{t['p50'] * 1000:>8.1f}  {t['p95'] * 1000:>8.1f}  "
+                f"{t['max'] * 1000:>8.1f}"
+            )
+    return "\n".join(lines)
+
+
+# Job kind → formatter of its result
+_JOB_RESULTS = {"export": format_export_result, "import": format_import_result}
+
+
+def _job_progress(job: dict) -> str:
+    done, total = job.get("done") or 0, job.get("total")
+    if total:
+        return f"{done:,.0f} of {total:,.0f} ({100 * done / total:.0f}%)"
+    return f"{done:,.0f}" if done else ""
+
+
+def format_job_started(job: dict) -> str:
+    job_id = job.get("id")
+    return (
+        f"Started {job.get('kind')} job {job_id}. "
+        f'Follow it with job_status(job_id="{job_id}").'
+    )
+
+
+def format_job(job: dict) -> str:
+    lines = [f"Job {job.get('id')} ({job.get('kind')}): {job.get('status')}"]
+    progress = _job_progress(job)
+    if progress:
+        lines.append(f"  Progress: {progress}")
+    lines.append(f"  Submitted: {job.get('created_at')}")
+    if job.get("started_at"):
+        lines.append(f"  Started: {job['started_at']}")
+    if job.get("finished_at"):
+        lines.append(f"  Finished: {job['finished_at']}")
+    if job.get("error"):
+        lines.append(f"  Error: {job['error']}")
+    formatter = _JOB_RESULTS.get(job.get("kind"))
+    if job.get("status") == "done" and job.get("result") is not None and formatter:
+        lines.append(formatter(job["result"]))
+    return "\n".join(lines)
+
+
+def format_job_list(jobs: list[dict]) -> str:
+    if not jobs:
+        return "No background jobs."
+    lines = [f"Background jobs ({len(jobs)}):"]
+    for j in jobs:
+        progress = _job_progress(j)
+        detail = f", {progress}" if progress and j.get("status") == "running" else ""
+        lines.append(
+            f"- {j.get('id')} {j.get('kind')}: {j.get('status')}{detail} "
+            f"(submitted {j.get('created_at')})"
+        )
+    return "\n".join(lines)
+
+
+def format_split(
+    cost: str, users: list[dict], names: dict[int, str | None] | None = None
+) -> str:
+    lines = [f"Split of {cost}:"]
+    for u in users:
+        name = (names or {}).get(u["user_id"])
+        who = f"{name} (ID: {u['user_id']})" if name else f"User {u['user_id']}"
+        lines.append(f"  {who}: paid {u['paid_share']}, owes {u['owed_share']}")
+    lines.append(f"users: {json.dumps(users)}")
+    return "\n".join(lines)
+
+
+def format_forecast(
+    start: str, end: str, occurrences: list[dict], totals: list[dict]
+) -> str:
+    if not occurrences:
+        return f"No recurring charges between {start} and {end}."
+    lines = [f"Recurring charges {start} to {end} ({len(occurrences)}):"]
+    for o in occurrences:
+        group = f" [group {o['group_id']}]" if o.get("group_id") else ""
+        lines.append(
+            f"- {o['date']} {o['description']} — {o['cost']} {o['currency_code']}"
+            f" ({o['interval']}, #{o['expense_id']}){group}"
+        )
+    lines.append("Totals:")
+    for t in totals:
+        scope = f"group {t['group_id']}" if t.get("group_id") else "no group"
+        lines.append(f"  {scope}: {t['total']} {t['currency_code']}")
+    return "\n".join(lines)
+
+
+def format_duplicates(pairs: list[dict], limit: int) -> str:
+    if not pairs:
+        return "No likely duplicate expenses found."
+    lines = [f"Likely duplicates ({len(pairs)} pairs):"]
+    for p in pairs[:limit]:
+        lines.append(f"- {p['similarity']:.0%} similar:")
+        for e in (p["first"], p["second"]):
+            group = f" [group {e['group_id']}]" if e.get("group_id") else ""
+            lines.append(
+                f"    #{e['id']} {e['date']} {e['description']} — "
+                f"{e['cost']} {e['currency_code']}{group}"
+            )
+    if len(pairs) > limit:
+        lines.append(f"… and {len(pairs) - limit} more")
+    return "\n".join(lines)
+
+
+def format_matches(query: str, matches: list[dict]) -> str:
+    if not matches:
+        return f"No friends, group members or groups match {query!r}."
+    lines = [f"Matches for {query!r}:"]
+    for m in matches:
+        detail = f" — {m['detail']}" if m.get("detail") else ""
+        lines.append(
+            f"- {m['kind']} {m['name'] or 'Unknown'} (ID: {m['id']}, "
+            f"score {m['score']:.2f}){detail}"
+        )
+    return "\n".join(lines)
+
+
+def format_category_suggestions(description: str, suggestions: list[dict]) -> str:
+    if not suggestions:
+        return (
+            f"No category suggestion for {description!r}: none of its words "
+            "appear in your categorized expenses."
+        )
+    lines = [f"Suggested categories for {description!r}:"]
+    for s in suggestions:
+        lines.append(
+            f"- {s['name'] or 'Unknown'} (ID: {s['category_id']}) — "
+            f"{s['confidence']:.0%} confidence"
+        )
+    return "\n".join(lines)
+
+
+def format_balances_as_of(day: str, rows: list[dict]) -> str:
+    if not rows:
+        return f"All settled up as of {day}."
+    lines = [f"Balances at the end of {day}:"]
+    for r in rows:
+        who = f"{r['name'] or 'Unknown'} (ID: {r['user_id']})"
+        owed = "you owe" if r["amount"].startswith("-") else "owes you"
+        lines.append(
+            f"- {who}: {r['amount'].lstrip('-')} {r['currency_code']} ({owed})"
+        )
+    return "\n".join(lines)
+
+
+def format_balance_summary(user_id: int, friends: list[dict], groups: list[dict]) -> str:
+    def amounts(balances: list[dict]) -> str:
+        parts = []
+        for b in balances or []:
+            amount = b.get("amount", "0")
+            if sign(amount):
+                owed = "you owe" if amount.startswith("-") else "owed to you"
+                parts.append(f"{amount.lstrip('-')} {b.get('currency_code', '')} ({owed})")
+        return ", ".join(parts)
+
+    lines = ["Balances with friends:"]
+    friend_lines = [
+        f"- {_name(f)} (ID: {f.get('id')}): {owed}"
+        for f in friends
+        if (owed := amounts(f.get("balance")))
+    ]
+    lines.extend(friend_lines or ["- All settled up."])
+    lines.append("Balances in groups:")
+    group_lines = []
+    for g in groups:
+        me = next((m for m in g.get("members") or [] if m.get("id") == user_id), None)
+        owed = amounts(me.get("balance")) if me else ""
+        if owed:
+            group_lines.append(f"- {g.get('name', 'N/A')} (ID: {g.get('id')}): {owed}")
+    lines.extend(group_lines or ["- All settled up."])
+    return "\n".join(lines)